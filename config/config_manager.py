@@ -9,25 +9,57 @@ This module handles:
 """
 
 import os
+import copy
 import yaml
+import pickle
+import hashlib
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class SystemConfig:
+# Prefer the libyaml-backed loader/dumper when available
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+class _FrozenSlots:
+    """
+    Pickling support for frozen dataclasses with hand-written ``__slots__``.
+    
+    The default slot-state restore assigns attributes, which a frozen
+    dataclass refuses; state is restored with object.__setattr__ instead.
+    """
+    __slots__ = ()
+    
+    def __getstate__(self) -> tuple:
+        """Get the slot values in declaration order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state: tuple) -> None:
+        """Restore slot values without going through the frozen __setattr__."""
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+@dataclass(frozen=True)
+class SystemConfig(_FrozenSlots):
     """System-wide configuration parameters."""
+    __slots__ = ('log_level', 'log_file', 'log_max_size_mb', 'log_backup_count')
+
     log_level: str
     log_file: str
     log_max_size_mb: int
     log_backup_count: int
 
-@dataclass
-class MappingConfig:
+@dataclass(frozen=True)
+class MappingConfig(_FrozenSlots):
     """Mapping module configuration."""
+    __slots__ = ('width_cm', 'height_cm', 'resolution_cm', 'save_interval_sec', 'compression_enabled',
+                 'cache_size', 'unknown_threshold', 'free_threshold', 'occupied_threshold')
+
     width_cm: int
     height_cm: int
     resolution_cm: float
@@ -38,9 +70,12 @@ class MappingConfig:
     free_threshold: float
     occupied_threshold: float
 
-@dataclass
-class NavigationConfig:
+@dataclass(frozen=True)
+class NavigationConfig(_FrozenSlots):
     """Navigation module configuration."""
+    __slots__ = ('min_obstacle_distance_cm', 'robot_radius_cm', 'safety_margin_cm', 'max_planning_time_sec',
+                 'replan_interval_sec', 'path_smoothing', 'motion_primitives')
+
     min_obstacle_distance_cm: float
     robot_radius_cm: float
     safety_margin_cm: float
@@ -49,34 +84,42 @@ class NavigationConfig:
     path_smoothing: bool
     motion_primitives: Dict[str, Any]
 
-@dataclass
-class HardwareConfig:
+@dataclass(frozen=True)
+class HardwareConfig(_FrozenSlots):
     """Hardware-specific configuration."""
+    __slots__ = ('motor_max_speed', 'motor_acceleration', 'servo_max_angle', 'camera_resolution', 'camera_fps')
+
     motor_max_speed: int
     motor_acceleration: int
     servo_max_angle: int
     camera_resolution: tuple
     camera_fps: int
 
-@dataclass
-class SafetyConfig:
+@dataclass(frozen=True)
+class SafetyConfig(_FrozenSlots):
     """Safety-related configuration."""
+    __slots__ = ('battery', 'temperature', 'emergency_stop')
+
     battery: Dict[str, float]
     temperature: Dict[str, float]
     emergency_stop: Dict[str, Any]
 
-@dataclass
-class WebConfig:
+@dataclass(frozen=True)
+class WebConfig(_FrozenSlots):
     """Web interface configuration."""
+    __slots__ = ('host', 'port', 'update_interval_ms', 'features', 'security')
+
     host: str
     port: int
     update_interval_ms: int
     features: Dict[str, bool]
     security: Dict[str, Any]
 
-@dataclass
-class ProcessingConfig:
+@dataclass(frozen=True)
+class ProcessingConfig(_FrozenSlots):
     """Multiprocessing configuration."""
+    __slots__ = ('mapping', 'planning', 'vision')
+
     mapping: Dict[str, Any]
     planning: Dict[str, Any]
     vision: Dict[str, Any]
@@ -90,8 +133,23 @@ class ConfigManager:
     - Type validation
     - Default value handling
     - Configuration merging
+    
+    Use ConfigManager.get() to share one instance per configuration
+    directory across the process; calling the constructor directly always
+    builds a fresh, uncached instance.
     """
     
+    # Typed configuration attributes and the YAML sections they are built from
+    _TYPED_SECTIONS = (
+        ('system', SystemConfig),
+        ('mapping', MappingConfig),
+        ('navigation', NavigationConfig),
+        ('hardware', HardwareConfig),
+        ('safety', SafetyConfig),
+        ('web', WebConfig),
+        ('processing', ProcessingConfig),
+    )
+    
     def __init__(self, config_dir: Optional[str] = None) -> None:
         """
         Initialize the configuration manager.
@@ -100,24 +158,54 @@ class ConfigManager:
             config_dir: Directory containing configuration files
         """
         self.config_dir = Path(config_dir or os.path.dirname(__file__))
+        
+        # Content hashes of the configuration the typed objects were built from
+        self._config_hash: Optional[bytes] = None
+        self._section_hashes: Dict[str, bytes] = {}
+        
         self._load_config()
     
+    @classmethod
+    def get(cls, config_dir: Optional[str] = None) -> 'ConfigManager':
+        """
+        Get the shared configuration manager for a configuration directory.
+        
+        Args:
+            config_dir: Directory containing configuration files
+            
+        Returns:
+            ConfigManager: Memoized instance for the resolved directory
+        """
+        return cls._get_cached(Path(config_dir or os.path.dirname(__file__)).resolve())
+    
+    @classmethod
+    @lru_cache(maxsize=8)
+    def _get_cached(cls, config_dir: Path) -> 'ConfigManager':
+        """Construct a configuration manager for a resolved directory."""
+        return cls(str(config_dir))
+    
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop all memoized instances so the next get() reloads from disk."""
+        cls._get_cached.cache_clear()
+    
     def _load_config(self) -> None:
         """Load and validate configuration from files."""
         try:
             # Load default configuration
             default_path = self.config_dir / "default_config.yaml"
-            with open(default_path) as f:
-                self._config = yaml.safe_load(f)
+            self._config = self._load_yaml_cached(default_path)
             
             # Load user configuration if it exists
             user_path = self.config_dir / "config.yaml"
-            if user_path.exists():
-                with open(user_path) as f:
-                    user_config = yaml.safe_load(f)
+            if user_path.exists() and self._check_yaml_header(user_path):
+                user_config = self._load_yaml_cached(user_path)
                 # Merge configurations
                 self._merge_configs(self._config, user_config)
             
+            # Read-only view handed out by get_raw_config
+            self._config_view = MappingProxyType(self._config)
+            
             # Create typed configuration objects
             self._create_typed_configs()
             
@@ -127,29 +215,145 @@ class ConfigManager:
             logger.error(f"Error loading configuration: {str(e)}", exc_info=True)
             raise
     
+    def _peek_yaml_header(self, path: Path, max_lines: int = 32) -> Optional[Any]:
+        """
+        Parse only the first lines of a YAML file.
+        
+        Args:
+            path: Path of the YAML file to peek at
+            max_lines: Maximum number of lines to read
+            
+        Returns:
+            Parsed header, or None if the header alone cannot be parsed
+        """
+        head = bytearray()
+        with open(path, 'rb') as f:
+            for _ in range(max_lines):
+                line = f.readline()
+                if not line:
+                    break
+                head += line
+        
+        try:
+            return yaml.load(bytes(head), Loader=Loader)
+        except yaml.YAMLError:
+            return None
+    
+    def _check_yaml_header(self, path: Path) -> bool:
+        """
+        Reject a user configuration early if its header does not fit the layout.
+        
+        Only a bounded prefix of the file is parsed. An inconclusive header
+        is accepted and left to the full parse.
+        
+        Args:
+            path: Path of the user configuration file
+            
+        Returns:
+            bool: True if the file should be fully loaded
+        """
+        header = self._peek_yaml_header(path)
+        if header is None:
+            return True
+        if not isinstance(header, dict) or not header.keys() & self._config.keys():
+            logger.warning(f"Ignoring {path}: header does not match the configuration layout")
+            return False
+        return True
+    
+    def _load_yaml_cached(self, path: Path) -> Any:
+        """
+        Load a YAML file, reusing a pickled copy if the file is unchanged.
+        
+        Each file has one cache entry, named after its path, that stores the
+        modification time and size it was parsed at; any edit to the file
+        misses the cache and the fresh parse overwrites the entry.
+        
+        Args:
+            path: Path of the YAML file to load
+            
+        Returns:
+            Parsed YAML document
+        """
+        st = path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        cache_dir = self.config_dir / ".cache"
+        cache_path = cache_dir / f"{hashlib.sha1(str(path).encode('utf-8')).hexdigest()}.pkl"
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_key, data = pickle.load(f)
+            if cached_key == key:
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable config cache {cache_path}: {str(e)}")
+        
+        with open(path, encoding="utf-8") as f:
+            data = yaml.load(f, Loader=Loader)
+        
+        # Write the cache atomically; failure here is never fatal
+        try:
+            cache_dir.mkdir(exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Could not write config cache {cache_path}: {str(e)}")
+        
+        return data
+    
     def _merge_configs(self, base: Dict, overlay: Dict) -> None:
         """
-        Recursively merge two configuration dictionaries.
+        Merge two configuration dictionaries, descending into nested dicts.
+        
+        Walks the nesting with an explicit stack rather than recursion. YAML
+        safe loading only produces plain dicts, so exact type checks suffice.
         
         Args:
             base: Base configuration to merge into
             overlay: Configuration to merge from
         """
-        for key, value in overlay.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                self._merge_configs(base[key], value)
-            else:
-                base[key] = value
+        stack = [(base, overlay)]
+        while stack:
+            base_dict, overlay_dict = stack.pop()
+            for key, value in overlay_dict.items():
+                base_value = base_dict.get(key)
+                if type(base_value) is dict and type(value) is dict:
+                    stack.append((base_value, value))
+                else:
+                    base_dict[key] = value
+    
+    @staticmethod
+    def _hash_config(config: Any) -> bytes:
+        """Compute a content hash of a configuration dictionary."""
+        return hashlib.blake2b(pickle.dumps(config, protocol=5)).digest()
     
     def _create_typed_configs(self) -> None:
-        """Create typed configuration objects from raw dictionary."""
-        self.system = SystemConfig(**self._config['system'])
-        self.mapping = MappingConfig(**self._config['mapping'])
-        self.navigation = NavigationConfig(**self._config['navigation'])
-        self.hardware = HardwareConfig(**self._config['hardware'])
-        self.safety = SafetyConfig(**self._config['safety'])
-        self.web = WebConfig(**self._config['web'])
-        self.processing = ProcessingConfig(**self._config['processing'])
+        """
+        Create typed configuration objects from raw dictionary.
+        
+        Nothing is rebuilt if the merged configuration is unchanged since the
+        last build, and otherwise only sections whose contents changed are.
+        """
+        config_hash = self._hash_config(self._config)
+        if config_hash == self._config_hash:
+            return
+        
+        section_hashes = {}
+        for section, config_cls in self._TYPED_SECTIONS:
+            section_hash = self._hash_config(self._config[section])
+            if self._section_hashes.get(section) != section_hash:
+                setattr(self, section, config_cls(**self._config[section]))
+            section_hashes[section] = section_hash
+        
+        self._section_hashes = section_hashes
+        self._config_hash = config_hash
+    
+    def reload(self) -> None:
+        """Reload configuration files, rebuilding only changed sections."""
+        self._load_config()
     
     def validate(self) -> bool:
         """
@@ -200,12 +404,22 @@ class ConfigManager:
         """Save current configuration as user configuration."""
         try:
             user_path = self.config_dir / "config.yaml"
-            with open(user_path, 'w') as f:
-                yaml.safe_dump(self._config, f, default_flow_style=False)
+            with open(user_path, 'w', encoding="utf-8") as f:
+                yaml.dump(self._config, f, Dumper=Dumper, default_flow_style=False)
+            self.invalidate()
             logger.info(f"User configuration saved to {user_path}")
         except Exception as e:
             logger.error(f"Error saving user configuration: {str(e)}", exc_info=True)
     
-    def get_raw_config(self) -> Dict[str, Any]:
-        """Get the raw configuration dictionary."""
-        return self._config.copy() 
\ No newline at end of file
+    def get_raw_config(self) -> Mapping[str, Any]:
+        """
+        Get a read-only view of the raw configuration dictionary.
+        
+        The view is not a copy; wrap it in dict() or use get_raw_config_copy()
+        if the result needs to be modified.
+        """
+        return self._config_view
+    
+    def get_raw_config_copy(self) -> Dict[str, Any]:
+        """Get an independent deep copy of the raw configuration dictionary."""
+        return copy.deepcopy(self._config) 
\ No newline at end of file
@@ -8,26 +8,45 @@ all subsystems including sensors, navigation, voice commands, and ChatGPT integr
 
 import os
 import time
+import heapq
+import queue
 import signal
 import sys
 import logging
 import logging.handlers
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, List, Any, TYPE_CHECKING
 from dataclasses import dataclass
 
 from modules.mapping_module import OccupancyGrid, RobotPose
 from modules.navigation_module import NavigationController
-from modules.voice_command_handler import VoiceCommandHandler
-from modules.chatgpt_integration import ChatGPTClient
 from modules.sensor_module import SensorModule
 from modules.system_monitor import SystemMonitor, SystemStatus
 
+if TYPE_CHECKING:
+    # Imported lazily at construction time to keep startup light
+    from modules.voice_command_handler import VoiceCommandHandler
+    from modules.chatgpt_integration import ChatGPTClient
+
+# Background listener that performs the actual log I/O
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
 # Configure logging
 def setup_logging() -> None:
-    """Configure the logging system with both file and console handlers."""
+    """
+    Configure the logging system with both file and console handlers.
+    
+    Records are put on a queue by the root logger and written out by a
+    background QueueListener, so callers never block on console or disk I/O.
+    """
+    global _log_listener
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
     
+    # No formatter uses thread or process fields; skip collecting them per record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
@@ -44,14 +63,77 @@ def setup_logging() -> None:
     file_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(file_format)
     
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Route records through a queue to the real handlers
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+
+def stop_logging() -> None:
+    """Flush pending log records and stop the background listener."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
 
 # Initialize logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+class _RateLimitedLogger:
+    """
+    Logs repeated exceptions with a full traceback at most once per interval.
+    
+    Errors are keyed by context and exception type; occurrences inside the
+    interval are only counted and reported with the next logged occurrence.
+    """
+    
+    def __init__(self, log: logging.Logger, interval: float = 5.0) -> None:
+        """
+        Initialize the rate-limited logger.
+        
+        Args:
+            log: Logger to emit records to
+            interval: Minimum seconds between tracebacks for the same error
+        """
+        self._log = log
+        self._interval = interval
+        # (context, exception type) -> [last logged monotonic time, suppressed count]
+        self._state: Dict[Tuple[str, type], List] = {}
+    
+    def error(self, context: str, exc: BaseException) -> None:
+        """
+        Log an exception unless the same error was logged recently.
+        
+        Args:
+            context: Short description of where the error happened
+            exc: The exception being handled
+        """
+        key = (context, type(exc))
+        now = time.monotonic()
+        state = self._state.get(key)
+        if state is not None and now - state[0] < self._interval:
+            state[1] += 1
+            return
+        
+        suppressed = state[1] if state is not None else 0
+        self._state[key] = [now, 0]
+        if suppressed:
+            self._log.error("%s: %s (%d similar errors suppressed)", context, exc, suppressed, exc_info=exc)
+        else:
+            self._log.error("%s: %s", context, exc, exc_info=exc)
+
+_error_log = _RateLimitedLogger(logger)
+
+# Safety thresholds, bound once so the control loop avoids class attribute lookups
+_BATT_WARN = SystemMonitor.BATTERY_WARNING_VOLTAGE
+_BATT_CRIT = SystemMonitor.BATTERY_CRITICAL_VOLTAGE
+_CPU_TEMP_WARN = SystemMonitor.CPU_TEMP_WARNING
+_CPU_TEMP_CRIT = SystemMonitor.CPU_TEMP_CRITICAL
+_CPU_USAGE_WARN = SystemMonitor.CPU_USAGE_WARNING
+
 class RobotSystem:
     """
     Main robot control system that integrates all subsystems and manages the robot's operation.
@@ -64,6 +146,10 @@ class RobotSystem:
     - Ensuring safe operation through system monitoring
     """
     
+    # Minimum seconds between ChatGPT requests made from the sensor loop
+    SENSOR_BATCH_INTERVAL = 1.0
+    IMAGE_ANALYSIS_INTERVAL = 1.0
+    
     def __init__(self) -> None:
         """Initialize the complete robot system."""
         logger.info("Initializing robot system...")
@@ -73,6 +159,17 @@ class RobotSystem:
         self.autonomous_mode: bool = False
         self.emergency_stop_triggered: bool = False
         
+        # Most recent (monotonic timestamp, status) pair, see _cached_status
+        self._status_cache: Optional[Tuple[float, SystemStatus]] = None
+        
+        # Sensor readings buffered for the next batched ChatGPT request
+        self._sensor_batch: List[Dict[str, float]] = []
+        self._last_sensor_flush: float = 0.0
+        # Whether the last reading was within obstacle range; a batch is
+        # flushed early only when an obstacle first appears
+        self._obstacle_in_range: bool = False
+        self._last_image_analysis: float = 0.0
+        
         # Initialize system monitor first for safety
         self.system_monitor: SystemMonitor = SystemMonitor(
             emergency_stop_callback=self._handle_emergency_stop
@@ -88,16 +185,18 @@ class RobotSystem:
         self.sensors: SensorModule = SensorModule()
         
         # Initialize voice commands with emergency stop
-        self.voice_handler: VoiceCommandHandler = VoiceCommandHandler(
+        from modules.voice_command_handler import VoiceCommandHandler
+        self.voice_handler: 'VoiceCommandHandler' = VoiceCommandHandler(
             navigation=self.nav,
             emergency_stop_callback=self._handle_emergency_stop
         )
         
         # Initialize ChatGPT if API key is available
-        self.chatgpt: Optional[ChatGPTClient] = None
+        self.chatgpt: Optional['ChatGPTClient'] = None
         api_key = os.getenv('OPENAI_API_KEY')
         if api_key:
             try:
+                from modules.chatgpt_integration import ChatGPTClient
                 self.chatgpt = ChatGPTClient(api_key)
                 logger.info("ChatGPT integration initialized successfully")
             except Exception as e:
@@ -132,9 +231,9 @@ class RobotSystem:
             
             # If the emergency was triggered by a critical system condition,
             # initiate shutdown
-            current_status = self.system_monitor.get_current_status()
-            if (current_status.battery_voltage <= SystemMonitor.BATTERY_CRITICAL_VOLTAGE or
-                current_status.cpu_temperature >= SystemMonitor.CPU_TEMP_CRITICAL):
+            current_status = self._cached_status()
+            if (current_status.battery_voltage <= _BATT_CRIT or
+                current_status.cpu_temperature >= _CPU_TEMP_CRIT):
                 logger.critical("Critical system condition detected - initiating shutdown")
                 self.shutdown()
                 
@@ -184,15 +283,15 @@ class RobotSystem:
         Returns:
             bool: True if safe to start, False otherwise
         """
-        if status.battery_voltage <= SystemMonitor.BATTERY_WARNING_VOLTAGE:
+        if status.battery_voltage <= _BATT_WARN:
             logger.error(f"Battery voltage too low to start: {status.battery_voltage:.1f}V")
             return False
             
-        if status.cpu_temperature >= SystemMonitor.CPU_TEMP_WARNING:
+        if status.cpu_temperature >= _CPU_TEMP_WARN:
             logger.error(f"CPU temperature too high to start: {status.cpu_temperature:.1f}°C")
             return False
             
-        if status.cpu_usage >= SystemMonitor.CPU_USAGE_WARNING:
+        if status.cpu_usage >= _CPU_USAGE_WARN:
             logger.error(f"CPU usage too high to start: {status.cpu_usage:.1f}%")
             return False
             
@@ -207,41 +306,87 @@ class RobotSystem:
         - Autonomous exploration
         - System monitoring
         - Safety checks
+        
+        Periodic tasks are kept in a heap ordered by their next monotonic
+        deadline, and the loop sleeps until the earliest one is due.
         """
         logger.info("Entering main control loop")
         
-        last_sensor_update: float = 0
-        last_status_check: float = 0
-        sensor_update_interval: float = 0.1  # 10 Hz
-        status_check_interval: float = 1.0   # 1 Hz
+        # Entries are (deadline, order, interval, callback); order breaks ties
+        now = time.monotonic()
+        schedule = [
+            (now, 0, 0.1, self._update_sensors),   # 10 Hz
+            (now, 1, 1.0, self._status_tick),      # 1 Hz
+            (now, 2, 0.1, self._autonomous_tick),  # 10 Hz
+        ]
+        heapq.heapify(schedule)
         
+        # Supervise the scheduler: an error ends the inner loop, which is restarted
         while self.is_running:
             try:
-                current_time = time.time()
-                
-                # Regular sensor updates
-                if current_time - last_sensor_update >= sensor_update_interval:
-                    self._update_sensors()
-                    last_sensor_update = current_time
-                
-                # Regular system status check
-                if current_time - last_status_check >= status_check_interval:
-                    status = self.system_monitor.get_current_status()
-                    if not self._check_safe_to_continue(status):
-                        logger.warning("Unsafe conditions detected - pausing operation")
-                        self.autonomous_mode = False
-                    last_status_check = current_time
-                
-                # Autonomous exploration if enabled and safe
-                if self.autonomous_mode and not self.emergency_stop_triggered:
-                    self._autonomous_update()
-                
-                # Small sleep to prevent CPU overuse
-                time.sleep(0.01)
-                
+                self._run_schedule(schedule)
             except Exception as e:
-                logger.error(f"Error in main loop: {str(e)}", exc_info=True)
-                continue
+                _error_log.error("Error in main loop", e)
+
+    def _run_schedule(self, schedule: list) -> None:
+        """
+        Run scheduled tasks until the system stops.
+        
+        Exceptions propagate to the supervising _main_loop.
+        
+        Args:
+            schedule: Heap of (deadline, order, interval, callback) entries
+        """
+        # Bind loop-invariant lookups to locals; is_running is re-read since it changes
+        monotonic = time.monotonic
+        sleep = time.sleep
+        heapreplace = heapq.heapreplace
+        
+        while self.is_running:
+            deadline, order, interval, callback = schedule[0]
+            delay = deadline - monotonic()
+            if delay > 0:
+                sleep(delay)
+            
+            # Reschedule before running so a failing task cannot spin the loop;
+            # if we have fallen behind, skip the missed ticks
+            next_deadline = deadline + interval
+            now = monotonic()
+            if next_deadline < now:
+                next_deadline = now + interval
+            heapreplace(schedule, (next_deadline, order, interval, callback))
+            
+            callback()
+
+    def _status_tick(self) -> None:
+        """Check system status and pause autonomous operation if unsafe."""
+        status = self._cached_status()
+        if not self._check_safe_to_continue(status):
+            logger.warning("Unsafe conditions detected - pausing operation")
+            self.autonomous_mode = False
+
+    def _autonomous_tick(self) -> None:
+        """Run autonomous exploration if enabled and safe."""
+        if self.autonomous_mode and not self.emergency_stop_triggered:
+            self._autonomous_update()
+
+    def _cached_status(self, max_age: float = 0.1) -> SystemStatus:
+        """
+        Get the system status, reusing a recent reading within the same tick.
+        
+        Args:
+            max_age: Maximum age in seconds of a reusable reading
+            
+        Returns:
+            SystemStatus: Current system status
+        """
+        now = time.monotonic()
+        cache = self._status_cache
+        if cache is not None and now - cache[0] < max_age:
+            return cache[1]
+        status = self.system_monitor.get_current_status()
+        self._status_cache = (now, status)
+        return status
 
     def _check_safe_to_continue(self, status: SystemStatus) -> bool:
         """
@@ -256,10 +401,10 @@ class RobotSystem:
         if self.emergency_stop_triggered:
             return False
             
-        if status.battery_voltage <= SystemMonitor.BATTERY_WARNING_VOLTAGE:
+        if status.battery_voltage <= _BATT_WARN:
             return False
             
-        if status.cpu_temperature >= SystemMonitor.CPU_TEMP_WARNING:
+        if status.cpu_temperature >= _CPU_TEMP_WARN:
             return False
             
         return True
@@ -284,27 +429,41 @@ class RobotSystem:
                 self.grid.update_occupancy(distance, current_pose.theta, current_pose)
                 
                 # Check for obstacles
-                if distance < self.nav._min_obstacle_distance:
-                    logger.warning(f"Obstacle detected at distance: {distance:.2f}cm")
+                obstacle_detected = distance < self.nav._min_obstacle_distance
+                if obstacle_detected:
+                    logger.warning("Obstacle detected at distance: %.2fcm", distance)
                     self.nav.avoid_obstacle(distance, 0)  # Assuming obstacle is straight ahead
                 
-                # Get ChatGPT insights if available
+                obstacle_appeared = obstacle_detected and not self._obstacle_in_range
+                self._obstacle_in_range = obstacle_detected
+                
+                # Buffer readings for ChatGPT and send them in batches,
+                # flushing early when an obstacle shows up
                 if self.chatgpt:
-                    sensor_data: Dict[str, float] = {
+                    self._sensor_batch.append({
                         'proximity': distance,
                         'pose_x': current_pose.x,
                         'pose_y': current_pose.y,
                         'pose_theta': current_pose.theta
-                    }
-                    self.chatgpt.send_sensor_data(sensor_data)
+                    })
+                    now = time.monotonic()
+                    if obstacle_appeared or now - self._last_sensor_flush >= self.SENSOR_BATCH_INTERVAL:
+                        batch, self._sensor_batch = self._sensor_batch, []
+                        self._last_sensor_flush = now
+                        analysis = self.chatgpt.send_sensor_batch(batch)
+                        logger.info("ChatGPT sensor analysis: %s", analysis)
             
             # Capture and analyze camera image periodically
-            success, frame = self.sensors.capture_image()
-            if success and self.chatgpt:
-                self.chatgpt.send_image_for_analysis(frame)
+            if self.chatgpt:
+                now = time.monotonic()
+                if now - self._last_image_analysis >= self.IMAGE_ANALYSIS_INTERVAL:
+                    self._last_image_analysis = now
+                    success, frame = self.sensors.capture_image()
+                    if success:
+                        self.chatgpt.send_image_for_analysis(frame)
                 
         except Exception as e:
-            logger.error(f"Error updating sensors: {str(e)}", exc_info=True)
+            _error_log.error("Error updating sensors", e)
 
     def _autonomous_update(self) -> None:
         """
@@ -325,14 +484,14 @@ class RobotSystem:
                         explored_area_percentage=10.0,  # TODO: Calculate actual percentage
                         frontier_points=[frontier]
                     )
-                    logger.debug(f"Received exploration strategy: {strategy}")
+                    logger.debug("Received exploration strategy: %s", strategy)
                 
                 # Navigate to frontier
-                logger.info(f"Navigating to frontier at ({frontier[0]}, {frontier[1]})")
+                logger.info("Navigating to frontier at (%s, %s)", frontier[0], frontier[1])
                 self.nav.navigate_to_point(frontier[0], frontier[1])
                 
         except Exception as e:
-            logger.error(f"Error in autonomous update: {str(e)}", exc_info=True)
+            _error_log.error("Error in autonomous update", e)
 
     def toggle_autonomous_mode(self) -> None:
         """Toggle autonomous exploration mode on/off."""
@@ -376,14 +535,15 @@ class RobotSystem:
             self.voice_handler.stop_listening()
             self.nav.stop()
             
-            # Save final map state
-            self.grid.save_grid_to_file('final_map.json')
+            # Save final map state and wait for the background write
+            self.grid.save_grid_to_file('final_map.npz').result()
             logger.info("Final map state saved")
             
         except Exception as e:
             logger.error(f"Error during shutdown: {str(e)}", exc_info=True)
         
         logger.info("Shutdown complete")
+        stop_logging()
         sys.exit(0)
 
 def main() -> None:
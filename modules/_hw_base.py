@@ -0,0 +1,31 @@
+"""
+Shared PiCar-X hardware initialization for the robot modules.
+
+The sensor module and the navigation controller both drive the same
+PiCar-X board; bringing it up is done here once instead of in each module.
+"""
+
+import logging
+from os import geteuid
+from picarx import Picarx  # Import PiCar-X SDK
+
+logger = logging.getLogger(__name__)
+
+# Check for root privileges
+if geteuid() != 0:
+    print("\033[0;33mThe program needs to be run using sudo, otherwise hardware control may fail.\033[0m")
+
+class _HardwareInitMixin:
+    """Mixin for modules that talk to the PiCar-X board but must also run without it."""
+
+    def _init_picar(self) -> None:
+        """Initialize the PiCar-X hardware, leaving ``self.picar`` as None on failure."""
+        self.picar = None
+        try:
+            logger.debug("Attempting to initialize PiCar-X hardware...")
+            self.picar = Picarx()
+            logger.info("PiCar-X hardware initialized successfully")
+        except Exception as e:
+            logger.error("Failed to initialize PiCar-X hardware: %s", e)
+            logger.debug("Detailed hardware initialization error:", exc_info=True)
+            logger.warning("Hardware initialization failed - some functions may be limited")
@@ -0,0 +1,403 @@
+"""
+Numba-compiled kernels shared by the mapping module and worker processes.
+
+This module handles:
+- Bresenham ray tracing and in-place log-odds updates
+- A* search over occupancy grids
+- Frontier masks and connected-component labelling of grid masks
+
+Every kernel also runs as plain Python when Numba is not installed.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Optional: run the kernels as plain Python
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True)
+def bresenham_cells(x0: int, y0: int, x1: int, y1: int,
+                    width: int, height: int, out: np.ndarray) -> int:
+    """
+    Integer Bresenham line from (x0, y0) to (x1, y1).
+    
+    Writes the cells that fall inside a width x height grid into ``out``,
+    which needs room for max(width, height) + 1 rows.
+    
+    Returns:
+        int: Number of cells written
+    """
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    n = 0
+    while True:
+        if 0 <= x0 < width and 0 <= y0 < height:
+            out[n, 0] = x0
+            out[n, 1] = y0
+            n += 1
+        if x0 == x1 and y0 == y1:
+            break
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
+    return n
+
+@njit(cache=True)
+def raycast_update(grid: np.ndarray, x0: int, y0: int, x1: int, y1: int,
+                   free_lo: int, occ_lo: int, lo_min: int, lo_max: int) -> None:
+    """
+    Walk a Bresenham ray and apply the log-odds update to the grid in place.
+    
+    Every in-bounds cell on the ray gets ``free_lo`` added except the last
+    one, which gets ``occ_lo``. Additions saturate at [lo_min, lo_max]. No
+    intermediate cell arrays are created.
+    
+    Args:
+        grid: Fixed-point log-odds indexed as grid[y, x]
+        x0, y0: Ray start in grid cells
+        x1, y1: Ray end in grid cells
+        free_lo: Log-odds increment for free cells
+        occ_lo: Log-odds increment for the end cell
+        lo_min, lo_max: Saturation bounds
+    """
+    height, width = grid.shape
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    # The previous in-bounds cell is only known to be free once another follows it
+    px = -1
+    py = -1
+    while True:
+        if 0 <= x0 < width and 0 <= y0 < height:
+            if px >= 0:
+                grid[py, px] = max(lo_min, min(lo_max, grid[py, px] + free_lo))
+            px = x0
+            py = y0
+        if x0 == x1 and y0 == y1:
+            break
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
+    if px >= 0:
+        grid[py, px] = max(lo_min, min(lo_max, grid[py, px] + occ_lo))
+
+@njit(cache=True)
+def sweep_raycast(grid: np.ndarray, x: float, y: float, theta: float,
+                  distances: np.ndarray, angles: np.ndarray, inv_res: float,
+                  free_lo: int, occ_lo: int, lo_min: int, lo_max: int) -> None:
+    """
+    Trace a sweep of range readings taken from one pose into the grid.
+    
+    Each ray's end cell is computed in the kernel and the ray is applied
+    with raycast_update; readings with a non-finite distance or angle are
+    skipped. The kernel is serial on purpose: a parallel kernel starts
+    Numba's thread pool, and forking worker processes afterwards leaves the
+    parent unable to exit.
+    
+    Args:
+        grid: Fixed-point log-odds indexed as grid[y, x]
+        x, y: Robot position in cm
+        theta: Robot heading in radians
+        distances: Range readings in cm
+        angles: Reading angles in radians, relative to the robot
+        inv_res: Grid cells per cm
+        free_lo, occ_lo, lo_min, lo_max: As for raycast_update
+    """
+    x0 = math.floor(x * inv_res)
+    y0 = math.floor(y * inv_res)
+    for i in range(distances.shape[0]):
+        distance = distances[i]
+        angle = angles[i]
+        if not (math.isfinite(distance) and math.isfinite(angle)):
+            continue
+        heading = theta + angle
+        x1 = math.floor((x + distance * math.cos(heading)) * inv_res)
+        y1 = math.floor((y + distance * math.sin(heading)) * inv_res)
+        raycast_update(grid, x0, y0, x1, y1, free_lo, occ_lo, lo_min, lo_max)
+
+@njit(cache=True)
+def bulk_raycast(grid: np.ndarray, x0: int, y0: int, end_xs: np.ndarray, end_ys: np.ndarray,
+                 free_lo: int, occ_lo: int, lo_min: int, lo_max: int) -> None:
+    """
+    Apply raycast_update for a fan of rays sharing one start cell.
+    
+    Meant for worker processes, which compute end cells themselves; see
+    sweep_raycast for the polar variant.
+    """
+    for i in range(end_xs.shape[0]):
+        raycast_update(grid, x0, y0, end_xs[i], end_ys[i], free_lo, occ_lo, lo_min, lo_max)
+
+# 8-connected neighbour offsets as (dx, dy); the first four are axis-aligned
+_NEIGHBOURS = np.array([[1, 0], [-1, 0], [0, 1], [0, -1],
+                        [1, 1], [1, -1], [-1, 1], [-1, -1]], dtype=np.int32)
+
+_SQRT2 = math.sqrt(2.0)
+
+@njit(cache=True)
+def _octile(x: int, y: int, gx: int, gy: int) -> float:
+    """Octile distance, the exact cost of an unobstructed 8-connected path."""
+    dx = abs(x - gx)
+    dy = abs(y - gy)
+    return max(dx, dy) + (_SQRT2 - 1.0) * min(dx, dy)
+
+@njit(cache=True)
+def _heap_push(keys: np.ndarray, items: np.ndarray, size: int, key: float, item: int) -> int:
+    """Push onto a binary min-heap stored in flat arrays; returns the new size."""
+    i = size
+    keys[i] = key
+    items[i] = item
+    while i > 0:
+        parent = (i - 1) >> 1
+        if keys[parent] <= keys[i]:
+            break
+        keys[i], keys[parent] = keys[parent], keys[i]
+        items[i], items[parent] = items[parent], items[i]
+        i = parent
+    return size + 1
+
+@njit(cache=True)
+def _heap_pop(keys: np.ndarray, items: np.ndarray, size: int):
+    """Pop the smallest item from a flat-array min-heap; returns (item, new size)."""
+    item = items[0]
+    size -= 1
+    keys[0] = keys[size]
+    items[0] = items[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and keys[child + 1] < keys[child]:
+            child += 1
+        if keys[i] <= keys[child]:
+            break
+        keys[i], keys[child] = keys[child], keys[i]
+        items[i], items[child] = items[child], items[i]
+        i = child
+    return item, size
+
+def astar_workspace(num_cells: int):
+    """
+    Allocate scratch arrays for astar_grid_into.
+    
+    Args:
+        num_cells: Largest grid size, in cells, the workspace must handle
+        
+    Returns:
+        tuple: (g_score, came_from, closed, h_cache, keys, items)
+    """
+    # Each relaxation pushes at most once, and a cell relaxes at most 8 times
+    return (np.empty(num_cells, dtype=np.float64),
+            np.empty(num_cells, dtype=np.int32),
+            np.empty(num_cells, dtype=np.uint8),
+            np.empty(num_cells, dtype=np.float32),
+            np.empty(8 * num_cells + 1, dtype=np.float64),
+            np.empty(8 * num_cells + 1, dtype=np.int32))
+
+@njit(cache=True)
+def astar_grid(occ: np.ndarray, sx: int, sy: int, gx: int, gy: int) -> np.ndarray:
+    """
+    8-connected A* over a boolean occupancy grid.
+    
+    Diagonal moves may not cut the corner of a blocked cell.
+    
+    Args:
+        occ: Blocked cells indexed as occ[y, x]
+        sx, sy: Start cell
+        gx, gy: Goal cell
+        
+    Returns:
+        np.ndarray: (N, 2) int32 [x, y] cells from start to goal, empty if
+        the goal cannot be reached
+    """
+    n = occ.shape[0] * occ.shape[1]
+    return astar_grid_into(occ, sx, sy, gx, gy,
+                           np.empty(n, dtype=np.float64), np.empty(n, dtype=np.int32),
+                           np.empty(n, dtype=np.uint8), np.empty(n, dtype=np.float32),
+                           np.empty(8 * n + 1, dtype=np.float64), np.empty(8 * n + 1, dtype=np.int32))
+
+@njit(cache=True)
+def astar_grid_into(occ: np.ndarray, sx: int, sy: int, gx: int, gy: int,
+                    g_score: np.ndarray, came_from: np.ndarray, closed: np.ndarray,
+                    h_cache: np.ndarray, keys: np.ndarray, items: np.ndarray) -> np.ndarray:
+    """
+    astar_grid using caller-owned scratch arrays from astar_workspace.
+    
+    The scratch arrays may be larger than the grid and are reset here, so
+    one workspace serves any number of queries.
+    """
+    height, width = occ.shape
+    if not (0 <= sx < width and 0 <= sy < height and 0 <= gx < width and 0 <= gy < height):
+        return np.empty((0, 2), dtype=np.int32)
+    if occ[sy, sx] or occ[gy, gx]:
+        return np.empty((0, 2), dtype=np.int32)
+    
+    n = width * height
+    g_score[:n] = np.inf
+    came_from[:n] = -1
+    closed[:n] = 0
+    # Heuristic per cell, filled on first use; the goal is fixed per query
+    h_cache[:n] = -1.0
+    
+    start = sy * width + sx
+    goal = gy * width + gx
+    g_score[start] = 0.0
+    size = _heap_push(keys, items, 0, _octile(sx, sy, gx, gy), start)
+    
+    while size > 0:
+        current, size = _heap_pop(keys, items, size)
+        if current == goal:
+            break
+        if closed[current]:
+            continue
+        closed[current] = 1
+        cx = current % width
+        cy = current // width
+        for k in range(8):
+            dx = _NEIGHBOURS[k, 0]
+            dy = _NEIGHBOURS[k, 1]
+            nx = cx + dx
+            ny = cy + dy
+            if nx < 0 or nx >= width or ny < 0 or ny >= height or occ[ny, nx]:
+                continue
+            if dx != 0 and dy != 0 and (occ[cy, nx] or occ[ny, cx]):
+                continue
+            neighbour = ny * width + nx
+            if closed[neighbour]:
+                continue
+            candidate = g_score[current] + (1.0 if k < 4 else _SQRT2)
+            if candidate < g_score[neighbour]:
+                g_score[neighbour] = candidate
+                came_from[neighbour] = current
+                if h_cache[neighbour] < 0:
+                    h_cache[neighbour] = _octile(nx, ny, gx, gy)
+                size = _heap_push(keys, items, size, candidate + h_cache[neighbour], neighbour)
+    
+    if goal != start and came_from[goal] == -1:
+        return np.empty((0, 2), dtype=np.int32)
+    
+    # Walk back from the goal to size and fill the path
+    length = 1
+    node = goal
+    while node != start:
+        node = came_from[node]
+        length += 1
+    path = np.empty((length, 2), dtype=np.int32)
+    node = goal
+    for i in range(length - 1, -1, -1):
+        path[i, 0] = node % width
+        path[i, 1] = node // width
+        node = came_from[node]
+    return path
+
+@njit(cache=True)
+def frontier_mask(grid: np.ndarray, unknown_thr: int, free_thr: int, out: np.ndarray) -> np.ndarray:
+    """
+    Mark the interior cells that are free and have an unknown 4-neighbour.
+    
+    One branch-free pass over the grid. |v| < unknown_thr is tested as the
+    single unsigned compare (v + unknown_thr - 1) < 2 * unknown_thr - 1,
+    which lets the loop vectorize.
+    
+    Args:
+        grid: Fixed-point log-odds indexed as grid[y, x]
+        unknown_thr: Cells with |log-odds| below this are unknown
+        free_thr: Cells with log-odds below this are free
+        out: Boolean (H - 2, W - 2) output; out[y, x] is grid cell (x + 1, y + 1)
+    
+    Returns:
+        np.ndarray: ``out``
+    """
+    height, width = grid.shape
+    offset = np.int32(unknown_thr - 1)
+    span = np.uint32(2 * unknown_thr - 1)
+    for y in range(1, height - 1):
+        up = grid[y - 1]
+        row = grid[y]
+        down = grid[y + 1]
+        out_row = out[y - 1]
+        for x in range(1, width - 1):
+            unknown_up = np.uint32(np.int32(up[x]) + offset) < span
+            unknown_down = np.uint32(np.int32(down[x]) + offset) < span
+            unknown_left = np.uint32(np.int32(row[x - 1]) + offset) < span
+            unknown_right = np.uint32(np.int32(row[x + 1]) + offset) < span
+            out_row[x - 1] = (row[x] < free_thr) & (unknown_up | unknown_down |
+                                                    unknown_left | unknown_right)
+    return out
+
+@njit(cache=True)
+def label_components(mask: np.ndarray, labels: np.ndarray, stack: np.ndarray) -> int:
+    """
+    Label the 8-connected components of a boolean mask.
+    
+    Args:
+        mask: Boolean grid indexed as mask[y, x]
+        labels: int32 output of mask's shape; 0 off the mask, 1..n on it
+        stack: int64 scratch with room for mask.size flat indices
+    
+    Returns:
+        int: Number of components n
+    """
+    height, width = mask.shape
+    flat_mask = mask.ravel()
+    flat_labels = labels.ravel()
+    flat_labels[:] = 0
+    n = 0
+    for seed in range(flat_mask.shape[0]):
+        if not flat_mask[seed] or flat_labels[seed] != 0:
+            continue
+        n += 1
+        flat_labels[seed] = n
+        stack[0] = seed
+        size = 1
+        while size > 0:
+            size -= 1
+            current = stack[size]
+            cx = current % width
+            cy = current // width
+            for k in range(8):
+                nx = cx + _NEIGHBOURS[k, 0]
+                ny = cy + _NEIGHBOURS[k, 1]
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                neighbour = ny * width + nx
+                if flat_mask[neighbour] and flat_labels[neighbour] == 0:
+                    flat_labels[neighbour] = n
+                    stack[size] = neighbour
+                    size += 1
+    return n
+
+def warm_up() -> None:
+    """
+    Compile, or load from Numba's cache, the kernels used by worker processes.
+    
+    Every kernel is serial, so this never starts Numba's thread pool and
+    workers can still be forked afterwards.
+    """
+    grid = np.zeros((4, 4), dtype=np.int16)
+    sweep_raycast(grid, 0.5, 0.5, 0.0, np.array([2.0]), np.array([0.0]), 1.0, -1, 1, -10, 10)
+    bresenham_cells(0, 0, 3, 3, 4, 4, np.empty((5, 2), dtype=np.int32))
+    raycast_update(grid, 0, 0, 3, 3, -1, 1, -10, 10)
+    bulk_raycast(grid, 0, 0, np.array([3], dtype=np.int64), np.array([3], dtype=np.int64), -1, 1, -10, 10)
+    occ = np.zeros((4, 4), dtype=np.bool_)
+    astar_grid(occ, 0, 0, 3, 3)
+    astar_grid_into(occ, 0, 0, 3, 3, *astar_workspace(16))
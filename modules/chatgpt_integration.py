@@ -1,58 +1,526 @@
 """
 ChatGPT Integration Module for PiCar-X Robot
 Handles interactions with OpenAI's ChatGPT API for intelligent responses and analysis.
+
+All API calls are asynchronous and run on a background event loop owned by the
+client, so independent prompts can be in flight at the same time. Every public
+method has an ``*_async`` coroutine variant and a blocking wrapper with the
+original name for synchronous callers.
 """
 
 import os
+import re
+import json
 import base64
+import hashlib
 import time
-from typing import Optional, Dict, List, Any, Tuple
-import requests
-from openai import OpenAI
-import cv2
+import random
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, Tuple, Coroutine, Mapping, Deque, AsyncIterator, Callable, TYPE_CHECKING
 import numpy as np
 
+if TYPE_CHECKING:
+    # The SDK is imported lazily in ChatGPTClient.__init__ to keep startup light
+    from openai import AsyncOpenAI
+
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:  # Optional: fall back to OpenCV's encoder
+    TurboJPEG = None
+
+try:
+    # SIMD (SSSE3/AVX2/NEON) base64 encoder
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:  # Optional: fall back to the standard library
+    def _b64encode_str(data: Any) -> str:
+        return base64.b64encode(data).decode('ascii')
+
+# JPEG quality for camera frames sent for analysis
+JPEG_QUALITY = 75
+
+# Longest side of frames sent for analysis; larger frames are downscaled
+MAX_IMAGE_SIDE = 768
+
+# Prefix of the data URL carrying an encoded frame
+_JPEG_DATA_URL_PREFIX = "data:image/jpeg;base64,"
+
+# Longest pause between retries, in seconds
+MAX_BACKOFF = 30.0
+
+# Consecutive 429s after which the request rate is halved
+RATE_LIMIT_STREAK = 3
+
+# Factor by which each successful response lifts a throttled rate back
+# towards the server-reported limit
+RATE_RECOVERY = 1.05
+
+# Words in streamed navigation advice that call for an immediate stop
+STOP_KEYWORDS = ("stop", "obstacle")
+
+@dataclass
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+    
+    Allows bursts of up to ``capacity`` units while limiting the long-term
+    rate to ``refill_rate`` units per second.
+    """
+    capacity: float
+    refill_rate: float  # Units per second, with throttle_factor applied
+    tokens: Optional[float] = None  # Starts full when not given
+    last_refill: float = field(default_factory=time.monotonic)
+    throttle_factor: float = 1.0  # Fraction of the limit currently allowed
+    
+    def __post_init__(self) -> None:
+        if self.tokens is None:
+            self.tokens = self.capacity
+    
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last refill."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+    
+    async def acquire(self, cost: float = 1.0) -> None:
+        """
+        Wait until ``cost`` tokens are available and take them.
+        
+        Args:
+            cost: Number of tokens to take, capped at the bucket capacity
+        """
+        cost = min(cost, self.capacity)
+        self._refill()
+        while self.tokens < cost:
+            await asyncio.sleep((cost - self.tokens) / self.refill_rate)
+            self._refill()
+        self.tokens -= cost
+    
+    def set_limit(self, per_minute: float) -> None:
+        """Retune the bucket to a new per-minute limit, keeping any throttling."""
+        self._refill()
+        self.capacity = per_minute
+        self.refill_rate = per_minute / 60.0 * self.throttle_factor
+        self.tokens = min(self.tokens, self.capacity)
+    
+    def set_remaining(self, remaining: float) -> None:
+        """Clamp the available tokens to a server-reported remaining budget."""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+    
+    def throttle(self, factor: float = 0.5) -> None:
+        """Scale down the refill rate, e.g. after repeated rate-limit errors."""
+        self._refill()
+        self.throttle_factor *= factor
+        self.refill_rate *= factor
+    
+    def recover(self, step: float = RATE_RECOVERY) -> None:
+        """Scale a throttled refill rate back up, never past the limit."""
+        if self.throttle_factor >= 1.0:
+            return
+        self._refill()
+        factor = min(1.0, self.throttle_factor * step)
+        self.refill_rate *= factor / self.throttle_factor
+        self.throttle_factor = factor
+
+class BatchSubmitter:
+    """
+    Submits prompts through the OpenAI Batch API.
+    
+    Batched requests are billed at a lower rate and have separate rate limits,
+    at the cost of results arriving asynchronously within 24 hours. Suitable
+    for analyses that do not need an immediate answer.
+    """
+    
+    def __init__(self, client: "AsyncOpenAI", system_prompt: str,
+                 model: str = "gpt-4", max_tokens: int = 150) -> None:
+        """
+        Initialize the batch submitter.
+        
+        Args:
+            client: Async OpenAI client used for uploads and batch calls
+            system_prompt: System prompt sent with every request
+            model: Chat model to use
+            max_tokens: Maximum tokens per response
+        """
+        self._client = client
+        self._system_prompt = system_prompt
+        self._model = model
+        self._max_tokens = max_tokens
+        
+        # Prompts queued for the next submission, keyed by custom id
+        self._pending: Dict[str, str] = {}
+        self._next_id = 0
+    
+    def add(self, prompt: str) -> str:
+        """
+        Queue a prompt for the next batch submission.
+        
+        Args:
+            prompt: Message to send
+            
+        Returns:
+            str: Custom id identifying the prompt's result
+        """
+        custom_id = f"request-{self._next_id}"
+        self._next_id += 1
+        self._pending[custom_id] = prompt
+        return custom_id
+    
+    @property
+    def pending_count(self) -> int:
+        """Number of prompts waiting to be submitted."""
+        return len(self._pending)
+    
+    async def submit(self, prompts: Optional[List[str]] = None) -> str:
+        """
+        Upload prompts as a JSONL file and create a batch for them.
+        
+        Args:
+            prompts: Prompts to submit; the queued prompts are submitted if omitted
+            
+        Returns:
+            str: Id of the created batch
+        """
+        if prompts is None:
+            requests_by_id, self._pending = self._pending, {}
+        else:
+            requests_by_id = {}
+            for prompt in prompts:
+                requests_by_id[f"request-{self._next_id}"] = prompt
+                self._next_id += 1
+        if not requests_by_id:
+            raise ValueError("No prompts to submit")
+        
+        lines = []
+        for custom_id, prompt in requests_by_id.items():
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self._model,
+                    "messages": [
+                        {"role": "system", "content": self._system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "max_tokens": self._max_tokens
+                }
+            }))
+        
+        input_file = await self._client.files.create(
+            file=("batch.jsonl", ("\n".join(lines) + "\n").encode('utf-8')),
+            purpose="batch"
+        )
+        batch = await self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+    
+    async def await_results(self, batch_id: str, poll_interval: float = 30.0) -> Dict[str, str]:
+        """
+        Wait for a batch to finish and collect its responses.
+        
+        Args:
+            batch_id: Id returned by submit()
+            poll_interval: Seconds between status checks
+            
+        Returns:
+            Dict[str, str]: Response text keyed by custom id
+        """
+        while True:
+            batch = await self._client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+            await asyncio.sleep(poll_interval)
+        
+        output = await self._client.files.content(batch.output_file_id)
+        results = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        return results
+
+class ResponseCache:
+    """
+    Two-tier cache of chat responses.
+    
+    Exact matches are looked up by a hash of the system prompt and message.
+    Near-duplicates are found by cosine similarity between prompt embeddings.
+    Both tiers hold at most ``max_entries`` responses.
+    """
+    
+    def __init__(self, max_entries: int = 256, similarity_threshold: float = 0.95) -> None:
+        """
+        Initialize the response cache.
+        
+        Args:
+            max_entries: Maximum number of responses kept per tier
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self._max_entries = max_entries
+        self._similarity_threshold = similarity_threshold
+        
+        # Exact tier: LRU of prompt hash -> response
+        self._exact: "OrderedDict[bytes, str]" = OrderedDict()
+        
+        # Semantic tier: ring buffer of unit-length embeddings and their responses
+        self._embeddings: Optional[np.ndarray] = None
+        self._responses: List[Optional[str]] = [None] * max_entries
+        self._count = 0
+        self._next = 0
+    
+    @staticmethod
+    def key(system_prompt: str, message: str) -> bytes:
+        """Compute the exact-match key for a prompt."""
+        return hashlib.sha1((system_prompt + message).encode('utf-8')).digest()
+    
+    def get_exact(self, key: bytes) -> Optional[str]:
+        """Look up a response by exact prompt key."""
+        response = self._exact.get(key)
+        if response is not None:
+            self._exact.move_to_end(key)
+        return response
+    
+    def put_exact(self, key: bytes, response: str) -> None:
+        """Store a response under an exact prompt key."""
+        self._exact[key] = response
+        self._exact.move_to_end(key)
+        if len(self._exact) > self._max_entries:
+            self._exact.popitem(last=False)
+    
+    def get_similar(self, embedding: np.ndarray) -> Optional[str]:
+        """Look up the response of the most similar cached prompt, if close enough."""
+        if self._count == 0:
+            return None
+        query = embedding / np.linalg.norm(embedding)
+        similarities = self._embeddings[:self._count] @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] > self._similarity_threshold:
+            return self._responses[best]
+        return None
+    
+    def put_similar(self, embedding: np.ndarray, response: str) -> None:
+        """Store a response under a prompt embedding, replacing the oldest when full."""
+        if self._embeddings is None:
+            self._embeddings = np.empty((self._max_entries, embedding.shape[0]), dtype=np.float32)
+        self._embeddings[self._next] = embedding / np.linalg.norm(embedding)
+        self._responses[self._next] = response
+        self._next = (self._next + 1) % self._max_entries
+        self._count = min(self._count + 1, self._max_entries)
+
+def _import_openai() -> Any:
+    """Import the OpenAI SDK on first use; it pulls in httpx and pydantic."""
+    try:
+        import openai
+    except ImportError as e:
+        raise ImportError("ChatGPTClient requires the openai package (pip install openai)") from e
+    return openai
+
 class ChatGPTClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 4,
+                 requests_per_minute: int = 20, tokens_per_minute: int = 10000,
+                 coalesce_window_ms: float = 200, coalesce_max_prompts: int = 5,
+                 semantic_cache: bool = False,
+                 max_attempts: int = 5, request_timeout: float = 15.0):
         """
         Initialize the ChatGPT client.
         
         Args:
             api_key: OpenAI API key (optional, can be set via environment variable)
+            max_concurrency: Maximum number of API requests in flight at once
+            requests_per_minute: Initial request rate limit
+            tokens_per_minute: Initial token rate limit
+            coalesce_window_ms: How long sensor analyses wait to share a request
+            coalesce_max_prompts: Number of pending analyses that triggers a request
+            semantic_cache: Also reuse responses of similar prompts (one embedding call per miss)
+            max_attempts: Attempts per request before a transient error is given up on
+            request_timeout: Timeout of a single API request in seconds
         """
         self._api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self._api_key:
             raise ValueError("OpenAI API key must be provided or set in OPENAI_API_KEY environment variable")
             
-        self._client = OpenAI(api_key=self._api_key)
+        openai = _import_openai()
+        
+        # Retries are handled here, with backoff shared with the rate limiters
+        self._client = openai.AsyncOpenAI(api_key=self._api_key, max_retries=0)
+        # Errors worth retrying: 429s, 5xx responses, and network failures or timeouts
+        self._retryable_errors = (openai.RateLimitError, openai.APIConnectionError,
+                                  openai.APITimeoutError, openai.InternalServerError)
+        self._rate_limit_error = openai.RateLimitError
+        self._max_attempts = max_attempts
+        self._request_timeout = request_timeout
+        self._rate_limit_streak = 0
+        
+        # Concurrency settings; the semaphore is created on the loop
+        self._max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
-        # Rate limiting settings
-        self._last_request_time = 0
-        self._min_request_interval = 1.0  # Minimum seconds between requests
+        # Background event loop that runs all API calls, keeping the client's
+        # connection pool on a single loop across calls
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            daemon=True,
+            name="ChatGPTClientLoop"
+        )
+        self._loop_thread.start()
+        
+        # Rate limiting: request and token buckets, retuned from response headers
+        self._request_bucket = TokenBucket(capacity=requests_per_minute,
+                                           refill_rate=requests_per_minute / 60.0)
+        self._token_bucket = TokenBucket(capacity=tokens_per_minute,
+                                         refill_rate=tokens_per_minute / 60.0)
         
         # Context management
-        self._conversation_history: List[Dict[str, str]] = []
+        # Bounded deque: appending past the limit evicts the oldest turns
         self._max_history_length = 10
+        self._conversation_history: Deque[Dict[str, str]] = deque(maxlen=self._max_history_length * 2)
         
         # Response templates
         self._system_prompt = """You are an AI assistant for a PiCar-X robot. 
         You help interpret sensor data, provide navigation suggestions, and explain the robot's behavior.
         Keep responses concise and focused on the robot's operation."""
+        # Built once and shared by every request; never mutated
+        self._system_msg = {"role": "system", "content": self._system_prompt}
+        
+        # libjpeg-turbo encoder with a reusable output buffer, if available
+        self._jpeg = None
+        self._enc_buf: Optional[bytearray] = None
+        self._enc_shape: Optional[Tuple[int, ...]] = None
+        self._resize_buf: Optional[np.ndarray] = None
+        if TurboJPEG is not None:
+            try:
+                self._jpeg = TurboJPEG()
+            except Exception as e:
+                print(f"TurboJPEG unavailable, using OpenCV encoder: {e}")
+        
+        # Batch API path for analyses that can wait
+        self._batch_submitter = BatchSubmitter(self._client, self._system_prompt)
+        
+        # Sensor analyses waiting to be coalesced into a single request
+        self._coalesce_window = coalesce_window_ms / 1000.0
+        self._coalesce_max_prompts = coalesce_max_prompts
+        self._coalesce_pending: List[Tuple[str, asyncio.Future]] = []
+        self._coalesce_timer: Optional[asyncio.TimerHandle] = None
+        
+        # Response caching for repeated prompts
+        self._response_cache = ResponseCache()
+        self._semantic_cache = semantic_cache
+
+    def _run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Run a coroutine on the client's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        """Close the API client and stop the background event loop."""
+        if not self._loop.is_running():
+            return
+        self._run(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=1.0)
 
-    def send_sensor_data(self, sensor_data: Dict[str, Any]) -> str:
+    def send_sensor_data(self, sensor_data: Dict[str, Any], batch: bool = False) -> str:
         """
         Send sensor data to ChatGPT for analysis.
         
         Args:
             sensor_data: Dictionary containing sensor readings
+            batch: Queue the analysis for the Batch API instead of sending it now
             
         Returns:
-            str: ChatGPT's analysis and commentary
+            str: ChatGPT's analysis and commentary, or the custom id of the
+                queued request when batch is True
+        """
+        # A blocking caller has nothing to share the coalescing window with
+        return self._run(self.send_sensor_data_async(sensor_data, batch, coalesce=False))
+
+    async def send_sensor_data_async(self, sensor_data: Dict[str, Any], batch: bool = False,
+                                     coalesce: bool = True) -> str:
+        """
+        Coroutine variant of send_sensor_data.
+        
+        With coalesce, analyses arriving within the coalescing window share
+        one request.
         """
         # Format sensor data into a prompt
         prompt = self._format_sensor_data(sensor_data)
         
-        return self._send_message(prompt)
+        if batch:
+            return self._batch_submitter.add(prompt)
+        if coalesce:
+            return await self._send_coalesced(prompt)
+        return await self._send_message_async(prompt, stateless=True)
+
+    def submit_batch(self) -> str:
+        """
+        Submit all queued batch analyses to the Batch API.
+        
+        Returns:
+            str: Id of the created batch
+        """
+        return self._run(self._batch_submitter.submit())
+
+    def get_batch_results(self, batch_id: str, poll_interval: float = 30.0) -> Dict[str, str]:
+        """
+        Wait for a submitted batch and return its responses.
+        
+        Args:
+            batch_id: Id returned by submit_batch()
+            poll_interval: Seconds between status checks
+            
+        Returns:
+            Dict[str, str]: Response text keyed by the custom ids from send_sensor_data
+        """
+        return self._run(self._batch_submitter.await_results(batch_id, poll_interval))
+
+    def send_sensor_batch(self, readings: List[Dict[str, Any]]) -> str:
+        """
+        Send several sensor readings to ChatGPT in a single request.
+        
+        Args:
+            readings: List of sensor reading dictionaries, oldest first
+            
+        Returns:
+            str: ChatGPT's analysis and commentary
+        """
+        return self._run(self.send_sensor_batch_async(readings, coalesce=False))
+
+    async def send_sensor_batch_async(self, readings: List[Dict[str, Any]], coalesce: bool = True) -> str:
+        """Coroutine variant of send_sensor_batch; coalesce applies to a single reading."""
+        if not readings:
+            return ""
+        if len(readings) == 1:
+            return await self.send_sensor_data_async(readings[0], coalesce=coalesce)
+            
+        return await self._send_message_async(self._format_sensor_batch(readings), stateless=True)
+
+    def send_many(self, prompts: List[str]) -> List[str]:
+        """
+        Send several independent prompts concurrently.
+        
+        Args:
+            prompts: Messages to send
+            
+        Returns:
+            List[str]: Responses in the same order as the prompts
+        """
+        return self._run(self.send_many_async(prompts))
+
+    async def send_many_async(self, prompts: List[str]) -> List[str]:
+        """Coroutine variant of send_many."""
+        return list(await asyncio.gather(*(self._send_message_async(p) for p in prompts)))
 
     def send_image_for_analysis(self, image: np.ndarray) -> str:
         """
@@ -64,13 +532,16 @@ class ChatGPTClient:
         Returns:
             str: ChatGPT's analysis of the image
         """
-        # Convert image to base64
-        _, buffer = cv2.imencode('.jpg', image)
-        image_base64 = base64.b64encode(buffer).decode('utf-8')
+        return self._run(self.send_image_for_analysis_async(image))
+
+    async def send_image_for_analysis_async(self, image: np.ndarray) -> str:
+        """Coroutine variant of send_image_for_analysis."""
+        # Shrink to the analysis size, then convert to a base64 data URL
+        image_url = self._encode_image_data_url(self._downscale(image))
         
         # Create message with image
         messages = [
-            {"role": "system", "content": self._system_prompt},
+            self._system_msg,
             {
                 "role": "user",
                 "content": [
@@ -81,31 +552,65 @@ class ChatGPTClient:
                     },
                     {
                         "type": "image_url",
-                        "image_url": f"data:image/jpeg;base64,{image_base64}"
+                        "image_url": {"url": image_url, "detail": "low"}
                     }
                 ]
             }
         ]
         
         try:
-            # Respect rate limiting
-            self._wait_for_rate_limit()
-            
             # Make API call
-            response = self._client.chat.completions.create(
+            response = await self._create_completion(
                 model="gpt-4-vision-preview",
                 messages=messages,
                 max_tokens=300
             )
             
-            self._last_request_time = time.time()
             return response.choices[0].message.content
             
         except Exception as e:
             print(f"Error in image analysis: {e}")
             return "Error analyzing image"
 
-    def get_navigation_advice(self, 
+    def _downscale(self, image: np.ndarray) -> np.ndarray:
+        """
+        Shrink a frame so its longest side is at most MAX_IMAGE_SIDE pixels.
+        
+        The result is written into a buffer reused across frames of the same
+        size; smaller frames are returned unchanged.
+        """
+        import cv2
+        
+        height, width = image.shape[:2]
+        scale = MAX_IMAGE_SIDE / max(height, width)
+        if scale >= 1:
+            return image
+        size = (int(width * scale), int(height * scale))
+        shape = (size[1], size[0]) + image.shape[2:]
+        if self._resize_buf is None or self._resize_buf.shape != shape or self._resize_buf.dtype != image.dtype:
+            self._resize_buf = np.empty(shape, dtype=image.dtype)
+        return cv2.resize(image, size, dst=self._resize_buf, interpolation=cv2.INTER_AREA)
+    
+    def _encode_image_data_url(self, image: np.ndarray) -> str:
+        """
+        JPEG-encode an image and return it as a base64 data URL.
+        
+        With libjpeg-turbo the JPEG is written into a buffer reused across
+        frames of the same shape; otherwise OpenCV's encoder is used.
+        """
+        if self._jpeg is not None:
+            if self._enc_shape != image.shape:
+                self._enc_buf = bytearray(self._jpeg.buffer_size(image))
+                self._enc_shape = image.shape
+            _, size = self._jpeg.encode(image, quality=JPEG_QUALITY, dst=self._enc_buf)
+            return _JPEG_DATA_URL_PREFIX + _b64encode_str(memoryview(self._enc_buf)[:size])
+        
+        import cv2
+        
+        _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        return _JPEG_DATA_URL_PREFIX + _b64encode_str(buffer)
+
+    def get_navigation_advice(self,
                             current_pose: Dict[str, float],
                             obstacle_data: Dict[str, Any],
                             target: Optional[Dict[str, float]] = None) -> str:
@@ -120,23 +625,64 @@ class ChatGPTClient:
         Returns:
             str: Navigation advice from ChatGPT
         """
-        # Format situation into a prompt
-        prompt = f"The robot is at position (x={current_pose['x']:.1f}, y={current_pose['y']:.1f}) "
-        prompt += f"facing {current_pose['theta']:.1f} degrees.\n"
+        return self._run(self.get_navigation_advice_async(current_pose, obstacle_data, target))
+
+    async def get_navigation_advice_async(self,
+                                          current_pose: Dict[str, float],
+                                          obstacle_data: Dict[str, Any],
+                                          target: Optional[Dict[str, float]] = None) -> str:
+        """Coroutine variant of get_navigation_advice."""
+        prompt = self._format_navigation_prompt(current_pose, obstacle_data, target)
+        return await self._send_message_async(prompt)
+
+    def watch_navigation_advice(self,
+                                current_pose: Dict[str, float],
+                                obstacle_data: Dict[str, Any],
+                                on_stop: Callable[[], None],
+                                target: Optional[Dict[str, float]] = None) -> str:
+        """
+        Stream navigation advice, reacting to stop advice as soon as it appears.
         
-        if obstacle_data:
-            prompt += "Nearby obstacles:\n"
-            for direction, distance in obstacle_data.items():
-                prompt += f"- {direction}: {distance:.1f} cm\n"
+        ``on_stop`` is called once, from the client's event loop thread, the
+        moment the streamed text mentions one of STOP_KEYWORDS, without
+        waiting for the rest of the response.
         
-        if target:
-            prompt += f"\nTarget position is (x={target['x']:.1f}, y={target['y']:.1f}).\n"
+        Args:
+            current_pose: Robot's current position and orientation
+            obstacle_data: Information about nearby obstacles
+            on_stop: Callback that stops the robot, e.g. an emergency stop
+            target: Optional target position
             
-        prompt += "\nWhat would you advise for navigation?"
+        Returns:
+            str: The complete navigation advice
+        """
+        async def watch() -> str:
+            text = ""
+            stopped = False
+            async for delta in self.stream_navigation_advice(current_pose, obstacle_data, target):
+                text += delta
+                if not stopped and any(word in text.lower() for word in STOP_KEYWORDS):
+                    stopped = True
+                    on_stop()
+            return text
         
-        return self._send_message(prompt)
+        return self._run(watch())
 
-    def get_exploration_strategy(self, 
+    async def stream_navigation_advice(self,
+                                       current_pose: Dict[str, float],
+                                       obstacle_data: Dict[str, Any],
+                                       target: Optional[Dict[str, float]] = None) -> AsyncIterator[str]:
+        """
+        Stream navigation advice as it is generated.
+        
+        Yields:
+            str: Successive pieces of the advice text
+        """
+        prompt = self._format_navigation_prompt(current_pose, obstacle_data, target)
+        async for delta in self._stream_message(prompt):
+            yield delta
+
+    def get_exploration_strategy(self,
                                explored_area_percentage: float,
                                frontier_points: List[Tuple[float, float]]) -> str:
         """
@@ -149,11 +695,14 @@ class ChatGPTClient:
         Returns:
             str: Strategic advice from ChatGPT
         """
-        prompt = f"The robot has explored {explored_area_percentage:.1f}% of the area.\n"
-        prompt += f"There are {len(frontier_points)} frontier points available for exploration.\n"
-        prompt += "What strategy would you recommend for efficient exploration?"
-        
-        return self._send_message(prompt)
+        return self._run(self.get_exploration_strategy_async(explored_area_percentage, frontier_points))
+
+    async def get_exploration_strategy_async(self,
+                                             explored_area_percentage: float,
+                                             frontier_points: List[Tuple[float, float]]) -> str:
+        """Coroutine variant of get_exploration_strategy."""
+        prompt = self._format_exploration_prompt(explored_area_percentage, frontier_points)
+        return await self._send_message_async(prompt)
 
     def _format_sensor_data(self, sensor_data: Dict[str, Any]) -> str:
         """Format sensor data into a prompt for ChatGPT."""
@@ -168,6 +717,49 @@ class ChatGPTClient:
         prompt += "\nWhat insights can you provide about these readings?"
         return prompt
 
+    def _format_sensor_batch(self, readings: List[Dict[str, Any]]) -> str:
+        """Format a batch of sensor readings into a single prompt for ChatGPT."""
+        prompt = f"Sensor readings from the last {len(readings)} samples (oldest first):\n"
+        for i, sensor_data in enumerate(readings, 1):
+            values = []
+            for sensor_type, value in sensor_data.items():
+                if isinstance(value, (int, float)):
+                    values.append(f"{sensor_type}={value:.2f}")
+                else:
+                    values.append(f"{sensor_type}={value}")
+            prompt += f"- Sample {i}: {', '.join(values)}\n"
+            
+        prompt += "\nWhat insights can you provide about these readings?"
+        return prompt
+
+    def _format_navigation_prompt(self,
+                                  current_pose: Dict[str, float],
+                                  obstacle_data: Dict[str, Any],
+                                  target: Optional[Dict[str, float]] = None) -> str:
+        """Format the navigation situation into a prompt for ChatGPT."""
+        prompt = f"The robot is at position (x={current_pose['x']:.1f}, y={current_pose['y']:.1f}) "
+        prompt += f"facing {current_pose['theta']:.1f} degrees.\n"
+        
+        if obstacle_data:
+            prompt += "Nearby obstacles:\n"
+            for direction, distance in obstacle_data.items():
+                prompt += f"- {direction}: {distance:.1f} cm\n"
+                
+        if target:
+            prompt += f"\nTarget position is (x={target['x']:.1f}, y={target['y']:.1f}).\n"
+            
+        prompt += "\nWhat would you advise for navigation?"
+        return prompt
+
+    def _format_exploration_prompt(self,
+                                   explored_area_percentage: float,
+                                   frontier_points: List[Tuple[float, float]]) -> str:
+        """Format the exploration state into a prompt for ChatGPT."""
+        prompt = f"The robot has explored {explored_area_percentage:.1f}% of the area.\n"
+        prompt += f"There are {len(frontier_points)} frontier points available for exploration.\n"
+        prompt += "What strategy would you recommend for efficient exploration?"
+        return prompt
+
     def _send_message(self, message: str) -> str:
         """
         Send a message to ChatGPT and get response.
@@ -178,48 +770,262 @@ class ChatGPTClient:
         Returns:
             str: ChatGPT's response
         """
+        return self._run(self._send_message_async(message))
+
+    async def _send_message_async(self, message: str, max_tokens: int = 150,
+                                  stateless: bool = False) -> str:
+        """
+        Coroutine variant of _send_message.
+        
+        A stateless prompt carries all of its context, like a sensor analysis:
+        it is sent without the conversation history, is not added to it, and
+        repeats are served from the response cache. Other prompts depend on
+        the history, so they always reach the API.
+        """
         try:
-            # Respect rate limiting
-            self._wait_for_rate_limit()
+            cache_key = ResponseCache.key(self._system_prompt, message)
+            embedding = None
+            if stateless:
+                cached = self._response_cache.get_exact(cache_key)
+                if cached is None and self._semantic_cache:
+                    embedding = await self._embed(message)
+                    if embedding is not None:
+                        cached = self._response_cache.get_similar(embedding)
+                if cached is not None:
+                    return cached
             
-            # Prepare messages with conversation history
-            messages = [{"role": "system", "content": self._system_prompt}]
-            messages.extend(self._conversation_history)
-            messages.append({"role": "user", "content": message})
+            # Prepare messages, with the conversation history unless stateless
+            history = () if stateless else self._conversation_history
+            messages = [self._system_msg, *history,
+                        {"role": "user", "content": message}]
             
             # Make API call
-            response = self._client.chat.completions.create(
+            response = await self._create_completion(
                 model="gpt-4",
                 messages=messages,
-                max_tokens=150,
+                max_tokens=max_tokens,
                 temperature=0.7
             )
             
-            # Update rate limiting and conversation history
-            self._last_request_time = time.time()
-            self._update_conversation_history(message, response.choices[0].message.content)
+            # Update the cache or the conversation history
+            content = response.choices[0].message.content
+            if stateless:
+                self._response_cache.put_exact(cache_key, content)
+                if embedding is not None:
+                    self._response_cache.put_similar(embedding, content)
+            else:
+                self._update_conversation_history(message, content)
             
-            return response.choices[0].message.content
+            return content
             
         except Exception as e:
             print(f"Error in ChatGPT communication: {e}")
             return "Error communicating with ChatGPT"
 
-    def _wait_for_rate_limit(self):
-        """Wait if necessary to respect rate limiting."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_request_interval:
-            time.sleep(self._min_request_interval - elapsed)
+    async def _stream_message(self, message: str, max_tokens: int = 150) -> AsyncIterator[str]:
+        """
+        Send a message to ChatGPT and yield the response as it streams in.
+        
+        The full response is added to the conversation history once the
+        stream ends.
+        
+        Args:
+            message: Message to send
+            max_tokens: Maximum tokens in the response
+            
+        Yields:
+            str: Successive pieces of the response text
+        """
+        messages = [self._system_msg, *self._conversation_history,
+                    {"role": "user", "content": message}]
+        parts: List[str] = []
+        try:
+            await self._request_bucket.acquire(1)
+            await self._token_bucket.acquire(self._estimate_tokens(messages) + max_tokens)
+            
+            async with self._get_semaphore():
+                stream = await self._client.chat.completions.create(
+                    model="gpt-4",
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.7,
+                    stream=True,
+                    timeout=self._request_timeout
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            
+            self._update_conversation_history(message, "".join(parts))
+            
+        except Exception as e:
+            print(f"Error in ChatGPT communication: {e}")
+            if not parts:
+                yield "Error communicating with ChatGPT"
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Get the embedding of a prompt for the semantic cache, or None on failure."""
+        try:
+            await self._request_bucket.acquire(1)
+            async with self._get_semaphore():
+                result = await self._client.embeddings.create(model="text-embedding-3-small", input=text)
+            return np.asarray(result.data[0].embedding, dtype=np.float32)
+        except Exception as e:
+            print(f"Error computing prompt embedding: {e}")
+            return None
+
+    async def _send_coalesced(self, prompt: str) -> str:
+        """
+        Send a prompt together with other prompts arriving within the window.
+        
+        Pending prompts are flushed after the coalescing window, or at once
+        when enough of them have queued up.
+        
+        Args:
+            prompt: Message to send
+            
+        Returns:
+            str: ChatGPT's answer to this prompt
+        """
+        future = self._loop.create_future()
+        self._coalesce_pending.append((prompt, future))
+        if len(self._coalesce_pending) >= self._coalesce_max_prompts:
+            self._start_flush()
+        elif self._coalesce_timer is None:
+            self._coalesce_timer = self._loop.call_later(self._coalesce_window, self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        """Hand all pending coalesced prompts to a flush task."""
+        if self._coalesce_timer is not None:
+            self._coalesce_timer.cancel()
+            self._coalesce_timer = None
+        pending, self._coalesce_pending = self._coalesce_pending, []
+        if pending:
+            self._loop.create_task(self._flush_batch(pending))
+
+    async def _flush_batch(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        """
+        Send pending prompts as one numbered request and route the answers back.
+        
+        Args:
+            pending: (prompt, future) pairs to resolve
+        """
+        if len(pending) == 1:
+            prompt, future = pending[0]
+            answers = [await self._send_message_async(prompt, stateless=True)]
+        else:
+            combined = "Answer each numbered query separately, numbering your answers to match:\n"
+            combined += "\n".join(f"{i}. {prompt}" for i, (prompt, _) in enumerate(pending, 1))
+            response = await self._send_message_async(combined, max_tokens=150 * len(pending),
+                                                      stateless=True)
+            answers = self._split_numbered_answers(response, len(pending))
+        
+        for (_, future), answer in zip(pending, answers):
+            if not future.done():
+                future.set_result(answer)
+
+    def _split_numbered_answers(self, response: str, count: int) -> List[str]:
+        """
+        Split a numbered response into one answer per query.
+        
+        Queries without a matching numbered answer get the whole response.
+        """
+        answers: Dict[int, str] = {}
+        parts = re.split(r'(?m)^\s*(\d+)\.\s*', response)
+        for number, text in zip(parts[1::2], parts[2::2]):
+            answers.setdefault(int(number), text.strip())
+        return [answers.get(i, response) for i in range(1, count + 1)]
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent requests, creating it on the loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    async def _create_completion(self, **kwargs: Any) -> Any:
+        """
+        Make a rate-limited chat completion request.
+        
+        Rate-limit, server and network errors are retried with exponential
+        backoff and jitter; a run of 429s also halves the request rate, which
+        each successful response then raises by RATE_RECOVERY.
+        
+        Args:
+            **kwargs: Arguments for chat.completions.create
+            
+        Returns:
+            The parsed chat completion
+        """
+        estimated_tokens = self._estimate_tokens(kwargs['messages']) + kwargs.get('max_tokens', 0)
+        for attempt in range(self._max_attempts):
+            await self._request_bucket.acquire(1)
+            await self._token_bucket.acquire(estimated_tokens)
+            
+            try:
+                async with self._get_semaphore():
+                    raw_response = await self._client.chat.completions.with_raw_response.create(
+                        timeout=self._request_timeout, **kwargs)
+            except self._retryable_errors as e:
+                if isinstance(e, self._rate_limit_error):
+                    self._on_rate_limited()
+                if attempt + 1 == self._max_attempts:
+                    raise
+                await asyncio.sleep(min(2 ** attempt, MAX_BACKOFF) + random.random())
+                continue
+            
+            self._rate_limit_streak = 0
+            self._update_rate_limits(raw_response.headers)
+            self._request_bucket.recover()
+            self._token_bucket.recover()
+            return raw_response.parse()
+    
+    def _on_rate_limited(self) -> None:
+        """Count a 429 and halve the request rates once they keep coming."""
+        self._rate_limit_streak += 1
+        if self._rate_limit_streak >= RATE_LIMIT_STREAK:
+            self._request_bucket.throttle(0.5)
+            self._token_bucket.throttle(0.5)
+            self._rate_limit_streak = 0
+    
+    def _estimate_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        """Roughly estimate the prompt tokens of a message list (~4 characters per token)."""
+        chars = 0
+        images = 0
+        for message in messages:
+            content = message['content']
+            if isinstance(content, str):
+                chars += len(content)
+            else:
+                for part in content:
+                    if part.get('type') == 'text':
+                        chars += len(part['text'])
+                    else:
+                        images += 1
+        return chars // 4 + 85 * images
+    
+    def _update_rate_limits(self, headers: Mapping[str, str]) -> None:
+        """Retune the rate limiters from OpenAI's x-ratelimit-* response headers."""
+        for bucket, kind in ((self._request_bucket, 'requests'), (self._token_bucket, 'tokens')):
+            try:
+                limit = headers.get(f'x-ratelimit-limit-{kind}')
+                if limit is not None:
+                    bucket.set_limit(float(limit))
+                remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+                if remaining is not None:
+                    bucket.set_remaining(float(remaining))
+            except ValueError:
+                continue
 
     def _update_conversation_history(self, user_message: str, assistant_response: str):
         """Update conversation history, maintaining maximum length."""
         self._conversation_history.append({"role": "user", "content": user_message})
         self._conversation_history.append({"role": "assistant", "content": assistant_response})
-        
-        # Trim history if too long
-        if len(self._conversation_history) > self._max_history_length * 2:
-            self._conversation_history = self._conversation_history[-self._max_history_length * 2:]
 
     def clear_conversation_history(self):
         """Clear the conversation history."""
-        self._conversation_history = []
+        self._conversation_history.clear()
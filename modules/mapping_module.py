@@ -8,18 +8,29 @@ This module handles:
 - Fast spatial operations
 """
 
+import math
 import numpy as np
 import json
 import logging
-from typing import Tuple, List, Optional
-from dataclasses import dataclass
-from functools import lru_cache
+from typing import NamedTuple, Tuple, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import blosc2
+except ImportError:  # Optional: fall back to zlib via np.savez_compressed
+    blosc2 = None
+
+from modules._kernels import bresenham_cells, raycast_update, sweep_raycast, label_components, \
+    frontier_mask
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class RobotPose:
-    """Robot pose in 2D space."""
+def _npz_path(filepath: str) -> str:
+    """Add the .npz suffix that np.savez appends, so saves and loads agree."""
+    return filepath if filepath.endswith('.npz') else filepath + '.npz'
+
+class RobotPose(NamedTuple):
+    """Robot pose in 2D space; immutable, so update a pose by replacing it."""
     x: float  # cm
     y: float  # cm
     theta: float  # radians
@@ -28,10 +39,24 @@ class OccupancyGrid:
     """
     Memory and computationally efficient occupancy grid implementation.
     
-    Uses NumPy arrays for fast operations and implements caching for
-    frequently accessed computations.
+    Uses NumPy arrays for fast operations and Numba kernels for the
+    per-ray updates.
     """
     
+    # Cells hold log-odds in Q8.8 fixed point; 0 is unknown (p = 0.5)
+    LOG_ODDS_SCALE = 256
+    FREE_LOG_ODDS = -102  # ~ -0.4
+    OCCUPIED_LOG_ODDS = 102  # ~ +0.4
+    LOG_ODDS_MIN = -32000
+    LOG_ODDS_MAX = 32000
+    
+    # Classification thresholds in the same fixed-point units
+    UNKNOWN_THRESHOLD = 25
+    FREE_THRESHOLD = -75
+    
+    # Frontier clusters smaller than this many cells are treated as noise
+    FRONTIER_MIN_CELLS = 3
+    
     def __init__(self, width_cm: int, height_cm: int, resolution_cm: float = 1.0) -> None:
         """
         Initialize the occupancy grid.
@@ -42,51 +67,91 @@ class OccupancyGrid:
             resolution_cm: Size of each grid cell in centimeters
         """
         self.resolution_cm = resolution_cm
+        self._inv_res = 1.0 / resolution_cm
         self.width_cells = int(np.ceil(width_cm / resolution_cm))
         self.height_cells = int(np.ceil(height_cm / resolution_cm))
         
-        # Initialize grid with unknown values (0.5)
-        # Use float16 to save memory while maintaining sufficient precision
-        self.grid = np.full((self.height_cells, self.width_cells), 0.5, dtype=np.float16)
+        # Initialize grid with unknown values (log-odds 0)
+        # int16 log-odds make each update a saturating add, with no log/exp
+        self.grid = np.zeros((self.height_cells, self.width_cells), dtype=np.int16)
+        # Bumped on every change to the grid, so readers can skip unchanged maps
+        self.revision = 0
+        # Copy of the grid as of the last pop_dirty_cells call
+        self._popped_grid: Optional[np.ndarray] = None
+        # Planned path for display, as (N, 2) int16 grid cells
+        self._current_path = np.empty((0, 2), dtype=np.int16)
         
-        # Cache for coordinate transformations
-        self._coord_cache = {}
-        self._max_cache_size = 1000
+        self._allocate_scratch()
+        
+        # Single worker so snapshots are written in the order they were taken
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="GridSave")
         
         logger.info(f"Created occupancy grid: {self.width_cells}x{self.height_cells} cells")
     
+    def _allocate_scratch(self) -> None:
+        """Allocate the buffers reused by ray tracing and frontier queries."""
+        # A Bresenham line has at most max(W, H) in-bounds cells
+        self._ray_scratch = np.empty((max(self.width_cells, self.height_cells) + 1, 2), dtype=np.int32)
+        self._abs_scratch = np.empty(self.grid.shape, dtype=np.int16)
+        self._unknown_mask = np.empty(self.grid.shape, dtype=np.bool_)
+        interior = (max(self.height_cells - 2, 0), max(self.width_cells - 2, 0))
+        self._frontier_mask = np.empty(interior, dtype=np.bool_)
+        self._frontier_labels = np.empty(interior, dtype=np.int32)
+        self._label_stack = np.empty(interior[0] * interior[1], dtype=np.int64)
+    
     @property
     def shape(self) -> Tuple[int, int]:
         """Get the shape of the grid."""
         return self.grid.shape
     
-    @lru_cache(maxsize=1024)
     def _world_to_grid(self, x_cm: float, y_cm: float) -> Tuple[int, int]:
-        """
-        Convert world coordinates to grid indices.
-        
-        Uses LRU cache to speed up repeated transformations.
-        """
-        grid_x = int(np.floor(x_cm / self.resolution_cm))
-        grid_y = int(np.floor(y_cm / self.resolution_cm))
+        """Convert world coordinates to grid indices."""
+        grid_x = math.floor(x_cm * self._inv_res)
+        grid_y = math.floor(y_cm * self._inv_res)
         return grid_x, grid_y
     
-    @lru_cache(maxsize=1024)
-    def _grid_to_world(self, grid_x: int, grid_y: int) -> Tuple[float, float]:
+    def world_to_grid_batch(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Convert grid indices to world coordinates.
+        Convert arrays of world coordinates to grid indices.
         
-        Uses LRU cache to speed up repeated transformations.
+        Args:
+            xs: X coordinates in cm
+            ys: Y coordinates in cm
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: int64 grid x and y indices
         """
+        grid_xs = np.floor(np.asarray(xs) * self._inv_res).astype(np.int64)
+        grid_ys = np.floor(np.asarray(ys) * self._inv_res).astype(np.int64)
+        return grid_xs, grid_ys
+    
+    def _grid_to_world(self, grid_x: int, grid_y: int) -> Tuple[float, float]:
+        """Convert grid indices to world coordinates."""
         world_x = (grid_x + 0.5) * self.resolution_cm
         world_y = (grid_y + 0.5) * self.resolution_cm
         return world_x, world_y
     
+    def grid_to_world_batch(self, grid_xs: np.ndarray,
+                            grid_ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert arrays of grid indices to world coordinates of the cell centres.
+        
+        Args:
+            grid_xs: Cell x indices
+            grid_ys: Cell y indices
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: float64 x and y coordinates in cm
+        """
+        world_xs = (np.asarray(grid_xs) + 0.5) * self.resolution_cm
+        world_ys = (np.asarray(grid_ys) + 0.5) * self.resolution_cm
+        return world_xs, world_ys
+    
     def update_occupancy(self, distance: float, angle: float, robot_pose: RobotPose) -> None:
         """
         Update the occupancy grid with a new sensor reading.
         
-        Uses vectorized operations for efficiency.
+        Ray tracing and the log-odds update run in one fused kernel.
         
         Args:
             distance: Distance to obstacle in cm
@@ -94,144 +159,273 @@ class OccupancyGrid:
             robot_pose: Current pose of the robot
         """
         try:
-            # Calculate the endpoint of the sensor reading
-            end_x = robot_pose.x + distance * np.cos(robot_pose.theta + angle)
-            end_y = robot_pose.y + distance * np.sin(robot_pose.theta + angle)
+            # Calculate the endpoint of the sensor reading; math is much
+            # cheaper than NumPy ufuncs on scalars
+            heading = robot_pose.theta + angle
+            end_x = robot_pose.x + distance * math.cos(heading)
+            end_y = robot_pose.y + distance * math.sin(heading)
             
             # Convert to grid coordinates
             start_x, start_y = self._world_to_grid(robot_pose.x, robot_pose.y)
             end_x, end_y = self._world_to_grid(end_x, end_y)
             
-            # Use Bresenham's line algorithm for efficient ray tracing
-            # Implemented using NumPy for speed
-            cells = self._bresenham_line(start_x, start_y, end_x, end_y)
-            
-            # Update probabilities along the ray
-            # Free space update
-            self._update_cells_vectorized(cells[:-1], is_occupied=False)
-            # Occupied space update (endpoint)
-            if cells.size > 0:
-                self._update_cells_vectorized(cells[-1:], is_occupied=True)
+            # Free space along the ray, occupied at the endpoint
+            raycast_update(self.grid, start_x, start_y, end_x, end_y,
+                           self.FREE_LOG_ODDS, self.OCCUPIED_LOG_ODDS,
+                           self.LOG_ODDS_MIN, self.LOG_ODDS_MAX)
+            self.revision += 1
                 
         except Exception as e:
             logger.error(f"Error updating occupancy grid: {str(e)}", exc_info=True)
     
-    def _bresenham_line(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    def update_occupancy_batch(self, distances: np.ndarray, angles: np.ndarray,
+                               robot_pose: RobotPose) -> None:
         """
-        Efficient Bresenham's line algorithm implementation using NumPy.
-        
-        Returns array of (x, y) coordinates along the line.
-        """
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        
-        if dx == 0 and dy == 0:
-            return np.array([[x0, y0]])
-        
-        # Determine step direction
-        sx = 1 if x1 > x0 else -1
-        sy = 1 if y1 > y0 else -1
-        
-        # Calculate points along the line
-        if dx > dy:
-            # Horizontal-ish lines
-            points = np.column_stack((
-                np.arange(x0, x1 + sx, sx),
-                np.round(np.interp(
-                    np.arange(x0, x1 + sx, sx),
-                    [x0, x1],
-                    [y0, y1]
-                )).astype(int)
-            ))
-        else:
-            # Vertical-ish lines
-            points = np.column_stack((
-                np.round(np.interp(
-                    np.arange(y0, y1 + sy, sy),
-                    [y0, y1],
-                    [x0, x1]
-                )).astype(int),
-                np.arange(y0, y1 + sy, sy)
-            ))
-        
-        # Filter points within grid bounds
-        mask = (
-            (points[:, 0] >= 0) & 
-            (points[:, 0] < self.width_cells) & 
-            (points[:, 1] >= 0) & 
-            (points[:, 1] < self.height_cells)
-        )
-        return points[mask]
-    
-    def _update_cells_vectorized(self, cells: np.ndarray, is_occupied: bool) -> None:
-        """
-        Update occupancy probabilities using vectorized operations.
+        Update the occupancy grid with a whole sweep of sensor readings.
+        
+        Endpoints are computed and the rays traced by a single kernel call; readings that are NaN or infinite are skipped.
         
         Args:
-            cells: Array of (x, y) coordinates to update
-            is_occupied: Whether the cells are occupied
+            distances: Distances to obstacles in cm
+            angles: Angles of the readings in radians, relative to the robot
+            robot_pose: Current pose of the robot
         """
-        if cells.size == 0:
-            return
+        try:
+            distances = np.asarray(distances, dtype=np.float64)
+            angles = np.asarray(angles, dtype=np.float64)
+            if distances.shape != angles.shape:
+                raise ValueError(f"{distances.shape} distances for {angles.shape} angles")
             
-        # Log odds update
-        log_odds_update = 0.4 if is_occupied else -0.4
-        current = self.grid[cells[:, 1], cells[:, 0]]
+            sweep_raycast(self.grid, float(robot_pose.x), float(robot_pose.y), float(robot_pose.theta),
+                          distances.ravel(), angles.ravel(), self._inv_res,
+                          self.FREE_LOG_ODDS, self.OCCUPIED_LOG_ODDS,
+                          self.LOG_ODDS_MIN, self.LOG_ODDS_MAX)
+            self.revision += 1
+                
+        except Exception as e:
+            logger.error(f"Error updating occupancy grid batch: {str(e)}", exc_info=True)
+    
+    def _bresenham_line(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """
+        Integer Bresenham's line algorithm, compiled with Numba when available.
+        
+        Returns array of (x, y) coordinates along the line that lie within the
+        grid. The array is a view of a scratch buffer that the next call
+        overwrites.
+        """
+        n = bresenham_cells(int(x0), int(y0), int(x1), int(y1),
+                              self.width_cells, self.height_cells, self._ray_scratch)
+        return self._ray_scratch[:n]
+    
+    def get_frontiers(self) -> List[Tuple[int, int, int]]:
+        """
+        Find frontier clusters (connected runs of frontier cells).
         
-        # Convert to log odds, update, and back to probability
-        log_odds = np.log(current / (1 - current))
-        log_odds += log_odds_update
-        self.grid[cells[:, 1], cells[:, 0]] = 1 / (1 + np.exp(-log_odds))
+        Frontier cells are grouped into 8-connected components and each
+        component is reported once, so callers rank tens of clusters
+        instead of every cell. Clusters smaller than FRONTIER_MIN_CELLS
+        are dropped.
+        
+        Returns:
+            List[Tuple[int, int, int]]: Centroid x, centroid y and cell count
+            of each cluster, in grid cells
+        """
+        frontier_mask = self._frontier_mask_now()
+        labels = self._frontier_labels
+        n = label_components(frontier_mask, labels, self._label_stack)
+        if n == 0:
+            return []
+        
+        # Per-cluster cell counts and coordinate sums, shifting back from
+        # interior to grid indices
+        ys, xs = np.nonzero(frontier_mask)
+        ids = labels[ys, xs]
+        areas = np.bincount(ids, minlength=n + 1)[1:]
+        cxs = np.bincount(ids, weights=xs, minlength=n + 1)[1:] / areas + 1
+        cys = np.bincount(ids, weights=ys, minlength=n + 1)[1:] / areas + 1
+        
+        keep = areas >= self.FRONTIER_MIN_CELLS
+        return list(zip(np.rint(cxs[keep]).astype(np.int64).tolist(),
+                        np.rint(cys[keep]).astype(np.int64).tolist(),
+                        areas[keep].tolist()))
     
-    def get_frontiers(self) -> List[Tuple[int, int]]:
+    def get_frontier_cells(self) -> List[Tuple[int, int]]:
         """
         Find frontier cells (boundaries between known and unknown space).
         
         Uses efficient NumPy operations for speed.
         """
-        # Create binary masks
-        unknown = np.abs(self.grid - 0.5) < 0.1
-        free = self.grid < 0.3
+        frontier_coords = np.argwhere(self._frontier_mask_now())[:, ::-1] + 1
+        
+        # tolist() converts to Python ints in C rather than per cell
+        return list(map(tuple, frontier_coords.tolist()))
+    
+    def _frontier_mask_now(self) -> np.ndarray:
+        """
+        Compute the frontier mask of the grid interior into its scratch buffer.
         
-        # Convolve to find boundaries
-        kernel = np.ones((3, 3))
-        unknown_expanded = np.zeros_like(unknown)
-        cv2.dilate(unknown.astype(np.uint8), kernel, unknown_expanded)
+        Entry [y, x] of the result is grid cell (x + 1, y + 1). Frontier
+        cells are free interior cells next to unknown space; one kernel pass
+        classifies them straight from the log-odds, so no unknown or free
+        mask of the whole grid is built.
+        """
+        return frontier_mask(self.grid, self.UNKNOWN_THRESHOLD, self.FREE_THRESHOLD,
+                             self._frontier_mask)
+    
+    def _unknown_mask_now(self) -> np.ndarray:
+        """Compute the unknown-cell mask into its scratch buffer."""
+        np.abs(self.grid, out=self._abs_scratch)
+        return np.less(self._abs_scratch, self.UNKNOWN_THRESHOLD, out=self._unknown_mask)
+    
+    def get_grid_data(self) -> np.ndarray:
+        """
+        Get a snapshot of the grid for the web interface.
         
-        # Find frontier cells
-        frontier_mask = free & unknown_expanded
-        frontier_coords = np.argwhere(frontier_mask)
+        Returns:
+            np.ndarray: Copy of the int16 log-odds grid, indexed as [y, x]
+        """
+        return self.grid.copy()
+    
+    def get_probability_grid(self) -> np.ndarray:
+        """
+        Convert the log-odds grid to occupancy probabilities.
         
-        return [(int(x), int(y)) for y, x in frontier_coords]
+        Returns:
+            np.ndarray: float32 probabilities in [0, 1], 0.5 for unknown cells
+        """
+        log_odds = self.grid.astype(np.float32) / self.LOG_ODDS_SCALE
+        return 1.0 / (1.0 + np.exp(-log_odds))
     
-    def save_grid_to_file(self, filepath: str) -> None:
-        """Save the occupancy grid to a compressed NPZ file."""
+    def get_cell_probability(self, grid_x: int, grid_y: int) -> float:
+        """
+        Get the occupancy probability of a single cell.
+        
+        Only the one cell is converted, unlike get_probability_grid.
+        
+        Args:
+            grid_x: Cell x index
+            grid_y: Cell y index
+            
+        Returns:
+            float: Probability in [0, 1], 0.5 for an unknown cell
+        """
+        log_odds = int(self.grid[grid_y, grid_x]) / self.LOG_ODDS_SCALE
+        return 1.0 / (1.0 + math.exp(-log_odds))
+    
+    def set_current_path(self, cells: np.ndarray) -> None:
+        """
+        Record the planned path for display.
+        
+        Args:
+            cells: (N, 2) grid cells (x, y), e.g. from the A* planner
+        """
+        self._current_path = np.asarray(cells, dtype=np.int16).reshape(-1, 2)
+    
+    def get_current_path(self) -> np.ndarray:
+        """Get the planned path as (N, 2) int16 grid cells (x, y)."""
+        return self._current_path
+    
+    def pop_dirty_cells(self) -> Optional[np.ndarray]:
+        """
+        Get the cells changed since the previous call and forget them.
+        
+        Returns:
+            Optional[np.ndarray]: (k, 3) int16 rows of (x, y, log-odds), or
+            None on the first call or after the grid changed shape
+        """
+        if self._popped_grid is None or self._popped_grid.shape != self.grid.shape:
+            self._popped_grid = self.grid.copy()
+            return None
+        
+        changed = np.flatnonzero(self.grid != self._popped_grid)
+        # Values are read once so a concurrent update is never half-recorded
+        values = self.grid.ravel()[changed]
+        self._popped_grid.ravel()[changed] = values
+        ys, xs = np.divmod(changed, self.grid.shape[1])
+        return np.column_stack((xs, ys, values)).astype(np.int16)
+    
+    def save_grid_to_file(self, filepath: str) -> Future:
+        """
+        Save the occupancy grid to a compressed NPZ file in the background.
+        
+        A snapshot is taken immediately; compression and the write happen on
+        a worker thread so the mapping loop does not stall.
+        
+        Args:
+            filepath: Destination; .npz is appended if it has another suffix
+        
+        Returns:
+            Future: Completes once the file has been written
+        """
+        # Save the int16 log-odds themselves: the same two bytes per cell as
+        # a float16 probability, but lossless for strongly held evidence
+        snapshot = self.grid.copy()
+        return self._save_executor.submit(self._write_snapshot, _npz_path(filepath), snapshot,
+                                          self.resolution_cm)
+    
+    def _write_snapshot(self, filepath: str, snapshot: np.ndarray, resolution_cm: float) -> None:
+        """Compress and write a grid snapshot, using blosc2 when available."""
         try:
-            # Save as compressed NumPy array
-            np.savez_compressed(
-                filepath,
-                grid=self.grid,
-                resolution=self.resolution_cm
-            )
+            if blosc2 is not None:
+                packed = blosc2.pack_array2(snapshot, cparams={'codec': blosc2.Codec.ZSTD, 'clevel': 3})
+                np.savez(
+                    filepath,
+                    blosc=np.frombuffer(packed, dtype=np.uint8),
+                    resolution=resolution_cm
+                )
+            else:
+                np.savez_compressed(
+                    filepath,
+                    grid=snapshot,
+                    resolution=resolution_cm
+                )
             logger.info(f"Saved occupancy grid to {filepath}")
         except Exception as e:
             logger.error(f"Error saving occupancy grid: {str(e)}", exc_info=True)
     
     def load_grid_from_file(self, filepath: str) -> bool:
-        """Load the occupancy grid from a compressed NPZ file."""
+        """
+        Load the occupancy grid from a compressed NPZ file.
+        
+        Args:
+            filepath: Path given to save_grid_to_file, with or without .npz
+        
+        Returns:
+            bool: True if the grid was loaded
+        """
         try:
-            data = np.load(filepath)
-            self.grid = data['grid']
+            data = np.load(_npz_path(filepath))
+            if 'blosc' in data:
+                if blosc2 is None:
+                    raise RuntimeError("blosc2 is required to load this grid file")
+                saved = blosc2.unpack_array2(data['blosc'].tobytes())
+            else:
+                saved = data['grid']
+            if saved.dtype == np.int16:
+                self.grid = saved.copy()
+            else:
+                # Older files hold float16 probabilities
+                probabilities = np.clip(saved.astype(np.float32), 1e-4, 1 - 1e-4)
+                log_odds = np.log(probabilities / (1 - probabilities)) * self.LOG_ODDS_SCALE
+                self.grid = np.clip(np.rint(log_odds), self.LOG_ODDS_MIN, self.LOG_ODDS_MAX).astype(np.int16)
             self.resolution_cm = float(data['resolution'])
+            self._inv_res = 1.0 / self.resolution_cm
             self.height_cells, self.width_cells = self.grid.shape
+            self._allocate_scratch()
+            self.revision += 1
             logger.info(f"Loaded occupancy grid from {filepath}")
             return True
         except Exception as e:
             logger.error(f"Error loading occupancy grid: {str(e)}", exc_info=True)
             return False
     
+    def reset(self) -> None:
+        """Mark every cell unknown again, reusing the grid's memory."""
+        self.grid.fill(0)
+        self.revision += 1
+    
     def get_explored_area_percentage(self) -> float:
         """Calculate the percentage of explored area."""
         total_cells = self.grid.size
-        unknown_cells = np.sum(np.abs(self.grid - 0.5) < 0.1)
+        unknown_cells = np.count_nonzero(self._unknown_mask_now())
         return 100 * (1 - unknown_cells / total_cells)
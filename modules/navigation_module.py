@@ -2,42 +2,54 @@
 Optimized navigation module for the PiCar-X robot.
 """
 
+import math
 import numpy as np
 import logging
 import os
 import sys
-from typing import List, Tuple, Optional
-from dataclasses import dataclass
-from picarx import Picarx
-from os import geteuid
+from typing import List, NamedTuple, Tuple, Optional
+from functools import lru_cache
 import time
 
+from modules._hw_base import _HardwareInitMixin
 from modules.mapping_module import OccupancyGrid, RobotPose
 
 # Enable debug logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Check for root privileges
-if geteuid() != 0:
-    print("\033[0;33mThe program needs to be run using sudo, otherwise hardware control may fail.\033[0m")
-
-# Check if running on Raspberry Pi
+# Check if running on Raspberry Pi; the answer cannot change while running
+@lru_cache(maxsize=1)
 def is_raspberry_pi():
     try:
         with open('/proc/cpuinfo', 'r') as f:
-            return 'Raspberry Pi' in f.read()
-    except:
-        return False
+            for line in f:
+                if line.startswith('Model'):
+                    return 'Raspberry Pi' in line
+    except OSError:
+        pass
+    return False
+
+def wrap_angle(angle: float) -> float:
+    """Wrap an angle in radians to [-pi, pi) without looping."""
+    return (angle + math.pi) % (2 * math.pi) - math.pi
 
-@dataclass
-class MovementCommand:
+class MovementCommand(NamedTuple):
     """Represents a movement command for the robot."""
     linear_speed: float  # Speed in cm/s
     angular_speed: float  # Speed in rad/s
     duration: float  # Duration in seconds
 
-class NavigationController:
+class NavigationController(_HardwareInitMixin):
+    # Discrete headings for which primitive footprints are precomputed
+    NUM_HEADING_BINS = 32
+    # Time step used to sweep a primitive's footprint, in seconds
+    FOOTPRINT_TIME_RES = 0.05
+    # Consecutive failed hardware calls after which hardware calls are paused
+    MAX_HARDWARE_FAILURES = 5
+    # Seconds the paused hardware calls wait before one trial call is let through
+    HARDWARE_RETRY_INTERVAL = 2.0
+    
     def __init__(self, grid: OccupancyGrid) -> None:
         """
         Initialize the navigation controller.
@@ -47,16 +59,24 @@ class NavigationController:
         """
         self.grid = grid
         self._current_pose = RobotPose(x=0.0, y=0.0, theta=0.0)
-        self.picar = None
         
         # Try to initialize PiCar-X hardware
-        try:
-            logger.debug("Attempting to initialize PiCar-X hardware...")
-            self.picar = Picarx()
-            logger.info("PiCar-X hardware initialized successfully")
-        except Exception as e:
-            logger.debug(f"Detailed hardware initialization error: {str(e)}", exc_info=True)
-            logger.warning("Hardware initialization failed - some functions may be limited")
+        self._init_picar()
+        
+        # Hardware availability, decided once here
+        self._hw_ok: bool = self.picar is not None
+        # Circuit breaker: after repeated failures calls are skipped until
+        # the monotonic retry time, then one trial call decides; None when closed
+        self._hw_failures = 0
+        self._hw_retry_at: Optional[float] = None
+        
+        # Bound hardware methods, looked up once instead of on every call
+        self._picar_calls = {}
+        if self.picar is not None:
+            for name in ('forward', 'backward', 'stop', 'set_dir_servo_angle'):
+                func = getattr(self.picar, name, None)
+                if func is not None:
+                    self._picar_calls[name] = func
         
         # Navigation parameters
         self.min_obstacle_distance = 20.0  # cm
@@ -66,6 +86,11 @@ class NavigationController:
         
         # Motion primitives (pre-computed for efficiency)
         self._motion_primitives = self._generate_motion_primitives()
+        # Cells swept by each primitive, per starting heading bin
+        self._primitive_footprints: List[List[np.ndarray]] = self._generate_primitive_footprints()
+        # Per-heading lookup tables for planners expanding primitives
+        self._neighbors_by_heading, self._heading_after, self._direction_change_idx = \
+            self._generate_heading_tables()
         
         # Path planning cache
         self._current_path: List[Tuple[int, int]] = []
@@ -97,32 +122,164 @@ class NavigationController:
                 duration=1.0
             ))
         
-        logger.debug(f"Generated {len(primitives)} motion primitives")
+        logger.debug("Generated %s motion primitives", len(primitives))
         return primitives
     
-    def _safe_hardware_call(self, func_name: str, *args, **kwargs):
+    def _generate_primitive_footprints(self) -> List[List[np.ndarray]]:
+        """
+        Precompute the grid cells each motion primitive sweeps.
+        
+        The unicycle model is integrated at FOOTPRINT_TIME_RES from every
+        heading bin, and the robot's disc is rasterized at each pose. Turn
+        primitives give their angular speed in degrees per second.
+        
+        Returns:
+            List[List[np.ndarray]]: footprints[primitive][heading_bin] as
+            unique int16 (dx, dy) cell offsets from the start cell
+        """
+        resolution = self.grid.resolution_cm
+        radius = int(np.ceil(self.robot_radius / resolution))
+        ys, xs = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        inside = xs ** 2 + ys ** 2 <= radius ** 2
+        disc = np.stack([xs[inside], ys[inside]], axis=1)
+        
+        footprints = []
+        for primitive in self._motion_primitives:
+            by_heading = []
+            for heading_bin in range(self.NUM_HEADING_BINS):
+                centers, _ = self._integrate_primitive(primitive, heading_bin)
+                swept = (np.unique(centers, axis=0)[:, None, :] + disc[None, :, :]).reshape(-1, 2)
+                by_heading.append(np.unique(swept, axis=0).astype(np.int16))
+            footprints.append(by_heading)
+        
+        logger.debug("Precomputed footprints for %s motion primitives", len(footprints))
+        return footprints
+    
+    def _integrate_primitive(self, primitive: MovementCommand, heading_bin: int) -> Tuple[np.ndarray, float]:
+        """
+        Integrate the unicycle model for one primitive from a heading bin.
+        
+        Returns:
+            Tuple[np.ndarray, float]: Robot center cell offsets at every time
+            step, and the final heading in radians
+        """
+        resolution = self.grid.resolution_cm
+        steps = max(1, int(round(primitive.duration / self.FOOTPRINT_TIME_RES)))
+        dt = primitive.duration / steps
+        omega = np.radians(primitive.angular_speed)
+        x = y = 0.0
+        theta = 2 * np.pi * heading_bin / self.NUM_HEADING_BINS
+        centers = [(0, 0)]
+        for _ in range(steps):
+            x += primitive.linear_speed * np.cos(theta) * dt
+            y += primitive.linear_speed * np.sin(theta) * dt
+            theta += omega * dt
+            centers.append((int(round(x / resolution)), int(round(y / resolution))))
+        return np.array(centers), theta
+    
+    def _generate_heading_tables(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Build per-heading lookup tables so primitive expansion needs no trigonometry.
+        
+        Returns:
+            Tuple of read-only arrays:
+            - neighbors_by_heading: (bins, primitives, 2) int32 end cell deltas
+            - heading_after: (bins, primitives) int32 heading bin after each primitive
+            - direction_change_idx: (bins,) int32 index of the first primitive
+              that changes heading, or the number of primitives if none does
+        """
+        num_primitives = len(self._motion_primitives)
+        neighbors = np.zeros((self.NUM_HEADING_BINS, num_primitives, 2), dtype=np.int32)
+        heading_after = np.zeros((self.NUM_HEADING_BINS, num_primitives), dtype=np.int32)
+        direction_change = np.full(self.NUM_HEADING_BINS, num_primitives, dtype=np.int32)
+        for heading_bin in range(self.NUM_HEADING_BINS):
+            for index, primitive in enumerate(self._motion_primitives):
+                centers, theta = self._integrate_primitive(primitive, heading_bin)
+                neighbors[heading_bin, index] = centers[-1]
+                heading_after[heading_bin, index] = self.heading_bin(theta)
+                if heading_after[heading_bin, index] != heading_bin:
+                    direction_change[heading_bin] = min(direction_change[heading_bin], index)
+        for table in (neighbors, heading_after, direction_change):
+            table.setflags(write=False)
+        return neighbors, heading_after, direction_change
+    
+    def heading_bin(self, theta: float) -> int:
+        """Map a heading in radians to the nearest footprint heading bin."""
+        return int(round(theta * self.NUM_HEADING_BINS / (2 * np.pi))) % self.NUM_HEADING_BINS
+    
+    def check_primitive_collision(self, primitive_idx: int, robot_x: float, robot_y: float,
+                                  robot_theta_bin: int) -> bool:
+        """
+        Check whether executing a motion primitive would hit an obstacle.
+        
+        Cells outside the grid count as collisions.
+        
+        Args:
+            primitive_idx: Index into the motion primitives
+            robot_x: Robot x position in cm
+            robot_y: Robot y position in cm
+            robot_theta_bin: Heading bin, see heading_bin()
+            
+        Returns:
+            bool: True if the swept footprint touches an occupied cell
+        """
+        offsets = self._primitive_footprints[primitive_idx][robot_theta_bin]
+        start_x, start_y = self.grid._world_to_grid(robot_x, robot_y)
+        cells_x = start_x + offsets[:, 0]
+        cells_y = start_y + offsets[:, 1]
+        height, width = self.grid.shape
+        if (cells_x.min() < 0 or cells_y.min() < 0 or
+                cells_x.max() >= width or cells_y.max() >= height):
+            return True
+        return bool((self.grid.grid[cells_y, cells_x] > self.grid.UNKNOWN_THRESHOLD).any())
+    
+    def _safe_hardware_call(self, func_name: str, *args, _bypass_breaker: bool = False, **kwargs):
         """
         Safely call a hardware function, logging errors but not crashing.
         
+        After MAX_HARDWARE_FAILURES consecutive failures, calls are skipped
+        for HARDWARE_RETRY_INTERVAL seconds; then one trial call is made,
+        and its success resumes normal calls while its failure pauses again.
+        
         Args:
             func_name: Name of the PiCar-X function to call
             *args: Positional arguments for the function
+            _bypass_breaker: Call even while calls are paused; for stopping
             **kwargs: Keyword arguments for the function
             
         Returns:
-            bool: True if successful, False if failed
+            bool: True if successful, False if failed or hardware is unavailable
         """
-        if self.picar is None:
-            logger.debug(f"Hardware call to {func_name} skipped - no hardware initialized")
+        if not self._hw_ok:
+            logger.debug("Hardware call to %s skipped - no hardware available", func_name)
+            return False
+        
+        if (not _bypass_breaker and self._hw_retry_at is not None and
+                time.monotonic() < self._hw_retry_at):
+            logger.debug("Hardware call to %s skipped - hardware calls paused", func_name)
+            return False
+            
+        func = self._picar_calls.get(func_name)
+        if func is None:
+            logger.debug("Hardware call to %s skipped - unknown function", func_name)
             return False
             
         try:
-            func = getattr(self.picar, func_name)
             func(*args, **kwargs)
-            return True
         except Exception as e:
-            logger.debug(f"Hardware call to {func_name} failed: {str(e)}")
+            logger.debug("Hardware call to %s failed: %s", func_name, e)
+            self._hw_failures += 1
+            if self._hw_failures >= self.MAX_HARDWARE_FAILURES:
+                # Circuit breaker: stop hammering hardware that keeps failing
+                if self._hw_retry_at is None:
+                    logger.error("Pausing hardware calls after %s consecutive failures", self._hw_failures)
+                self._hw_retry_at = time.monotonic() + self.HARDWARE_RETRY_INTERVAL
             return False
+        if self._hw_retry_at is not None:
+            logger.info("Hardware calls resumed")
+        self._hw_failures = 0
+        self._hw_retry_at = None
+        return True
     
     def move_forward(self, speed: Optional[float] = None) -> bool:
         """
@@ -181,8 +338,9 @@ class NavigationController:
         Returns:
             bool: True if command was successful
         """
-        stop_success = self._safe_hardware_call('stop')
-        angle_success = self._safe_hardware_call('set_dir_servo_angle', 0)
+        # Stopping is always attempted, even while hardware calls are paused
+        stop_success = self._safe_hardware_call('stop', _bypass_breaker=True)
+        angle_success = self._safe_hardware_call('set_dir_servo_angle', 0, _bypass_breaker=True)
         return stop_success and angle_success
     
     def emergency_stop(self) -> None:
@@ -204,7 +362,7 @@ class NavigationController:
             self.max_speed = min(max(0, speed), 100)
             return True
         except Exception as e:
-            logger.error(f"Error setting speed: {e}")
+            logger.error("Error setting speed: %s", e)
             return False
     
     def cleanup(self) -> None:
@@ -213,4 +371,4 @@ class NavigationController:
             self.stop()
             logger.info("Navigation system cleaned up")
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
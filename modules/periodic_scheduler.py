@@ -0,0 +1,115 @@
+"""
+Shared scheduler for periodic work in the PiCar-X robot.
+
+Periodic jobs that only need a short callback at a fixed rate register
+here instead of each owning a sleeping thread, so they share one thread
+and wake only when the earliest deadline is due.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PeriodicScheduler:
+    """
+    Runs periodic callbacks on one thread, earliest deadline first.
+    
+    Deadlines advance by each job's period on the monotonic clock, so a
+    job's rate does not drift with the time its callback takes; after an
+    overrun the job is rescheduled from now instead of catching up.
+    """
+    
+    def __init__(self, name: str = "PeriodicScheduler") -> None:
+        """
+        Initialize the scheduler; its thread starts with the first job.
+        
+        Args:
+            name: Name of the scheduler thread
+        """
+        self._name = name
+        # (deadline, job id, period, callback), ordered by deadline
+        self._heap: List[Tuple[float, int, float, Callable[[], None]]] = []
+        self._cancelled: Set[int] = set()
+        self._running_job: Optional[int] = None
+        self._cond = threading.Condition()
+        self._ids = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+    
+    def add(self, period: float, callback: Callable[[], None]) -> int:
+        """
+        Run a callback every period seconds, starting now.
+        
+        Args:
+            period: Seconds between deadlines
+            callback: Function to run; exceptions are logged, not propagated
+        
+        Returns:
+            int: Job id for remove()
+        """
+        with self._cond:
+            job_id = next(self._ids)
+            heapq.heappush(self._heap, (time.monotonic(), job_id, period, callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+                self._thread.start()
+            self._cond.notify()
+        return job_id
+    
+    def remove(self, job_id: int) -> None:
+        """
+        Stop running a job, waiting for a callback in progress to finish.
+        
+        Args:
+            job_id: Id returned by add()
+        """
+        with self._cond:
+            # Ids no longer queued or running would never be discarded
+            if job_id != self._running_job and all(entry[1] != job_id for entry in self._heap):
+                return
+            self._cancelled.add(job_id)
+            self._cond.notify()
+            if threading.current_thread() is not self._thread:
+                self._cond.wait_for(lambda: self._running_job != job_id)
+    
+    def _run(self) -> None:
+        """Scheduler thread: sleep until the earliest deadline, then run it."""
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, job_id, period, callback = self._heap[0]
+                    if job_id in self._cancelled:
+                        heapq.heappop(self._heap)
+                        self._cancelled.discard(job_id)
+                        continue
+                    delay = deadline - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        self._running_job = job_id
+                        break
+                    self._cond.wait(delay)
+            
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Error in periodic job %s: %s", job_id, e, exc_info=True)
+            
+            with self._cond:
+                self._running_job = None
+                if job_id in self._cancelled:
+                    self._cancelled.discard(job_id)
+                else:
+                    now = time.monotonic()
+                    deadline = max(deadline + period, now)
+                    heapq.heappush(self._heap, (deadline, job_id, period, callback))
+                self._cond.notify_all()
+
+# Scheduler shared by the robot's periodic pollers
+shared_scheduler = PeriodicScheduler()
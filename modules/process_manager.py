@@ -8,20 +8,42 @@ This module handles:
 - Vision processing pipeline
 """
 
+import math
 import logging
 import multiprocessing as mp
-from typing import Dict, List, Optional, Any, Callable
+import os
+import pickle
+import sys
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Any, Callable, Tuple, NamedTuple
 from queue import Empty
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+import cv2
 import numpy as np
 import time
-from concurrent.futures import ProcessPoolExecutor
 
 from config.config_manager import ProcessingConfig
 from modules.mapping_module import OccupancyGrid, RobotPose
+from modules._kernels import astar_grid_into, astar_workspace, bulk_raycast, warm_up
 
 logger = logging.getLogger(__name__)
 
+# Forked workers inherit the parent's imports and compiled kernels instead
+# of re-importing numpy, OpenCV and Numba; fork is only safe on Linux. It is
+# also only safe while Numba's thread pool has never started, which is why
+# every kernel in modules._kernels is serial; start() refuses to fork if a
+# parallel kernel ran anyway
+_MP_CONTEXT = mp.get_context('fork' if sys.platform.startswith('linux') else None)
+
+def _numba_threads_started() -> bool:
+    """Check whether a parallel Numba kernel has started its thread pool."""
+    try:
+        import numba
+        numba.threading_layer()
+    except (ImportError, ValueError):  # Not installed, or no pool started
+        return False
+    return True
+
 @dataclass
 class ProcessingTask:
     """Base class for processing tasks."""
@@ -31,36 +53,175 @@ class ProcessingTask:
 
 @dataclass
 class MappingTask(ProcessingTask):
-    """Task for parallel mapping updates."""
-    distance: float
-    angle: float
+    """Task for parallel mapping updates; one row per beam of a scan."""
+    distances: np.ndarray  # float32, cm
+    angles: np.ndarray  # float32, radians relative to the robot
     robot_pose: RobotPose
-    grid_section: np.ndarray
+    grid_section: np.ndarray  # int16 OccupancyGrid log-odds
 
 @dataclass
 class PlanningTask(ProcessingTask):
     """Task for parallel path planning."""
     start: Tuple[float, float]
     goal: Tuple[float, float]
-    grid_section: np.ndarray
+    grid_section: np.ndarray  # int16 OccupancyGrid log-odds
+    inflation_cm: float = 0.0  # Keep the path at least this far from obstacles
 
 @dataclass
 class VisionTask(ProcessingTask):
     """Task for parallel vision processing."""
-    frame: np.ndarray
+    frame: np.ndarray  # uint8 BGR
     camera_params: Dict[str, Any]
 
+def _drain(q: Any, max_items: int = 32, timeout: float = 0.1) -> List[Any]:
+    """
+    Take up to max_items from a queue, blocking only for the first.
+    
+    Args:
+        q: Queue to read from
+        max_items: Largest batch to return
+        timeout: Seconds to wait for the first item
+        
+    Returns:
+        List[Any]: At least one item
+        
+    Raises:
+        queue.Empty: If nothing arrived within the timeout
+    """
+    batch = [q.get(timeout=timeout)]
+    try:
+        while len(batch) < max_items:
+            batch.append(q.get_nowait())
+    except Empty:
+        pass
+    return batch
+
+class SharedArrayRef(NamedTuple):
+    """Location and layout of an array stored in a SharedArrayRing slot."""
+    slot: int
+    shape: Tuple[int, ...]
+    dtype: str
+
+class SharedArrayRing:
+    """
+    Fixed pool of shared-memory slots for handing arrays to worker processes.
+    
+    The producer copies an array into a free slot and sends only a small
+    SharedArrayRef through the task queue; the worker maps the slot as an
+    ndarray without unpickling or copying, then releases it. Free slot
+    indices live in a queue, which also bounds the number in flight.
+    """
+    
+    def __init__(self, num_slots: int, slot_bytes: int) -> None:
+        """
+        Allocate the shared-memory slots.
+        
+        Args:
+            num_slots: Number of arrays that can be in flight at once
+            slot_bytes: Capacity of each slot in bytes
+        """
+        self.slot_bytes = slot_bytes
+        self._slots = [shared_memory.SharedMemory(create=True, size=slot_bytes)
+                       for _ in range(num_slots)]
+        self._free = _MP_CONTEXT.Queue()
+        for slot in range(num_slots):
+            self._free.put(slot)
+    
+    def put(self, array: np.ndarray, timeout: Optional[float] = None) -> SharedArrayRef:
+        """
+        Copy an array into a free slot.
+        
+        Args:
+            array: Array to share
+            timeout: Seconds to wait for a free slot; 0 fails immediately
+            
+        Returns:
+            SharedArrayRef: Reference to pass to the worker
+            
+        Raises:
+            ValueError: If the array does not fit in a slot
+            queue.Empty: If no slot became free within the timeout
+        """
+        if array.nbytes > self.slot_bytes:
+            raise ValueError(f"Array of {array.nbytes} bytes exceeds slot size of {self.slot_bytes}")
+        slot = self._free.get(block=timeout != 0, timeout=timeout or None)
+        ref = SharedArrayRef(slot, array.shape, array.dtype.str)
+        np.copyto(self.view(ref), array)
+        return ref
+    
+    def view(self, ref: SharedArrayRef) -> np.ndarray:
+        """Map a slot as an ndarray; valid until the slot is released."""
+        return np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=self._slots[ref.slot].buf)
+    
+    def release(self, ref: SharedArrayRef) -> None:
+        """Return a slot to the free pool."""
+        self._free.put(ref.slot)
+    
+    def close(self) -> None:
+        """Free the shared memory; call once from the owning process."""
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+
+class OutOfBandChannel:
+    """
+    Many-to-one pipe that moves array buffers outside the pickle stream.
+    
+    Objects are pickled with protocol 5; ndarray buffers are sent as separate
+    messages straight from the array's memory and received into writable
+    bytearrays, so neither side copies the payload into or out of pickle
+    bytes. Unlike mp.Queue, put() is synchronous, so the sender may reuse
+    its arrays as soon as it returns.
+    """
+    
+    def __init__(self) -> None:
+        """Create the pipe and the lock that keeps senders' messages apart."""
+        self._reader, self._writer = _MP_CONTEXT.Pipe(duplex=False)
+        self._send_lock = _MP_CONTEXT.Lock()
+    
+    def put(self, obj: Any) -> None:
+        """Send an object; blocks while the pipe is full."""
+        buffers: List[pickle.PickleBuffer] = []
+        data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        raws = [buf.raw() for buf in buffers]
+        with self._send_lock:
+            self._writer.send([raw.nbytes for raw in raws])
+            self._writer.send_bytes(data)
+            for raw in raws:
+                self._writer.send_bytes(raw)
+    
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Receive an object; only one process may call this.
+        
+        Raises:
+            queue.Empty: If nothing arrived within the timeout
+        """
+        if not self._reader.poll(timeout):
+            raise Empty
+        sizes = self._reader.recv()
+        data = self._reader.recv_bytes()
+        buffers = []
+        for size in sizes:
+            buf = bytearray(size)
+            self._reader.recv_bytes_into(buf)
+            buffers.append(buf)
+        return pickle.loads(data, buffers=buffers)
+
 class ProcessManager:
     """
     Manages parallel processing operations.
     
     Features:
-    - Process pool management
+    - Long-lived worker processes per task type
     - Task queuing and distribution
     - Result aggregation
     - Resource monitoring
     """
     
+    # CPU kept free of workers for proximity polling (SensorModule.POLLING_CPU)
+    POLLING_CPU = 0
+    
     def __init__(self, config: ProcessingConfig) -> None:
         """
         Initialize the process manager.
@@ -70,66 +231,82 @@ class ProcessManager:
         """
         self.config = config
         
-        # Initialize process pools
-        self._init_process_pools()
+        # Shared-memory slots for array payloads, so only references are pickled
+        self._mapping_ring: Optional[SharedArrayRing] = None
+        self._planning_ring: Optional[SharedArrayRing] = None
+        self._vision_ring: Optional[SharedArrayRing] = None
+        if self.config.mapping['enabled']:
+            self._mapping_ring = SharedArrayRing(
+                self.config.mapping.get('shm_slots', 8),
+                self.config.mapping.get('max_section_bytes', 1 << 20)
+            )
+        if self.config.planning['enabled']:
+            self._planning_ring = SharedArrayRing(
+                self.config.planning.get('shm_slots', 2),
+                self.config.planning.get('max_field_bytes', 4 << 20)
+            )
+        if self.config.vision['enabled']:
+            self._vision_ring = SharedArrayRing(
+                self.config.vision.get('shm_slots', 4),
+                self.config.vision.get('max_frame_bytes', 640 * 480 * 3)
+            )
         
         # Task queues
-        self._mapping_queue = mp.Queue()
-        self._planning_queue = mp.Queue()
-        self._vision_queue = mp.Queue()
+        self._mapping_queue = _MP_CONTEXT.Queue()
+        self._planning_queue = _MP_CONTEXT.Queue()
+        self._vision_queue = _MP_CONTEXT.Queue()
         
         # Result queues
-        self._mapping_results = mp.Queue()
-        self._planning_results = mp.Queue()
-        self._vision_results = mp.Queue()
+        self._mapping_results = OutOfBandChannel()  # Carries whole grid sections
+        self._planning_results = _MP_CONTEXT.Queue()
+        self._vision_results = _MP_CONTEXT.Queue()
         
         # Control flags
-        self._running = mp.Value('b', False)
+        self._running = _MP_CONTEXT.Value('b', False)
         
         # Worker processes
-        self._workers: Dict[str, List[mp.Process]] = {}
+        self._workers: Dict[str, List[mp.process.BaseProcess]] = {}
+        
+        # Distance in cells from each cell to the nearest obstacle, refreshed
+        # whenever a mapping result arrives
+        self._distance_field: Optional[np.ndarray] = None
         
         logger.info("Process manager initialized")
     
-    def _init_process_pools(self) -> None:
-        """Initialize process pools for different tasks."""
-        if self.config.mapping['enabled']:
-            self._mapping_pool = ProcessPoolExecutor(
-                max_workers=self.config.mapping['num_workers']
-            )
+    def start(self) -> None:
+        """
+        Start all worker processes.
         
-        if self.config.planning['enabled']:
-            self._planning_pool = ProcessPoolExecutor(
-                max_workers=self.config.planning['num_workers']
-            )
+        Raises:
+            RuntimeError: If workers would be forked after Numba's thread pool started
+        """
+        if _MP_CONTEXT.get_start_method() == 'fork' and _numba_threads_started():
+            raise RuntimeError("A parallel Numba kernel ran before the workers were forked")
         
-        if self.config.vision['enabled']:
-            self._vision_pool = ProcessPoolExecutor(
-                max_workers=self.config.vision['num_workers']
-            )
-    
-    def start(self) -> None:
-        """Start all worker processes."""
         self._running.value = True
         
+        # Compile the kernels once here, before forking, so workers inherit
+        # them and never JIT mid-task
+        warm_up()
+        
         # Start mapping workers
         if self.config.mapping['enabled']:
             self._workers['mapping'] = [
-                mp.Process(target=self._mapping_worker, args=(i,))
+                _MP_CONTEXT.Process(target=self._mapping_worker, args=(i,))
                 for i in range(self.config.mapping['num_workers'])
             ]
         
         # Start planning workers
         if self.config.planning['enabled']:
             self._workers['planning'] = [
-                mp.Process(target=self._planning_worker, args=(i,))
+                _MP_CONTEXT.Process(target=self._planning_worker, args=(i,))
                 for i in range(self.config.planning['num_workers'])
             ]
         
         # Start vision workers
         if self.config.vision['enabled']:
             self._workers['vision'] = [
-                mp.Process(target=self._vision_worker, args=(i,))
+                _MP_CONTEXT.Process(target=self._vision_worker, args=(i,))
                 for i in range(self.config.vision['num_workers'])
             ]
         
@@ -138,20 +315,38 @@ class ProcessManager:
             for worker in worker_list:
                 worker.start()
         
+        self._pin_workers()
+        
         logger.info("All worker processes started")
     
+    def _pin_workers(self) -> None:
+        """
+        Spread workers over the CPUs other than the one reserved for
+        proximity polling.
+        
+        A task type opts out by setting ``pin_cpus: False`` in its section;
+        nothing is pinned where the OS has no affinity API.
+        """
+        if not hasattr(os, 'sched_setaffinity'):
+            return
+        cpus = sorted(os.sched_getaffinity(0) - {self.POLLING_CPU})
+        if not cpus:
+            return
+        sections = {'mapping': self.config.mapping, 'planning': self.config.planning,
+                    'vision': self.config.vision}
+        for name, worker_list in self._workers.items():
+            if not sections[name].get('pin_cpus', True):
+                continue
+            for i, worker in enumerate(worker_list):
+                try:
+                    os.sched_setaffinity(worker.pid, {cpus[i % len(cpus)]})
+                except OSError as e:
+                    logger.warning("Could not pin %s worker %s: %s", name, i, e)
+    
     def stop(self) -> None:
         """Stop all worker processes."""
         self._running.value = False
         
-        # Stop process pools
-        if hasattr(self, '_mapping_pool'):
-            self._mapping_pool.shutdown()
-        if hasattr(self, '_planning_pool'):
-            self._planning_pool.shutdown()
-        if hasattr(self, '_vision_pool'):
-            self._vision_pool.shutdown()
-        
         # Stop workers
         for worker_list in self._workers.values():
             for worker in worker_list:
@@ -159,32 +354,99 @@ class ProcessManager:
                 if worker.is_alive():
                     worker.terminate()
         
+        # Release shared memory
+        for ring in (self._mapping_ring, self._planning_ring, self._vision_ring):
+            if ring is not None:
+                ring.close()
+        
         logger.info("All worker processes stopped")
     
     def submit_mapping_task(self, task: MappingTask) -> None:
-        """Submit a mapping task for parallel processing."""
+        """
+        Submit a mapping task for parallel processing.
+        
+        The grid section travels through shared memory; waits up to a second
+        for a free slot before dropping the task.
+        
+        Raises:
+            ValueError: If the grid section is not int16 log-odds
+        """
         if not self.config.mapping['enabled']:
             return
-        self._mapping_queue.put(task)
+        if task.grid_section.dtype != np.int16:
+            raise ValueError(f"Mapping grid section must be int16 log-odds, got {task.grid_section.dtype}")
+        try:
+            ref = self._mapping_ring.put(task.grid_section, timeout=1.0)
+        except Empty:
+            logger.warning("Dropping mapping task %s: no free shared-memory slot", task.task_id)
+            return
+        self._mapping_queue.put((ref, replace(task, grid_section=None)))
     
     def submit_planning_task(self, task: PlanningTask) -> None:
-        """Submit a planning task for parallel processing."""
+        """
+        Submit a planning task for parallel processing.
+        
+        Only the blocked cells are sent, bit-packed, instead of the int16
+        section. When the task asks for inflation and a distance field
+        matching its grid section is available, the field is shared with
+        the worker.
+        """
         if not self.config.planning['enabled']:
             return
-        self._planning_queue.put(task)
+        section = task.grid_section
+        blocked = np.packbits(section > OccupancyGrid.UNKNOWN_THRESHOLD, axis=None)
+        ref = None
+        field = self._distance_field
+        if task.inflation_cm > 0 and field is not None and field.shape == section.shape:
+            try:
+                ref = self._planning_ring.put(field, timeout=1.0)
+            except Empty:
+                logger.warning("Planning task %s runs without inflation: no free shared-memory slot", task.task_id)
+        self._planning_queue.put((ref, blocked, section.shape, replace(task, grid_section=None)))
     
     def submit_vision_task(self, task: VisionTask) -> None:
-        """Submit a vision task for parallel processing."""
+        """
+        Submit a vision task for parallel processing.
+        
+        The frame travels through shared memory; when all slots are busy the
+        frame is dropped rather than queued behind stale ones.
+        
+        Raises:
+            ValueError: If the frame is not uint8
+        """
         if not self.config.vision['enabled']:
             return
-        self._vision_queue.put(task)
+        if task.frame.dtype != np.uint8:
+            raise ValueError(f"Vision frames must be uint8 BGR, got {task.frame.dtype}")
+        try:
+            ref = self._vision_ring.put(task.frame, timeout=0)
+        except Empty:
+            logger.debug("Dropping vision task %s: all frame slots busy", task.task_id)
+            return
+        self._vision_queue.put((ref, replace(task, frame=None)))
     
     def get_mapping_result(self, timeout: float = 0.1) -> Optional[np.ndarray]:
-        """Get a mapping result if available."""
+        """Get a mapping result if available, refreshing the distance field."""
         try:
-            return self._mapping_results.get(timeout=timeout)
+            result = self._mapping_results.get(timeout=timeout)
         except Empty:
             return None
+        self._distance_field = self._compute_distance_field(result)
+        return result
+    
+    @staticmethod
+    def _compute_distance_field(grid: np.ndarray) -> np.ndarray:
+        """
+        Compute the Euclidean distance from each cell to the nearest obstacle.
+        
+        Args:
+            grid: Occupancy log-odds
+            
+        Returns:
+            np.ndarray: float32 distances in cells
+        """
+        free = (grid <= OccupancyGrid.UNKNOWN_THRESHOLD).astype(np.uint8)
+        return cv2.distanceTransform(free, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
     
     def get_planning_result(self, timeout: float = 0.1) -> Optional[List[Tuple[float, float]]]:
         """Get a planning result if available."""
@@ -202,80 +464,167 @@ class ProcessManager:
     
     def _mapping_worker(self, worker_id: int) -> None:
         """Worker process for parallel mapping updates."""
-        logger.info(f"Mapping worker {worker_id} started")
+        logger.info("Mapping worker %s started", worker_id)
+        
+        # Reused across tasks; any section that fits a slot fits here
+        scratch = np.empty(self._mapping_ring.slot_bytes, dtype=np.uint8)
         
         while self._running.value:
             try:
-                task: MappingTask = self._mapping_queue.get(timeout=0.1)
-                
-                # Process the mapping update
-                result = self._process_mapping_task(task)
-                
-                # Store the result
-                self._mapping_results.put(result)
-                
+                batch = _drain(self._mapping_queue)
             except Empty:
                 continue
-            except Exception as e:
-                logger.error(f"Error in mapping worker {worker_id}: {str(e)}", exc_info=True)
+            
+            for ref, task in batch:
+                try:
+                    # Process the mapping update on the shared grid section
+                    task.grid_section = self._mapping_ring.view(ref)
+                    try:
+                        nbytes = task.grid_section.nbytes
+                        out = scratch[:nbytes].view(task.grid_section.dtype).reshape(task.grid_section.shape)
+                        self._process_mapping_task(task, out)
+                    finally:
+                        task.grid_section = None
+                        self._mapping_ring.release(ref)
+                    
+                    # Sent before the scratch is reused; put() returns once written
+                    self._mapping_results.put(out)
+                    
+                except Exception as e:
+                    logger.error("Error in mapping worker %s: %s", worker_id, e, exc_info=True)
     
     def _planning_worker(self, worker_id: int) -> None:
         """Worker process for parallel path planning."""
-        logger.info(f"Planning worker {worker_id} started")
+        logger.info("Planning worker %s started", worker_id)
+        
+        # A* scratch arrays, grown on demand and reused across queries
+        workspace = astar_workspace(0)
         
         while self._running.value:
             try:
-                task: PlanningTask = self._planning_queue.get(timeout=0.1)
-                
-                # Process the planning task
-                result = self._process_planning_task(task)
-                
-                # Store the result
-                self._planning_results.put(result)
-                
+                batch = _drain(self._planning_queue)
             except Empty:
                 continue
-            except Exception as e:
-                logger.error(f"Error in planning worker {worker_id}: {str(e)}", exc_info=True)
+            
+            for ref, blocked, shape, task in batch:
+                try:
+                    num_cells = shape[0] * shape[1]
+                    if num_cells > workspace[0].size:
+                        workspace = astar_workspace(num_cells)
+                    occupied = np.unpackbits(blocked, count=num_cells).view(np.bool_).reshape(shape)
+                    
+                    # Process the planning task, with the shared distance field if any
+                    distance_field = self._planning_ring.view(ref) if ref is not None else None
+                    try:
+                        result = self._process_planning_task(task, distance_field, workspace, occupied)
+                    finally:
+                        distance_field = None
+                        if ref is not None:
+                            self._planning_ring.release(ref)
+                    
+                    # Store the result
+                    self._planning_results.put(result)
+                    
+                except Exception as e:
+                    logger.error("Error in planning worker %s: %s", worker_id, e, exc_info=True)
     
     def _vision_worker(self, worker_id: int) -> None:
         """Worker process for parallel vision processing."""
-        logger.info(f"Vision worker {worker_id} started")
+        logger.info("Vision worker %s started", worker_id)
         
         while self._running.value:
             try:
-                task: VisionTask = self._vision_queue.get(timeout=0.1)
-                
-                # Process the vision task
-                result = self._process_vision_task(task)
-                
-                # Store the result
-                self._vision_results.put(result)
-                
+                batch = _drain(self._vision_queue)
             except Empty:
                 continue
-            except Exception as e:
-                logger.error(f"Error in vision worker {worker_id}: {str(e)}", exc_info=True)
+            
+            for ref, task in batch:
+                try:
+                    # Process the vision task on the shared frame
+                    task.frame = self._vision_ring.view(ref)
+                    try:
+                        result = self._process_vision_task(task)
+                    finally:
+                        task.frame = None
+                        self._vision_ring.release(ref)
+                    
+                    # Store the result
+                    self._vision_results.put(result)
+                    
+                except Exception as e:
+                    logger.error("Error in vision worker %s: %s", worker_id, e, exc_info=True)
     
-    def _process_mapping_task(self, task: MappingTask) -> np.ndarray:
+    def _process_mapping_task(self, task: MappingTask, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Process a mapping task in parallel.
         
         Implements the same logic as OccupancyGrid.update_occupancy but for a grid section.
+        The section holds OccupancyGrid log-odds and the robot pose is given
+        in the section's frame. All beams of the scan are applied in a single
+        kernel call.
+        
+        Args:
+            task: The mapping task
+            out: Buffer shaped like the section to write into instead of a new array
+            
+        Returns:
+            np.ndarray: The updated section
         """
-        # Implementation would go here
-        # This is a placeholder that should be replaced with actual implementation
-        return np.zeros((10, 10))  # Example return
+        if out is None:
+            section = task.grid_section.copy()
+        else:
+            section = out
+            np.copyto(section, task.grid_section)
+        inv_res = 1.0 / self.config.mapping.get('resolution_cm', 1.0)
+        pose = task.robot_pose
+        
+        # Endpoints of every finite beam in one vector expression
+        distances = np.asarray(task.distances, dtype=np.float32)
+        angles = np.asarray(task.angles, dtype=np.float32)
+        valid = np.isfinite(distances) & np.isfinite(angles)
+        headings = pose.theta + angles[valid]
+        end_xs = np.floor((pose.x + distances[valid] * np.cos(headings)) * inv_res).astype(np.int64)
+        end_ys = np.floor((pose.y + distances[valid] * np.sin(headings)) * inv_res).astype(np.int64)
+        
+        bulk_raycast(section, math.floor(pose.x * inv_res), math.floor(pose.y * inv_res),
+                     end_xs, end_ys,
+                     OccupancyGrid.FREE_LOG_ODDS, OccupancyGrid.OCCUPIED_LOG_ODDS,
+                     OccupancyGrid.LOG_ODDS_MIN, OccupancyGrid.LOG_ODDS_MAX)
+        return section
     
-    def _process_planning_task(self, task: PlanningTask) -> List[Tuple[float, float]]:
+    def _process_planning_task(self, task: PlanningTask,
+                               distance_field: Optional[np.ndarray] = None,
+                               workspace: Optional[Tuple[np.ndarray, ...]] = None,
+                               occupied: Optional[np.ndarray] = None) -> List[Tuple[float, float]]:
         """
         Process a planning task in parallel.
         
-        Implements A* pathfinding for a section of the grid.
+        Implements A* pathfinding for a section of the grid. Cells whose
+        log-odds say they are more likely occupied than unknown are blocked,
+        as are cells closer than the task's inflation to an obstacle when a
+        distance field is given.
+        
+        Args:
+            task: The planning task
+            distance_field: Distances in cells to the nearest obstacle
+            workspace: A* scratch arrays from astar_workspace, allocated if omitted
+            occupied: Blocked cells, derived from the task's grid section if omitted
+            
+        Returns:
+            List[Tuple[float, float]]: Waypoints at cell centers, empty if no path exists
         """
-        # Implementation would go here
-        # This is a placeholder that should be replaced with actual implementation
-        return [(0.0, 0.0), (1.0, 1.0)]  # Example return
+        resolution = self.config.planning.get('resolution_cm', 1.0)
+        if occupied is None:
+            occupied = task.grid_section > OccupancyGrid.UNKNOWN_THRESHOLD
+        if distance_field is not None:
+            occupied |= distance_field < task.inflation_cm / resolution
+        if workspace is None:
+            workspace = astar_workspace(occupied.size)
+        cells = astar_grid_into(occupied,
+                                int(task.start[0] // resolution), int(task.start[1] // resolution),
+                                int(task.goal[0] // resolution), int(task.goal[1] // resolution),
+                                *workspace)
+        return [((x + 0.5) * resolution, (y + 0.5) * resolution) for x, y in cells.tolist()]
     
     def _process_vision_task(self, task: VisionTask) -> Dict[str, Any]:
         """
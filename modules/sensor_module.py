@@ -4,52 +4,73 @@ Sensor Module for PiCar-X Robot
 
 import cv2
 import numpy as np
+import os
 import threading
 import time
-import speech_recognition as sr
 from typing import Optional, Tuple, Dict
 import logging
-from picarx import Picarx  # Import PiCar-X SDK
-from os import geteuid
 
-logger = logging.getLogger(__name__)
+from modules._hw_base import _HardwareInitMixin
 
-# Check for root privileges
-if geteuid() != 0:
-    print("\033[0;33mThe program needs to be run using sudo, otherwise hardware control may fail.\033[0m")
+logger = logging.getLogger(__name__)
 
-class SensorModule:
-    def __init__(self):
-        """Initialize sensor systems."""
+class SensorModule(_HardwareInitMixin):
+    # Positions of the readings in the proximity array
+    LEFT, CENTER, RIGHT = 0, 1, 2
+    
+    # Adaptive polling: fast near obstacles, slow in open space
+    NEAR_OBSTACLE_CM = 40.0
+    FAST_POLL_INTERVAL = 0.05  # 20Hz
+    SLOW_POLL_INTERVAL = 0.5  # 2Hz
+    # CPU reserved for proximity polling; workers are kept off it
+    POLLING_CPU = 0
+    POLLING_NICE = -10
+    # Center readings averaged by read_proximity; a power of two
+    PROXIMITY_WINDOW = 16
+    # Frames decoded per second by the capture thread; others are only grabbed
+    CAPTURE_FPS = 15
+    
+    def __init__(self, pin_polling_cpu: bool = True):
+        """
+        Initialize sensor systems.
+        
+        Args:
+            pin_polling_cpu: Pin the proximity thread to POLLING_CPU and raise
+                its priority; only takes effect on Linux
+        """
         # Initialize PiCar-X hardware
-        self.picar = None
-        try:
-            logger.debug("Attempting to initialize PiCar-X hardware...")
-            self.picar = Picarx()
-            logger.info("PiCar-X hardware initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize PiCar-X hardware: {e}")
-            logger.debug("Detailed hardware initialization error:", exc_info=True)
-            logger.warning("Hardware initialization failed - some functions may be limited")
+        self._init_picar()
 
         # Threading control
         self._running = False
         self._proximity_thread = None
+        self._stop_polling = threading.Event()  # Wakes the polling thread on stop
+        self._started_evt = threading.Event()  # Set once the polling loop is running
+        self._stopped_evt = threading.Event()  # Set when the polling thread exits
+        self._pin_polling_cpu = pin_polling_cpu
         
-        # Sensor data storage
-        self._latest_proximity = {
-            'left': float('inf'),
-            'center': float('inf'),
-            'right': float('inf')
-        }
+        # Sensor data storage: [left, center, right] distances
+        self._latest_proximity = np.full(3, np.inf, dtype=np.float32)
         self._proximity_lock = threading.Lock()
+        # Ring buffer of recent center readings, written only by the polling
+        # thread; the count is bumped after each write so readers need no lock
+        self._prox_buf = np.empty(self.PROXIMITY_WINDOW, dtype=np.float32)
+        self._prox_count = 0
         
         # Camera settings
         self._camera_resolution = (640, 480)
         self._camera = None
+        # Double buffer filled by the capture thread: it writes the inactive
+        # slot, then swaps under the condition
+        frame_shape = (self._camera_resolution[1], self._camera_resolution[0], 3)
+        self._frame_slots = [np.empty(frame_shape, dtype=np.uint8), np.empty(frame_shape, dtype=np.uint8)]
+        self._active_slot = 0
+        self._frame_count = 0
+        self._frame_cond = threading.Condition()
+        self._capture_running = False
+        self._capture_thread = None
         
-        # Speech recognition
-        self._recognizer = sr.Recognizer()
+        # Microphone, if one is present
         self._microphone = None
         
         # Initialize subsystems
@@ -68,34 +89,55 @@ class SensorModule:
             self.picar.set_grayscale_reference(1000)  # Set grayscale reference value
             logger.info("Proximity sensors initialized")
         except Exception as e:
-            logger.error(f"Error initializing proximity sensors: {e}")
+            logger.error("Error initializing proximity sensors: %s", e)
             logger.debug("Detailed proximity sensor error:", exc_info=True)
 
+    def _gstreamer_pipeline(self) -> str:
+        """Build a GStreamer pipeline that delivers only the newest BGR frame."""
+        width, height = self._camera_resolution
+        return (
+            f"v4l2src device=/dev/video0 ! video/x-raw,width={width},height={height} ! "
+            "videoconvert ! video/x-raw,format=BGR ! "
+            "appsink drop=1 max-buffers=1"
+        )
+
     def _init_camera(self):
-        """Initialize the camera hardware."""
+        """Initialize the camera hardware, preferring a GStreamer pipeline."""
         try:
-            self._camera = cv2.VideoCapture(0)  # Use default camera
+            # GStreamer drops stale frames in the driver instead of queueing them
+            self._camera = cv2.VideoCapture(self._gstreamer_pipeline(), cv2.CAP_GSTREAMER)
             if not self._camera.isOpened():
-                raise Exception("Could not open camera")
-            
-            # Set resolution
-            self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, self._camera_resolution[0])
-            self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self._camera_resolution[1])
+                logger.debug("GStreamer pipeline unavailable, falling back to V4L2")
+                self._camera = cv2.VideoCapture(0)  # Use default camera
+                if not self._camera.isOpened():
+                    raise Exception("Could not open camera")
+                
+                # Set resolution
+                self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, self._camera_resolution[0])
+                self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self._camera_resolution[1])
             logger.info("Camera initialized successfully")
+            
+            # Keep grabbing frames so captures never wait on the driver
+            self._capture_running = True
+            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._capture_thread.start()
         except Exception as e:
-            logger.error(f"Error initializing camera: {e}")
+            logger.error("Error initializing camera: %s", e)
             logger.debug("Detailed camera error:", exc_info=True)
             self._camera = None
 
     def _init_microphone(self):
         """Initialize the microphone."""
         try:
+            # Deferred so that importing this module stays cheap
+            import speech_recognition as sr
+            
             # Try to initialize microphone
             with sr.Microphone() as mic:
                 self._microphone = mic
                 logger.info("Microphone initialized successfully")
         except Exception as e:
-            logger.error(f"Error initializing microphone: {e}")
+            logger.error("Error initializing microphone: %s", e)
             logger.debug("Detailed microphone error:", exc_info=True)
             self._microphone = None
 
@@ -107,6 +149,10 @@ class SensorModule:
             
         if self._proximity_thread is None or not self._proximity_thread.is_alive():
             self._running = True
+            self._stop_polling.clear()
+            self._started_evt.clear()
+            self._stopped_evt.clear()
+            self._prox_count = 0
             self._proximity_thread = threading.Thread(target=self._proximity_polling_loop)
             self._proximity_thread.daemon = True
             self._proximity_thread.start()
@@ -115,58 +161,135 @@ class SensorModule:
     def stop_proximity_polling(self):
         """Stop the proximity sensor polling."""
         self._running = False
+        self._stop_polling.set()
         if self._proximity_thread:
             self._proximity_thread.join()
         logger.info("Proximity polling stopped")
 
+    def _prioritize_polling_thread(self):
+        """Pin the calling thread to POLLING_CPU and raise its priority."""
+        if not hasattr(os, 'sched_setaffinity'):
+            return
+        try:
+            # On Linux both calls apply to the calling thread only
+            os.sched_setaffinity(0, {self.POLLING_CPU})
+            os.nice(self.POLLING_NICE)
+            logger.info("Proximity polling pinned to CPU %s", self.POLLING_CPU)
+        except OSError as e:
+            logger.warning("Could not prioritize proximity polling: %s", e)
+
     def _proximity_polling_loop(self):
         """Background thread function for polling proximity sensors."""
-        while self._running:
-            try:
-                if self.picar is None:
-                    logger.warning("No hardware available for proximity polling")
-                    time.sleep(1)
-                    continue
+        if self._pin_polling_cpu:
+            self._prioritize_polling_thread()
+        
+        try:
+            while self._running:
+                self._started_evt.set()
+                try:
+                    if self.picar is None:
+                        logger.warning("No hardware available for proximity polling")
+                        self._stop_polling.wait(1)
+                        continue
+                        
+                    # Read all three sensors in one bus transaction
+                    readings = self.picar.get_grayscale_data()[:3]
                     
-                # Read ultrasonic sensors
-                left_distance = self.picar.get_grayscale_data()[0]
-                center_distance = self.picar.get_grayscale_data()[1]
-                right_distance = self.picar.get_grayscale_data()[2]
-                
-                # Update stored values thread-safely
-                with self._proximity_lock:
-                    self._latest_proximity['left'] = left_distance
-                    self._latest_proximity['center'] = center_distance
-                    self._latest_proximity['right'] = right_distance
-                
-                time.sleep(0.1)  # 10Hz polling rate
-                
-            except Exception as e:
-                logger.error(f"Error reading proximity sensors: {e}")
-                time.sleep(1)  # Wait before retrying
+                    # Update stored values thread-safely
+                    with self._proximity_lock:
+                        self._latest_proximity[:] = readings
+                    self._prox_buf[self._prox_count & (self.PROXIMITY_WINDOW - 1)] = readings[self.CENTER]
+                    self._prox_count += 1
+                    
+                    # Poll fast only while something is close
+                    if min(readings) < self.NEAR_OBSTACLE_CM:
+                        self._stop_polling.wait(self.FAST_POLL_INTERVAL)
+                    else:
+                        self._stop_polling.wait(self.SLOW_POLL_INTERVAL)
+                    
+                except Exception as e:
+                    logger.error("Error reading proximity sensors: %s", e)
+                    self._stop_polling.wait(1)  # Wait before retrying
+        finally:
+            self._stopped_evt.set()
 
-    def get_proximity_data(self) -> Dict[str, float]:
-        """Get the latest proximity sensor readings."""
+    def get_proximity_data(self) -> np.ndarray:
+        """
+        Get the latest proximity sensor readings.
+        
+        Returns:
+            np.ndarray: float32 [left, center, right] distances, indexed by
+            SensorModule.LEFT, CENTER and RIGHT
+        """
         with self._proximity_lock:
             return self._latest_proximity.copy()
 
-    def capture_image(self) -> Optional[np.ndarray]:
-        """Capture an image from the camera."""
+    def read_proximity(self) -> Optional[float]:
+        """
+        Get the distance straight ahead, averaged over recent readings.
+        
+        Returns:
+            Optional[float]: Mean of the last PROXIMITY_WINDOW center readings
+            in cm, or None before the first reading
+        """
+        count = self._prox_count
+        if count == 0:
+            return None
+        return float(self._prox_buf[:min(count, self.PROXIMITY_WINDOW)].mean())
+
+    def _capture_loop(self):
+        """Background thread function reading frames into the inactive slot."""
+        period = 1.0 / self.CAPTURE_FPS
+        next_retrieve = 0.0
+        while self._capture_running:
+            # grab() only dequeues a frame; the BGR conversion is left to
+            # retrieve(), which runs at most CAPTURE_FPS times a second
+            if not self._camera.grab():
+                time.sleep(0.1)
+                continue
+            now = time.monotonic()
+            if now < next_retrieve:
+                continue
+            inactive = 1 - self._active_slot
+            ret, frame = self._camera.retrieve(self._frame_slots[inactive])
+            if not ret:
+                continue
+            next_retrieve = now + period
+            with self._frame_cond:
+                # retrieve() allocates a new array if the camera's size differs
+                self._frame_slots[inactive] = frame
+                self._active_slot = inactive
+                self._frame_count += 1
+                self._frame_cond.notify_all()
+
+    def capture_image(self, timeout: float = 1.0) -> Optional[np.ndarray]:
+        """
+        Get the latest camera frame without waiting for the driver.
+        
+        Only blocks, for up to ``timeout`` seconds, until the first frame
+        has arrived.
+        
+        Returns:
+            Optional[np.ndarray]: A copy of the latest BGR frame, or None
+        """
         if self._camera is None:
             logger.warning("Camera not initialized")
             return None
             
-        ret, frame = self._camera.read()
-        if not ret:
-            logger.error("Failed to capture image")
-            return None
-            
-        return frame
+        with self._frame_cond:
+            if not self._frame_cond.wait_for(lambda: self._frame_count > 0, timeout):
+                logger.error("Failed to capture image")
+                return None
+            return self._frame_slots[self._active_slot].copy()
 
     def cleanup(self):
         """Clean up resources."""
         self.stop_proximity_polling()
         
+        self._capture_running = False
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout=1.0)
+        
         if self._camera is not None:
             self._camera.release()
             
@@ -176,4 +299,4 @@ class SensorModule:
                 self.picar.stop()
                 logger.info("PiCar-X hardware cleaned up")
             except Exception as e:
-                logger.error(f"Error during PiCar-X cleanup: {e}")
+                logger.error("Error during PiCar-X cleanup: %s", e)
@@ -9,22 +9,41 @@ This module handles:
 """
 
 import logging
+import os
 import time
-import threading
-from typing import Optional, Dict, List, Callable
-import psutil
+from typing import Optional, Dict, List, Callable, Tuple
+import numpy as np
 from dataclasses import dataclass
 
+from modules.periodic_scheduler import shared_scheduler
+from modules.system_snapshot import SystemSnapshot
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(frozen=True)
 class SystemStatus:
     """Container for system health metrics."""
+    __slots__ = ('battery_voltage', 'cpu_temperature', 'cpu_usage', 'memory_usage', 'timestamp')
+    
     battery_voltage: float
     cpu_temperature: float
     cpu_usage: float
     memory_usage: float
     timestamp: float
+    
+    # The default slot-state restore assigns attributes, which a frozen
+    # dataclass refuses; pickling and copying go through these instead
+    def __getstate__(self) -> tuple:
+        """Get the slot values in declaration order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state: tuple) -> None:
+        """Restore slot values without going through the frozen __setattr__."""
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+# Metrics kept in the status history, in SystemStatus field order
+HISTORY_FIELDS = ('battery_voltage', 'cpu_temperature', 'cpu_usage', 'memory_usage', 'timestamp')
 
 class SystemMonitor:
     """
@@ -44,6 +63,19 @@ class SystemMonitor:
     CPU_TEMP_WARNING = 70.0         # Celsius
     CPU_USAGE_WARNING = 90.0        # Percent
     
+    # Period of the monitoring loop
+    MONITOR_INTERVAL = 1.0          # Seconds
+    # CPU and memory load drift slowly; sample them at most this often
+    PSUTIL_MIN_INTERVAL = 2.0       # Seconds
+    
+    # Kernel thermal zone reporting the SoC temperature in millidegrees
+    THERMAL_ZONE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+    # Returned while the thermal zone cannot be read
+    DEFAULT_CPU_TEMP = 45.0         # Celsius
+    
+    # A warning that stays active is repeated at most this often
+    WARNING_REPEAT_INTERVAL = 30.0  # Seconds
+    
     def __init__(self, emergency_stop_callback: Callable[[], None]) -> None:
         """
         Initialize the system monitor.
@@ -53,59 +85,97 @@ class SystemMonitor:
         """
         self.emergency_stop_callback = emergency_stop_callback
         self.is_running: bool = False
-        self.monitor_thread: Optional[threading.Thread] = None
+        # Job on the shared periodic scheduler while monitoring
+        self._monitor_job: Optional[int] = None
         
-        # Status history (last 60 seconds, 1 reading per second)
-        self.status_history: List[SystemStatus] = []
+        # Status history (last 60 seconds, 1 reading per second), with one
+        # ring buffer row per metric
         self.status_history_max_size = 60
+        self._history = np.zeros((len(HISTORY_FIELDS), self.status_history_max_size))
+        self._history_count = 0  # Readings written so far; the cursor is this modulo the size
+        
+        # Warning name -> (active, monotonic time last emitted), to prevent spam
+        self._warning_state: Dict[str, Tuple[bool, float]] = {}
+        
+        # Descriptor kept open across reads of the thermal zone
+        self._temp_fd: Optional[int] = None
         
-        # Warning flags to prevent spam
-        self._battery_warning_sent = False
-        self._cpu_temp_warning_sent = False
+        # (monotonic time, status) of the latest reading; replaced as a whole
+        # so readers need no lock
+        self._latest: Optional[Tuple[float, SystemStatus]] = None
         
         logger.info("System monitor initialized")
     
     def start(self) -> None:
-        """Start the monitoring thread."""
+        """Start monitoring every MONITOR_INTERVAL on the shared scheduler."""
         if self.is_running:
             return
             
         self.is_running = True
-        self.monitor_thread = threading.Thread(
-            target=self._monitoring_loop,
-            daemon=True,
-            name="SystemMonitorThread"
-        )
-        self.monitor_thread.start()
+        self._monitor_job = shared_scheduler.add(self.MONITOR_INTERVAL, self._monitoring_tick)
         logger.info("System monitoring started")
     
     def stop(self) -> None:
-        """Stop the monitoring thread."""
+        """Stop monitoring, waiting for a tick in progress to finish."""
         self.is_running = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=2.0)
+        if self._monitor_job is not None:
+            shared_scheduler.remove(self._monitor_job)
+            self._monitor_job = None
+        if self._temp_fd is not None:
+            os.close(self._temp_fd)
+            self._temp_fd = None
         logger.info("System monitoring stopped")
     
     def get_current_status(self) -> SystemStatus:
-        """Get the most recent system status."""
-        return self._collect_system_metrics()
+        """
+        Get the most recent system status.
+        
+        A reading younger than MONITOR_INTERVAL, such as the one the
+        monitoring tick just took, is returned without sampling again.
+        """
+        latest = self._latest
+        if latest is not None and time.monotonic() - latest[0] < self.MONITOR_INTERVAL:
+            return latest[1]
+        return self._sample_status()
+    
+    def _sample_status(self) -> SystemStatus:
+        """Collect the metrics and publish them as the latest reading."""
+        status = self._collect_system_metrics()
+        self._latest = (time.monotonic(), status)
+        return status
     
     def get_status_history(self) -> List[SystemStatus]:
-        """Get the history of system status readings."""
-        return self.status_history.copy()
-    
-    def _monitoring_loop(self) -> None:
-        """Main monitoring loop that runs in a separate thread."""
-        while self.is_running:
-            try:
-                status = self._collect_system_metrics()
-                self._check_safety_thresholds(status)
-                self._update_history(status)
-                time.sleep(1.0)  # Check every second
-                
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {str(e)}", exc_info=True)
-                continue
+        """Get the history of system status readings, oldest first."""
+        return [SystemStatus(*column) for column in self._ordered_history().T.tolist()]
+    
+    def get_metric_history(self, metric: str) -> np.ndarray:
+        """
+        Get the recorded values of one metric, oldest first.
+        
+        Args:
+            metric: A SystemStatus field name, e.g. 'cpu_usage'
+            
+        Returns:
+            np.ndarray: float64 readings, ready for mean(), max() and the like
+        """
+        return self._ordered_history()[HISTORY_FIELDS.index(metric)]
+    
+    def _ordered_history(self) -> np.ndarray:
+        """Copy the ring buffer's filled columns in chronological order."""
+        size = self.status_history_max_size
+        if self._history_count <= size:
+            return self._history[:, :self._history_count].copy()
+        return np.roll(self._history, -(self._history_count % size), axis=1)
+    
+    def _monitoring_tick(self) -> None:
+        """Sample the metrics, check the safety thresholds and record them."""
+        try:
+            status = self._sample_status()
+            self._check_safety_thresholds(status)
+            self._update_history(status)
+            
+        except Exception as e:
+            logger.error("Error in monitoring loop: %s", e, exc_info=True)
     
     def _collect_system_metrics(self) -> SystemStatus:
         """Collect current system metrics."""
@@ -117,8 +187,7 @@ class SystemMonitor:
             battery_voltage = self._read_battery_voltage()
             
             # Get CPU and memory usage
-            cpu_usage = psutil.cpu_percent()
-            memory_usage = psutil.virtual_memory().percent
+            cpu_usage, memory_usage = SystemSnapshot.get(self.PSUTIL_MIN_INTERVAL)
             
             return SystemStatus(
                 battery_voltage=battery_voltage,
@@ -129,7 +198,7 @@ class SystemMonitor:
             )
             
         except Exception as e:
-            logger.error(f"Error collecting system metrics: {str(e)}", exc_info=True)
+            logger.error("Error collecting system metrics: %s", e, exc_info=True)
             raise
     
     def _check_safety_thresholds(self, status: SystemStatus) -> None:
@@ -138,37 +207,69 @@ class SystemMonitor:
         if status.battery_voltage <= self.BATTERY_CRITICAL_VOLTAGE:
             logger.critical("CRITICAL: Battery voltage critically low! Initiating emergency shutdown.")
             self.emergency_stop_callback()
-        elif status.battery_voltage <= self.BATTERY_WARNING_VOLTAGE and not self._battery_warning_sent:
-            logger.warning(f"Low battery warning: {status.battery_voltage:.1f}V")
-            self._battery_warning_sent = True
-        elif status.battery_voltage > self.BATTERY_WARNING_VOLTAGE:
-            self._battery_warning_sent = False
+        elif self._should_warn('battery', status.battery_voltage <= self.BATTERY_WARNING_VOLTAGE):
+            logger.warning("Low battery warning: %.1fV", status.battery_voltage)
         
         # Check CPU temperature
         if status.cpu_temperature >= self.CPU_TEMP_CRITICAL:
             logger.critical("CRITICAL: CPU temperature too high! Initiating emergency shutdown.")
             self.emergency_stop_callback()
-        elif status.cpu_temperature >= self.CPU_TEMP_WARNING and not self._cpu_temp_warning_sent:
-            logger.warning(f"High CPU temperature warning: {status.cpu_temperature:.1f}°C")
-            self._cpu_temp_warning_sent = True
-        elif status.cpu_temperature < self.CPU_TEMP_WARNING:
-            self._cpu_temp_warning_sent = False
+        elif self._should_warn('cpu_temp', status.cpu_temperature >= self.CPU_TEMP_WARNING):
+            logger.warning("High CPU temperature warning: %.1f°C", status.cpu_temperature)
         
         # Check CPU usage
-        if status.cpu_usage >= self.CPU_USAGE_WARNING:
-            logger.warning(f"High CPU usage: {status.cpu_usage:.1f}%")
+        if self._should_warn('cpu_usage', status.cpu_usage >= self.CPU_USAGE_WARNING):
+            logger.warning("High CPU usage: %.1f%%", status.cpu_usage)
+    
+    def _should_warn(self, name: str, active: bool) -> bool:
+        """
+        Track a warning condition and decide whether to log it now.
+        
+        A warning is logged when its condition becomes active and then at
+        most every WARNING_REPEAT_INTERVAL seconds while it stays active.
+        
+        Args:
+            name: Warning identifier
+            active: Whether the condition currently holds
+            
+        Returns:
+            bool: True if the warning should be logged
+        """
+        was_active, last_emit = self._warning_state.get(name, (False, 0.0))
+        if not active:
+            if was_active:
+                self._warning_state[name] = (False, last_emit)
+            return False
+        now = time.monotonic()
+        if was_active and now - last_emit < self.WARNING_REPEAT_INTERVAL:
+            return False
+        self._warning_state[name] = (True, now)
+        return True
     
     def _update_history(self, status: SystemStatus) -> None:
-        """Update the status history, maintaining the maximum size."""
-        self.status_history.append(status)
-        if len(self.status_history) > self.status_history_max_size:
-            self.status_history = self.status_history[-self.status_history_max_size:]
+        """Write a reading over the oldest slot of the history ring buffer."""
+        column = self._history[:, self._history_count % self.status_history_max_size]
+        column[0] = status.battery_voltage
+        column[1] = status.cpu_temperature
+        column[2] = status.cpu_usage
+        column[3] = status.memory_usage
+        column[4] = status.timestamp
+        self._history_count += 1
     
     def _read_cpu_temperature(self) -> float:
-        """Read the CPU temperature."""
-        # TODO: Implement actual hardware reading
-        # This is a placeholder that should be replaced with actual hardware implementation
-        return 45.0  # Example value
+        """
+        Read the CPU temperature from the kernel thermal zone.
+        
+        The file stays open between calls, so each reading is a single
+        pread. Falls back to DEFAULT_CPU_TEMP where the zone is unavailable.
+        """
+        try:
+            if self._temp_fd is None:
+                self._temp_fd = os.open(self.THERMAL_ZONE_PATH, os.O_RDONLY)
+            return int(os.pread(self._temp_fd, 16, 0)) / 1000.0
+        except (OSError, ValueError) as e:
+            logger.debug("CPU temperature unavailable: %s", e)
+            return self.DEFAULT_CPU_TEMP
     
     def _read_battery_voltage(self) -> float:
         """Read the battery voltage."""
@@ -0,0 +1,45 @@
+"""
+Process-wide cache of system load readings for the PiCar-X robot.
+
+Every component that wants CPU or memory usage reads it through
+SystemSnapshot, so /proc is parsed once per TTL however many consumers
+are running.
+"""
+
+import threading
+import time
+from typing import Optional, Tuple
+import psutil
+
+# Start psutil's CPU counters: a non-blocking cpu_percent() reports usage
+# since the previous call, and the first call has none
+psutil.cpu_percent(interval=None)
+
+class SystemSnapshot:
+    """Shared, time-limited cache of psutil CPU and memory usage."""
+    
+    _lock = threading.Lock()
+    # (monotonic time, cpu usage, memory usage) of the last sample
+    _sample: Optional[Tuple[float, float, float]] = None
+    
+    @classmethod
+    def get(cls, ttl: float = 1.0) -> Tuple[float, float]:
+        """
+        Get CPU and memory usage, sampling psutil only if the cache is stale.
+        
+        CPU usage is averaged over the time since the previous sample
+        rather than blocking for a sampling interval.
+        
+        Args:
+            ttl: Maximum age in seconds of a cached sample
+        
+        Returns:
+            Tuple[float, float]: CPU and memory usage in percent
+        """
+        with cls._lock:
+            now = time.monotonic()
+            sample = cls._sample
+            if sample is None or now - sample[0] >= ttl:
+                sample = (now, psutil.cpu_percent(interval=None), psutil.virtual_memory().percent)
+                cls._sample = sample
+            return sample[1], sample[2]
@@ -6,18 +6,30 @@ Processes voice commands and translates them into robot actions.
 import re
 import math
 import threading
-from typing import Optional, Dict, Callable, Tuple
-import speech_recognition as sr
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Dict, Callable, Deque, Tuple
 from robot_hat import TTS, Music
 from os import geteuid
 
 from .navigation_module import NavigationController, MovementCommand
 
+if TYPE_CHECKING:
+    # Imported where used instead: it pulls in requests and takes ~0.1 s
+    import speech_recognition as sr
+
 # Check for root privileges
 if geteuid() != 0:
     print("\033[0;33mThe program needs to be run using sudo, otherwise there may be no sound.\033[0m")
 
 class VoiceCommandHandler:
+    # Seconds after the wake word during which commands are accepted
+    ARMED_WINDOW = 5.0
+    # Pending utterances kept before the oldest is dropped
+    TTS_QUEUE_SIZE = 4
+    # Seconds within which a repeat of the last spoken text is skipped
+    TTS_REPEAT_WINDOW = 0.5
+    
     def __init__(self, navigation_controller: NavigationController):
         """
         Initialize the voice command handler.
@@ -27,7 +39,10 @@ class VoiceCommandHandler:
         """
         self._nav = navigation_controller
         self._is_listening = False
-        self._command_thread = None
+        # Stops speech_recognition's background listener; None when not listening
+        self._stop_background: Optional[Callable[..., None]] = None
+        self._started_evt = threading.Event()  # Set once the listener is running
+        self._stopped_evt = threading.Event()  # Set once the listener has exited
         
         # Initialize TTS and Music
         self._tts = TTS()
@@ -35,8 +50,20 @@ class VoiceCommandHandler:
         self._tts.lang("en-US")
         self._music.music_set_volume(50)  # Default volume
         
-        # Wake word to activate commands
+        # Speech is played by one worker thread so recognition never waits on it;
+        # only the newest pending utterance is spoken
+        self._tts_queue: Deque[str] = deque(maxlen=self.TTS_QUEUE_SIZE)
+        self._tts_lock = threading.Lock()
+        self._tts_ready = threading.Event()
+        # Last spoken text and the monotonic time its playback finished
+        self._last_spoken: Tuple[Optional[str], float] = (None, 0.0)
+        self._tts_thread = threading.Thread(target=self._tts_loop, daemon=True, name="TTSThread")
+        self._tts_thread.start()
+        
+        # Wake word to activate commands, and the monotonic time until which
+        # commands are accepted after hearing it
         self._wake_word = "robot"
+        self._armed_until = 0.0
         
         # Command definitions with regex patterns
         self._commands = {
@@ -79,10 +106,15 @@ class VoiceCommandHandler:
                 'handler': self._handle_status
             }
         }
+        self._compile_commands()
         
         # Initialize speech recognition
+        import speech_recognition as sr
         self._recognizer = sr.Recognizer()
         self._recognizer.energy_threshold = 4000  # Adjust based on environment
+        # Set once ambient noise has been measured; the recognizer keeps the
+        # resulting energy threshold across restarts
+        self._calibrated = False
         
         # Response templates
         self._responses = {
@@ -95,70 +127,150 @@ class VoiceCommandHandler:
         }
 
     def start_listening(self):
-        """Start listening for voice commands in a background thread."""
-        if self._command_thread is None or not self._command_thread.is_alive():
-            self._is_listening = True
-            self._command_thread = threading.Thread(target=self._listening_loop)
-            self._command_thread.daemon = True
-            self._command_thread.start()
-            return True
-        return False
+        """
+        Start listening for voice commands in the background.
+        
+        speech_recognition's background listener blocks on the microphone
+        and calls _on_audio once per captured phrase.
+        
+        Returns:
+            bool: True if listening started, False if already listening or
+            the microphone is unavailable
+        """
+        if self._stop_background is not None:
+            return False
+        self._started_evt.clear()
+        self._stopped_evt.clear()
+        try:
+            import speech_recognition as sr
+            microphone = sr.Microphone()
+            if not self._calibrated:
+                with microphone as source:
+                    # Adjust for ambient noise
+                    self._recognizer.adjust_for_ambient_noise(source, duration=1)
+                self._calibrated = True
+            self._stop_background = self._recognizer.listen_in_background(
+                microphone, self._on_audio, phrase_time_limit=5)
+        except Exception as e:
+            print(f"Error starting voice command listening: {e}")
+            return False
+        self._is_listening = True
+        self._started_evt.set()
+        return True
 
     def stop_listening(self):
         """Stop listening for voice commands."""
         self._is_listening = False
-        if self._command_thread:
-            self._command_thread.join()
+        if self._stop_background is not None:
+            self._stop_background(wait_for_stop=True)
+            self._stop_background = None
+            self._stopped_evt.set()
+
+    def recalibrate(self):
+        """Measure ambient noise again, restarting listening if it is active."""
+        self._calibrated = False
+        if self._stop_background is not None:
+            self.stop_listening()
+            self.start_listening()
 
     def _speak(self, text: str):
         """
-        Speak the given text using TTS.
+        Queue the given text for TTS without waiting for playback.
+        
+        The queue is bounded: when it is full the oldest pending message
+        is dropped, so a burst of commands cannot build up a backlog.
         
         Args:
             text: Text to speak
         """
+        with self._tts_lock:
+            self._tts_queue.append(text)
+            self._tts_ready.set()
+
+    def _tts_loop(self):
+        """
+        Background thread function speaking the newest queued text.
+        
+        Older pending messages are superseded and discarded, and a repeat
+        of the last spoken text within TTS_REPEAT_WINDOW is skipped.
+        """
+        while True:
+            self._tts_ready.wait()
+            with self._tts_lock:
+                text = self._tts_queue.pop()
+                self._tts_queue.clear()
+                self._tts_ready.clear()
+            
+            last_text, last_time = self._last_spoken
+            if text == last_text and time.monotonic() - last_time < self.TTS_REPEAT_WINDOW:
+                continue
+            
+            try:
+                self._tts.say(text)
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                # Fallback to print if TTS fails
+                print(text)
+            self._last_spoken = (text, time.monotonic())
+
+    def _on_audio(self, recognizer: 'sr.Recognizer', audio: 'sr.AudioData'):
+        """
+        Process one phrase captured by the background listener.
+        
+        Args:
+            recognizer: The recognizer that captured the phrase
+            audio: The captured audio
+        """
+        import speech_recognition as sr
         try:
-            self._tts.say(text)
+            # Convert to text
+            text = recognizer.recognize_google(audio).lower()
+            print(f"Heard: {text}")
+            
+            # A command spoken with the wake word runs straight away; the
+            # wake word alone arms the handler for the next phrase
+            command = text
+            if self._wake_word in text:
+                command = text.split(self._wake_word, 1)[1].strip()
+                if not command:
+                    self._armed_until = time.monotonic() + self.ARMED_WINDOW
+                    self._speak(self._responses['wake_word'])
+                    return
+            elif time.monotonic() >= self._armed_until and not self._stop_regex.search(text):
+                # Ignore speech that does not follow the wake word, except stop
+                return
+            
+            # Process command
+            success = self._process_command(command)
+            if success:
+                self._speak(self._responses['command_success'])
+            else:
+                self._speak(self._responses['not_understood'])
+                
+        except sr.UnknownValueError:
+            # Speech was unintelligible
+            return
         except Exception as e:
-            print(f"TTS Error: {e}")
-            # Fallback to print if TTS fails
-            print(text)
+            print(f"Error in voice command processing: {e}")
 
-    def _listening_loop(self):
-        """Background thread function for continuous command processing."""
-        with sr.Microphone() as source:
-            # Adjust for ambient noise
-            self._recognizer.adjust_for_ambient_noise(source, duration=1)
-            
-            while self._is_listening:
-                try:
-                    # Listen for audio input
-                    audio = self._recognizer.listen(source, timeout=1, phrase_time_limit=5)
-                    
-                    # Convert to text
-                    text = self._recognizer.recognize_google(audio).lower()
-                    print(f"Heard: {text}")
-                    
-                    # Check for wake word
-                    if self._wake_word in text:
-                        self._speak(self._responses['wake_word'])
-                        continue
-                    
-                    # Process command
-                    success = self._process_command(text)
-                    if success:
-                        self._speak(self._responses['command_success'])
-                    else:
-                        self._speak(self._responses['not_understood'])
-                        
-                except sr.WaitTimeoutError:
-                    continue
-                except sr.UnknownValueError:
-                    # Speech was unintelligible
-                    continue
-                except Exception as e:
-                    print(f"Error in voice command processing: {e}")
-                    continue
+    def _compile_commands(self):
+        """
+        Compile every command pattern into one regex.
+        
+        Each pattern becomes a lookahead alternative in command order, so a
+        single match at the start of the text finds the first pattern that
+        occurs anywhere in it, as searching the patterns one by one would.
+        Matching ignores case, so custom commands need not be lowercase.
+        """
+        self._pattern_table = []  # (compiled pattern, handler) per alternative
+        alternatives = []
+        for command_info in self._commands.values():
+            for pattern in command_info['patterns']:
+                alternatives.append(f'(?=.*?(?P<p{len(self._pattern_table)}>{pattern}))')
+                self._pattern_table.append((re.compile(pattern, re.IGNORECASE), command_info['handler']))
+        self._command_regex = re.compile('|'.join(alternatives), re.DOTALL | re.IGNORECASE)
+        # Stop is always honoured, with or without the wake word
+        self._stop_regex = re.compile('|'.join(self._commands['stop']['patterns']), re.IGNORECASE)
 
     def _process_command(self, text: str) -> bool:
         """
@@ -170,12 +282,12 @@ class VoiceCommandHandler:
         Returns:
             bool: True if command was processed successfully
         """
-        for command_type, command_info in self._commands.items():
-            for pattern in command_info['patterns']:
-                match = re.search(pattern, text)
-                if match:
-                    return command_info['handler'](match)
-        return False
+        hit = self._command_regex.match(text)
+        if hit is None or hit.lastgroup is None:
+            return False
+        # Rerun only the winning pattern so the handler sees its own groups
+        pattern, handler = self._pattern_table[int(hit.lastgroup[1:])]
+        return handler(pattern.search(text))
 
     def _handle_stop(self, match) -> bool:
         """Handle stop command."""
@@ -266,6 +378,7 @@ class VoiceCommandHandler:
             'patterns': patterns,
             'handler': handler
         }
+        self._compile_commands()
 
     def set_wake_word(self, word: str):
         """
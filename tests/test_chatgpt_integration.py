@@ -3,11 +3,13 @@ Test cases for the ChatGPT Integration Module
 """
 
 import unittest
+import asyncio
 import os
-import time
 import numpy as np
-from unittest.mock import Mock, patch
-from modules.chatgpt_integration import ChatGPTClient
+from unittest.mock import AsyncMock, Mock, patch
+import httpx
+from openai import RateLimitError
+from modules.chatgpt_integration import ChatGPTClient, TokenBucket, RATE_LIMIT_STREAK, RATE_RECOVERY
 
 class TestChatGPTClient(unittest.TestCase):
     def setUp(self):
@@ -33,13 +35,10 @@ class TestChatGPTClient(unittest.TestCase):
             with self.assertRaises(ValueError):
                 ChatGPTClient()
 
-    @patch('openai.OpenAI')
-    def test_send_sensor_data(self, mock_openai):
+    def test_send_sensor_data(self):
         """Test sending sensor data."""
         # Mock OpenAI response
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Test response"))]
-        mock_openai.return_value.chat.completions.create.return_value = mock_response
+        create = self._mock_async_client("Test response")
         
         # Test with sample sensor data
         sensor_data = {
@@ -52,34 +51,58 @@ class TestChatGPTClient(unittest.TestCase):
         self.assertEqual(response, "Test response")
         
         # Verify API was called with correct format
-        mock_openai.return_value.chat.completions.create.assert_called_once()
+        create.assert_awaited_once()
 
-    @patch('openai.OpenAI')
-    def test_send_image_for_analysis(self, mock_openai):
+    def test_send_sensor_batch(self):
+        """Test sending a batch of sensor readings in one request."""
+        create = self._mock_async_client("Batch response")
+        
+        readings = [
+            {'proximity': 30.5, 'pose_x': 0.0},
+            {'proximity': 28.0, 'pose_x': 1.0},
+            {'proximity': 25.5, 'pose_x': 2.0}
+        ]
+        
+        response = self.client.send_sensor_batch(readings)
+        self.assertEqual(response, "Batch response")
+        
+        # All readings should go out in a single API call
+        create.assert_awaited_once()
+        
+        # An empty batch should not make a request
+        self.assertEqual(self.client.send_sensor_batch([]), "")
+
+    def test_send_image_for_analysis(self):
         """Test sending image for analysis."""
         # Create a dummy image
         image = np.zeros((100, 100, 3), dtype=np.uint8)
         
         # Mock OpenAI response
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Image analysis result"))]
-        mock_openai.return_value.chat.completions.create.return_value = mock_response
+        create = self._mock_async_client("Image analysis result")
         
         response = self.client.send_image_for_analysis(image)
         self.assertEqual(response, "Image analysis result")
         
         # Verify API was called with vision model
-        mock_openai.return_value.chat.completions.create.assert_called_once()
-        call_args = mock_openai.return_value.chat.completions.create.call_args[1]
+        create.assert_awaited_once()
+        call_args = create.call_args[1]
         self.assertEqual(call_args['model'], "gpt-4-vision-preview")
 
-    @patch('openai.OpenAI')
-    def test_get_navigation_advice(self, mock_openai):
+    def test_image_downscale(self):
+        """Test that large frames are shrunk before encoding."""
+        image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        
+        resized = self.client._downscale(image)
+        self.assertEqual(resized.shape, (432, 768, 3))
+        
+        # Small frames pass through untouched
+        small = np.zeros((100, 100, 3), dtype=np.uint8)
+        self.assertIs(self.client._downscale(small), small)
+
+    def test_get_navigation_advice(self):
         """Test getting navigation advice."""
         # Mock OpenAI response
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Navigation advice"))]
-        mock_openai.return_value.chat.completions.create.return_value = mock_response
+        self._mock_async_client("Navigation advice")
         
         # Test data
         current_pose = {'x': 10.0, 'y': 20.0, 'theta': 45.0}
@@ -89,13 +112,33 @@ class TestChatGPTClient(unittest.TestCase):
         response = self.client.get_navigation_advice(current_pose, obstacle_data, target)
         self.assertEqual(response, "Navigation advice")
 
-    @patch('openai.OpenAI')
-    def test_get_exploration_strategy(self, mock_openai):
+    def test_watch_navigation_advice(self):
+        """Test that streamed stop advice triggers the callback before the stream ends."""
+        deltas = ["Obstacle", " ahead,", " turn left."]
+        seen_at_stop = []
+        
+        async def stream():
+            for delta in deltas:
+                yield Mock(choices=[Mock(delta=Mock(content=delta))])
+        
+        self.client._client = Mock()
+        self.client._client.chat.completions.create = AsyncMock(return_value=stream())
+        on_stop = Mock(side_effect=lambda: seen_at_stop.append(len(self.client._conversation_history)))
+        
+        advice = self.client.watch_navigation_advice(
+            {'x': 0.0, 'y': 0.0, 'theta': 0.0}, {'front': 10.0}, on_stop)
+        
+        self.assertEqual(advice, "Obstacle ahead, turn left.")
+        on_stop.assert_called_once()
+        # The callback fired mid-stream, before the turn was recorded
+        self.assertEqual(seen_at_stop, [0])
+        self.assertEqual(len(self.client._conversation_history), 2)
+        self.assertTrue(self.client._client.chat.completions.create.call_args[1]['stream'])
+
+    def test_get_exploration_strategy(self):
         """Test getting exploration strategy."""
         # Mock OpenAI response
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Exploration strategy"))]
-        mock_openai.return_value.chat.completions.create.return_value = mock_response
+        self._mock_async_client("Exploration strategy")
         
         # Test data
         explored_percentage = 35.5
@@ -104,37 +147,192 @@ class TestChatGPTClient(unittest.TestCase):
         response = self.client.get_exploration_strategy(explored_percentage, frontier_points)
         self.assertEqual(response, "Exploration strategy")
 
+    def _mock_async_client(self, content):
+        """Replace the async API client so no network calls are made."""
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content=content))]
+        raw_response = Mock(headers={})
+        raw_response.parse.return_value = mock_response
+        self.client._client = Mock()
+        create = AsyncMock(return_value=raw_response)
+        self.client._client.chat.completions.with_raw_response.create = create
+        return create
+
+    def test_send_many(self):
+        """Test sending several prompts concurrently."""
+        create = self._mock_async_client("Concurrent response")
+        
+        responses = self.client.send_many(["Prompt 1", "Prompt 2", "Prompt 3"])
+        
+        # One response per prompt, in order
+        self.assertEqual(responses, ["Concurrent response"] * 3)
+        self.assertEqual(create.await_count, 3)
+
     def test_rate_limiting(self):
         """Test rate limiting functionality."""
-        start_time = time.time()
-        
-        # Make two quick requests
-        with patch('openai.OpenAI') as mock_openai:
-            mock_response = Mock()
-            mock_response.choices = [Mock(message=Mock(content="Test response"))]
-            mock_openai.return_value.chat.completions.create.return_value = mock_response
-            
+        self._mock_async_client("Test response")
+        
+        # A bucket holding a single request refilling at 10 requests per second
+        bucket = TokenBucket(capacity=1, refill_rate=10.0)
+        self.client._request_bucket = bucket
+        
+        # Sleeping moves the bucket's clock instead of waiting in real time
+        waits = []
+        async def fake_sleep(delay):
+            waits.append(delay)
+            bucket.last_refill -= delay
+        
+        with patch('modules.chatgpt_integration.asyncio.sleep', side_effect=fake_sleep):
+            # Make two quick requests
             self.client._send_message("Test 1")
             self.client._send_message("Test 2")
-            
-            # Check that at least min_request_interval seconds passed
-            elapsed = time.time() - start_time
-            self.assertGreaterEqual(elapsed, self.client._min_request_interval)
+        
+        # Only the second request has to wait for the bucket to refill
+        self.assertEqual(len(waits), 1)
+        self.assertAlmostEqual(waits[0], 0.1, delta=0.01)
+
+    def test_rate_limit_headers(self):
+        """Test that rate limits are retuned from response headers."""
+        self.client._update_rate_limits({
+            'x-ratelimit-limit-requests': '60',
+            'x-ratelimit-remaining-requests': '5'
+        })
+        self.assertEqual(self.client._request_bucket.capacity, 60)
+        self.assertAlmostEqual(self.client._request_bucket.refill_rate, 1.0)
+        self.assertLessEqual(self.client._request_bucket.tokens, 5)
+
+    def test_retry_on_rate_limit(self):
+        """Test that 429s are retried and a run of them halves the request rate."""
+        create = self._mock_async_client("Test response")
+        raw_response = create.return_value
+        response_429 = httpx.Response(429, request=httpx.Request('POST', 'https://api.openai.com'))
+        rate_limited = RateLimitError("rate limited", response=response_429, body=None)
+        create.side_effect = [rate_limited] * 3 + [raw_response]
+        rate = self.client._request_bucket.refill_rate
+        
+        with patch('modules.chatgpt_integration.asyncio.sleep', new=AsyncMock()):
+            response = self.client._send_message("Test message")
+        
+        self.assertEqual(response, "Test response")
+        self.assertEqual(create.call_count, 4)
+        # Halved, then lifted slightly by the successful response
+        self.assertAlmostEqual(self.client._request_bucket.refill_rate, rate / 2 * RATE_RECOVERY)
+
+    def test_throttle_survives_rate_limit_headers(self):
+        """Test that limit headers after a run of 429s keep the rate reduced."""
+        create = self._mock_async_client("Test response")
+        raw_response = create.return_value
+        raw_response.headers = {'x-ratelimit-limit-requests': '60'}
+        response_429 = httpx.Response(429, request=httpx.Request('POST', 'https://api.openai.com'))
+        rate_limited = RateLimitError("rate limited", response=response_429, body=None)
+        create.side_effect = [rate_limited] * RATE_LIMIT_STREAK + [raw_response]
+        
+        with patch('modules.chatgpt_integration.asyncio.sleep', new=AsyncMock()):
+            self.client._send_message("Test message")
+        
+        # The header's 1 request/s limit is applied at the throttled rate
+        bucket = self.client._request_bucket
+        self.assertEqual(bucket.capacity, 60)
+        self.assertAlmostEqual(bucket.refill_rate, 0.5 * RATE_RECOVERY)
+        
+        # Further successes recover the rate gradually, up to the limit
+        create.side_effect = None
+        self.client._send_message("Another message")
+        self.assertAlmostEqual(bucket.refill_rate, 0.5 * RATE_RECOVERY ** 2)
+        for _ in range(50):
+            bucket.recover()
+        self.assertAlmostEqual(bucket.refill_rate, 1.0)
+        self.assertEqual(bucket.throttle_factor, 1.0)
+
+    def test_coalesced_sensor_data(self):
+        """Test that concurrent sensor analyses share a single request."""
+        create = self._mock_async_client("1. First answer\n2. Second answer")
+        
+        async def send_both():
+            return await asyncio.gather(
+                self.client.send_sensor_data_async({'proximity': 30.5}),
+                self.client.send_sensor_data_async({'proximity': 12.0})
+            )
+        
+        responses = self.client._run(send_both())
+        
+        # Each caller gets its own numbered answer from one API call
+        self.assertEqual(responses, ["First answer", "Second answer"])
+        create.assert_awaited_once()
+
+    def test_sync_sensor_data_not_coalesced(self):
+        """Test that blocking calls send at once instead of waiting the window."""
+        create = self._mock_async_client("Direct response")
+        
+        with patch.object(self.client, '_send_coalesced') as send_coalesced:
+            self.assertEqual(self.client.send_sensor_data({'proximity': 30.5}), "Direct response")
+            self.assertEqual(self.client.send_sensor_batch([{'proximity': 12.0}]), "Direct response")
+        
+        send_coalesced.assert_not_called()
+        self.assertEqual(create.await_count, 2)
+
+    def test_response_cache(self):
+        """Test that repeated sensor analyses are answered from the cache."""
+        create = self._mock_async_client("Cached response")
+        
+        reading = {'proximity': 30.5}
+        self.assertEqual(self.client.send_sensor_data(reading), "Cached response")
+        self.assertEqual(self.client.send_sensor_data(reading), "Cached response")
+        
+        # Only the first prompt should reach the API
+        create.assert_awaited_once()
+
+    def test_response_cache_in_long_dialog(self):
+        """Test that the cache keeps working however long the dialog grows."""
+        create = self._mock_async_client("Response")
+        
+        # Fill the conversation history to its limit
+        while len(self.client._conversation_history) < self.client._conversation_history.maxlen:
+            self.client._send_message(f"Question {len(self.client._conversation_history)}")
+        calls = create.await_count
+        
+        # Sensor analyses go out without the history, so repeats still hit
+        reading = {'proximity': 12.0}
+        self.client.send_sensor_data(reading)
+        self.assertEqual(create.call_args[1]['messages'][:-1], [self.client._system_msg])
+        self.client.send_sensor_data(reading)
+        self.assertEqual(create.await_count, calls + 1)
+        
+        # Prompts sent with the history are never answered from the cache
+        self.client._send_message("Same prompt")
+        self.client._send_message("Same prompt")
+        self.assertEqual(create.await_count, calls + 3)
+
+    def test_batch_submission(self):
+        """Test queuing sensor analyses for the Batch API."""
+        submitter = self.client._batch_submitter
+        submitter._client = Mock()
+        submitter._client.files.create = AsyncMock(return_value=Mock(id="file-1"))
+        submitter._client.batches.create = AsyncMock(return_value=Mock(id="batch-1"))
+        
+        # Batched analyses are queued instead of sent
+        custom_id = self.client.send_sensor_data({'proximity': 30.5}, batch=True)
+        self.assertEqual(submitter.pending_count, 1)
+        
+        batch_id = self.client.submit_batch()
+        self.assertEqual(batch_id, "batch-1")
+        self.assertEqual(submitter.pending_count, 0)
+        
+        # The uploaded JSONL should carry the custom id of the queued request
+        _, data = submitter._client.files.create.call_args[1]['file']
+        self.assertIn(custom_id, data.decode('utf-8'))
 
     def test_conversation_history(self):
         """Test conversation history management."""
         # Add some messages
-        with patch('openai.OpenAI') as mock_openai:
-            mock_response = Mock()
-            mock_response.choices = [Mock(message=Mock(content="Response"))]
-            mock_openai.return_value.chat.completions.create.return_value = mock_response
-            
-            for i in range(self.client._max_history_length + 5):
-                self.client._send_message(f"Test message {i}")
-            
-            # Check history length is maintained
-            history_length = len(self.client._conversation_history)
-            self.assertLessEqual(history_length, self.client._max_history_length * 2)
+        self._mock_async_client("Response")
+        
+        for i in range(self.client._max_history_length + 5):
+            self.client._send_message(f"Test message {i}")
+        
+        # Check history length is maintained
+        history_length = len(self.client._conversation_history)
+        self.assertLessEqual(history_length, self.client._max_history_length * 2)
         
         # Test clearing history
         self.client.clear_conversation_history()
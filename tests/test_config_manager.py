@@ -0,0 +1,52 @@
+"""
+Test cases for the Configuration Manager
+"""
+
+import unittest
+import copy
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from config.config_manager import ConfigManager, WebConfig, ProcessingConfig
+
+class TestTypedConfigs(unittest.TestCase):
+    def test_pickle_round_trip(self):
+        """Test that frozen, slotted configs survive pickling and copying."""
+        configs = [
+            WebConfig(host='0.0.0.0', port=5000, update_interval_ms=100,
+                      features={'video': True}, security={'auth': False}),
+            ProcessingConfig(mapping={'enabled': True, 'num_workers': 2},
+                             planning={'enabled': False}, vision={'enabled': False})
+        ]
+        for config in configs:
+            for restored in (pickle.loads(pickle.dumps(config)), copy.deepcopy(config)):
+                self.assertEqual(restored, config)
+                self.assertIs(type(restored), type(config))
+
+class TestYamlCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a manager on an empty directory without loading any files."""
+        self.config_dir = Path(tempfile.mkdtemp())
+        self.manager = ConfigManager.__new__(ConfigManager)
+        self.manager.config_dir = self.config_dir
+
+    def tearDown(self):
+        """Remove the configuration directory."""
+        shutil.rmtree(self.config_dir)
+
+    def test_one_entry_per_file(self):
+        """Test that editing a file replaces its cache entry instead of adding one."""
+        path = self.config_dir / "extra.yaml"
+        for version in range(3):
+            path.write_text(f"value: {version}\n" + "padding: x\n" * version, encoding="utf-8")
+            os.utime(path, ns=(version * 10**9, version * 10**9))
+            self.assertEqual(self.manager._load_yaml_cached(path)['value'], version)
+            # The unchanged file is served from the cache
+            self.assertEqual(self.manager._load_yaml_cached(path)['value'], version)
+        
+        self.assertEqual(len(list((self.config_dir / ".cache").glob("*.pkl"))), 1)
+
+if __name__ == '__main__':
+    unittest.main()
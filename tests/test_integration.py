@@ -17,29 +17,45 @@ from modules.chatgpt_integration import ChatGPTClient
 from modules.sensor_module import SensorModule
 
 class TestSystemIntegration(unittest.TestCase):
-    def setUp(self):
-        """Set up the complete robot system for testing."""
+    @classmethod
+    def setUpClass(cls):
+        """Set up the complete robot system once for all tests."""
         # Initialize all components
-        self.grid = OccupancyGrid(width_cm=500, height_cm=500, resolution_cm=1)
-        self.nav = NavigationController(self.grid)
-        self.sensors = SensorModule()
+        cls.grid = OccupancyGrid(width_cm=500, height_cm=500, resolution_cm=1)
+        cls.nav = NavigationController(cls.grid)
+        cls.sensors = SensorModule()
         
         # Mock ChatGPT client to avoid API calls
         with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
-            self.chatgpt = ChatGPTClient()
+            cls.chatgpt = ChatGPTClient()
         
-        self.voice_handler = VoiceCommandHandler(self.nav)
+        cls.voice_handler = VoiceCommandHandler(cls.nav)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Release the shared components."""
+        cls.sensors.cleanup()
+        cls.chatgpt.close()
+
+    def setUp(self):
+        """Reset the state tests mutate."""
+        self.grid.reset()
+        self.nav._current_pose = RobotPose(x=0.0, y=0.0, theta=0.0)
 
     def tearDown(self):
         """Clean up after tests."""
-        self.sensors.release()
+        self.sensors.stop_proximity_polling()
         self.voice_handler.stop_listening()
 
     def test_sensor_to_mapping_integration(self):
         """Test sensor data integration with mapping."""
         # Start sensor polling
         self.sensors.start_proximity_polling()
-        time.sleep(0.2)  # Wait for some readings
+        
+        # Wait for the first reading rather than a fixed time
+        deadline = time.monotonic() + 2.0
+        while self.sensors._prox_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
         
         # Get sensor reading
         distance = self.sensors.read_proximity()
@@ -138,9 +154,11 @@ class TestSystemIntegration(unittest.TestCase):
 
     def test_error_handling_integration(self):
         """Test error handling across module interactions."""
-        # Test sensor failure handling
-        self.sensors.release()  # Simulate sensor failure
-        distance = self.sensors.read_proximity()
+        # Test sensor failure handling on a separate instance, since the
+        # shared one is used by the other tests
+        sensors = SensorModule()
+        sensors.release()  # Simulate sensor failure
+        distance = sensors.read_proximity()
         self.assertIsNone(distance)  # Should handle gracefully
         
         # Test navigation with invalid target
@@ -163,12 +181,13 @@ class TestSystemIntegration(unittest.TestCase):
         self.sensors.start_proximity_polling()
         self.voice_handler.start_listening()
         
-        # Simulate concurrent operations
-        time.sleep(0.5)  # Let threads initialize
+        # Wait until both background workers are actually running
+        self.assertTrue(self.sensors._started_evt.wait(2.0))
+        self.assertTrue(self.voice_handler._started_evt.wait(2.0))
         
         # Verify all systems are running
         self.assertTrue(self.sensors._proximity_thread.is_alive())
-        self.assertTrue(self.voice_handler._command_thread.is_alive())
+        self.assertIsNotNone(self.voice_handler._stop_background)
         
         # Test sensor reading while voice processing is active
         distance = self.sensors.read_proximity()
@@ -179,9 +198,10 @@ class TestSystemIntegration(unittest.TestCase):
         self.voice_handler.stop_listening()
         
         # Verify clean shutdown
-        time.sleep(0.2)
+        self.assertTrue(self.sensors._stopped_evt.wait(2.0))
+        self.assertTrue(self.voice_handler._stopped_evt.wait(2.0))
         self.assertFalse(self.sensors._proximity_thread.is_alive())
-        self.assertFalse(self.voice_handler._command_thread.is_alive())
+        self.assertIsNone(self.voice_handler._stop_background)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Test cases for the Numba kernels
+"""
+
+import unittest
+import numpy as np
+from modules._kernels import astar_grid, raycast_update, bresenham_cells, bulk_raycast, \
+    astar_grid_into, astar_workspace, label_components, sweep_raycast, frontier_mask
+
+class TestKernels(unittest.TestCase):
+    def test_bresenham_cells(self):
+        """Test that only in-bounds cells of a line are written."""
+        out = np.empty((11, 2), dtype=np.int32)
+        n = bresenham_cells(-3, 0, 12, 3, 10, 10, out)
+        cells = out[:n]
+        self.assertEqual(n, 10)
+        self.assertTrue(np.all((cells >= 0) & (cells < 10)))
+
+    def test_raycast_update(self):
+        """Test free cells along the ray and an occupied endpoint."""
+        grid = np.zeros((10, 10), dtype=np.int16)
+        raycast_update(grid, 0, 5, 6, 5, -10, 20, -100, 100)
+        self.assertTrue(np.all(grid[5, :6] == -10))
+        self.assertEqual(grid[5, 6], 20)
+        self.assertEqual(np.count_nonzero(grid), 7)
+
+        # Updates saturate at the bounds
+        for _ in range(20):
+            raycast_update(grid, 0, 5, 6, 5, -10, 20, -100, 100)
+        self.assertEqual(grid[5, 0], -100)
+        self.assertEqual(grid[5, 6], 100)
+
+    def test_bulk_raycast(self):
+        """Test that a fan of rays matches individual raycast updates."""
+        end_xs = np.array([9, 0, 5], dtype=np.int64)
+        end_ys = np.array([5, 0, 9], dtype=np.int64)
+        bulk = np.zeros((10, 10), dtype=np.int16)
+        bulk_raycast(bulk, 5, 5, end_xs, end_ys, -10, 20, -100, 100)
+
+        single = np.zeros((10, 10), dtype=np.int16)
+        for ex, ey in zip(end_xs, end_ys):
+            raycast_update(single, 5, 5, ex, ey, -10, 20, -100, 100)
+        np.testing.assert_array_equal(bulk, single)
+
+    def test_sweep_raycast(self):
+        """Test that a polar sweep matches rays to precomputed end cells."""
+        distances = np.array([4.0, np.nan, 3.2, 5.0])
+        angles = np.array([0.0, 1.0, np.pi / 2, -2.5])
+        swept = np.zeros((10, 10), dtype=np.int16)
+        sweep_raycast(swept, 5.5, 5.5, 0.0, distances, angles, 1.0, -10, 20, -100, 100)
+
+        single = np.zeros((10, 10), dtype=np.int16)
+        for distance, angle in zip(distances, angles):
+            if np.isnan(distance):
+                continue
+            end_x = int(np.floor(5.5 + distance * np.cos(angle)))
+            end_y = int(np.floor(5.5 + distance * np.sin(angle)))
+            raycast_update(single, 5, 5, end_x, end_y, -10, 20, -100, 100)
+        np.testing.assert_array_equal(swept, single)
+
+    def test_astar_grid(self):
+        """Test that A* finds a path around a wall."""
+        occ = np.zeros((20, 20), dtype=np.bool_)
+        occ[0:15, 10] = True
+
+        path = astar_grid(occ, 2, 2, 18, 2)
+        self.assertEqual(tuple(path[0]), (2, 2))
+        self.assertEqual(tuple(path[-1]), (18, 2))
+        self.assertFalse(any(occ[y, x] for x, y in path))
+
+        # Consecutive cells are 8-connected neighbours
+        steps = np.abs(np.diff(path, axis=0))
+        self.assertTrue(np.all(steps.max(axis=1) == 1))
+
+    def test_astar_workspace_reuse(self):
+        """Test that one workspace gives the same paths across grid sizes."""
+        workspace = astar_workspace(400)
+        big = np.zeros((20, 20), dtype=np.bool_)
+        big[0:15, 10] = True
+        small = np.zeros((8, 8), dtype=np.bool_)
+        for occ, goal in ((big, (18, 2)), (small, (7, 7)), (big, (18, 2))):
+            np.testing.assert_array_equal(astar_grid_into(occ, 1, 1, goal[0], goal[1], *workspace),
+                                          astar_grid(occ, 1, 1, goal[0], goal[1]))
+
+    def test_astar_no_path(self):
+        """Test that an enclosed goal yields an empty path."""
+        occ = np.zeros((10, 10), dtype=np.bool_)
+        occ[:, 5] = True
+        self.assertEqual(astar_grid(occ, 1, 1, 8, 8).shape, (0, 2))
+
+    def test_frontier_mask(self):
+        """Test the fused frontier mask against whole-array NumPy masks."""
+        values = np.array([-32000, -76, -75, -25, -24, 0, 24, 25, 32000], dtype=np.int16)
+        grid = np.random.default_rng(0).choice(values, size=(30, 40))
+        out = np.empty((28, 38), dtype=np.bool_)
+        frontier_mask(grid, 25, -75, out)
+
+        unknown = np.abs(grid) < 25
+        expected = (unknown[:-2, 1:-1] | unknown[2:, 1:-1] | unknown[1:-1, :-2] |
+                    unknown[1:-1, 2:]) & (grid[1:-1, 1:-1] < -75)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_label_components(self):
+        """Test 8-connected labelling of separate blobs."""
+        mask = np.zeros((6, 6), dtype=np.bool_)
+        mask[0, 0] = mask[1, 1] = True  # Diagonal neighbours join
+        mask[4:, 4:] = True
+        labels = np.full((6, 6), -1, dtype=np.int32)
+        n = label_components(mask, labels, np.empty(36, dtype=np.int64))
+        self.assertEqual(n, 2)
+        self.assertEqual(labels[0, 0], labels[1, 1])
+        self.assertNotEqual(labels[0, 0], labels[5, 5])
+        self.assertTrue(np.all(labels[~mask] == 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,11 +19,11 @@ class TestOccupancyGrid(unittest.TestCase):
         self.assertEqual(self.grid.height_cells, 100)
         self.assertEqual(self.grid.resolution_cm, 1)
         
-        # Check that grid is initialized with unknown values (0.5)
-        self.assertTrue(np.allclose(self.grid._grid, 0.5))
+        # Check that grid is initialized with unknown values (log-odds 0)
+        self.assertFalse(np.any(self.grid.grid))
         
-        # Check that visited grid is initialized with False
-        self.assertFalse(np.any(self.grid._visited))
+        # Check that nothing is explored yet
+        self.assertEqual(self.grid.get_explored_area_percentage(), 0)
 
     def test_coordinate_conversion(self):
         """Test robot-to-grid and grid-to-robot coordinate conversion."""
@@ -46,6 +46,21 @@ class TestOccupancyGrid(unittest.TestCase):
             self.assertAlmostEqual(x, x_back, delta=self.grid.resolution_cm)
             self.assertAlmostEqual(y, y_back, delta=self.grid.resolution_cm)
 
+    def test_batch_coordinate_conversion(self):
+        """Test that the array conversions match the scalar ones."""
+        xs = np.array([0.0, 10.4, 25.0, 99.9])
+        ys = np.array([0.0, 20.6, 49.5, 0.2])
+        grid_xs, grid_ys = self.grid.world_to_grid_batch(xs, ys)
+        for i in range(len(xs)):
+            self.assertEqual((grid_xs[i], grid_ys[i]), self.grid._world_to_grid(xs[i], ys[i]))
+        
+        # Cell centres round-trip to within one cell
+        world_xs, world_ys = self.grid.grid_to_world_batch(grid_xs, grid_ys)
+        for i in range(len(xs)):
+            self.assertEqual((world_xs[i], world_ys[i]), self.grid._grid_to_world(grid_xs[i], grid_ys[i]))
+        self.assertTrue(np.all(np.abs(world_xs - xs) <= self.grid.resolution_cm))
+        self.assertTrue(np.all(np.abs(world_ys - ys) <= self.grid.resolution_cm))
+    
     def test_occupancy_update(self):
         """Test updating occupancy probabilities."""
         # Create a simple scenario with robot at origin
@@ -68,9 +83,12 @@ class TestOccupancyGrid(unittest.TestCase):
         robot_pose = RobotPose(x=0, y=0, theta=0)
         self.grid.update_occupancy(50, 0, robot_pose)
         
+        # Strong evidence near saturation must not be flattened
+        self.grid.grid[1, 1:4] = (32000, -32000, 1500)
+        
         # Save the grid
-        test_file = "test_grid.json"
-        self.grid.save_grid_to_file(test_file)
+        test_file = "test_grid.npz"
+        self.grid.save_grid_to_file(test_file).result()
         
         # Create a new grid and load the data
         new_grid = OccupancyGrid(width_cm=100, height_cm=100, resolution_cm=1)
@@ -79,9 +97,9 @@ class TestOccupancyGrid(unittest.TestCase):
         # Verify the load was successful
         self.assertTrue(success)
         
-        # Check that the grids are identical
-        self.assertTrue(np.array_equal(self.grid._grid, new_grid._grid))
-        self.assertTrue(np.array_equal(self.grid._visited, new_grid._visited))
+        # Check that the log-odds survive exactly
+        np.testing.assert_array_equal(self.grid.grid, new_grid.grid)
+        self.assertTrue(np.array_equal(self.grid.get_frontier_cells(), new_grid.get_frontier_cells()))
         
         # Clean up
         os.remove(test_file)
@@ -89,51 +107,113 @@ class TestOccupancyGrid(unittest.TestCase):
     def test_frontier_detection(self):
         """Test frontier cell detection."""
         # Create a simple scenario with some explored and unexplored areas
-        robot_pose = RobotPose(x=0, y=0, theta=0)
-        self.grid.update_occupancy(50, 0, robot_pose)
+        robot_pose = RobotPose(x=50, y=50, theta=0)
+        self.grid.update_occupancy(40, 0, robot_pose)
         
         # Get frontiers
-        frontiers = self.grid.get_frontiers()
+        frontiers = np.array(self.grid.get_frontier_cells())
         
         # Should have some frontier cells
         self.assertGreater(len(frontiers), 0)
         
-        # Check that frontier cells are adjacent to visited cells
-        for fx, fy in frontiers:
-            has_visited_neighbor = False
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    if dx == 0 and dy == 0:
-                        continue
-                    nx, ny = fx + dx, fy + dy
-                    if (0 <= nx < self.grid.width_cells and 
-                        0 <= ny < self.grid.height_cells and 
-                        self.grid.is_cell_visited(nx, ny)):
-                        has_visited_neighbor = True
-                        break
-                if has_visited_neighbor:
-                    break
-            self.assertTrue(has_visited_neighbor)
+        # Check that frontier cells are free and have an unknown 4-neighbour,
+        # for all cells at once
+        xs, ys = frontiers[:, 0], frontiers[:, 1]
+        self.assertTrue(np.all(self.grid.grid[ys, xs] < self.grid.FREE_THRESHOLD))
+        unknown = np.pad(np.abs(self.grid.grid) < self.grid.UNKNOWN_THRESHOLD, 1)
+        has_unknown_neighbour = (unknown[ys, xs + 1] | unknown[ys + 2, xs + 1] |
+                                 unknown[ys + 1, xs] | unknown[ys + 1, xs + 2])
+        self.assertTrue(np.all(has_unknown_neighbour))
+
+    def test_frontier_clusters(self):
+        """Test that frontier cells are reported once per cluster."""
+        self.grid.grid[:] = self.grid.FREE_THRESHOLD - 1
+        self.grid.grid[10:15, 10:15] = 0  # Unknown pocket
+        self.grid.grid[60, 60] = 0  # Lone unknown cell
+        
+        clusters = self.grid.get_frontiers()
+        cells = self.grid.get_frontier_cells()
+        self.assertEqual(len(clusters), 2)
+        self.assertEqual(sum(area for _, _, area in clusters), len(cells))
+        self.assertIn((12, 12, 20), clusters)
+    
+    def test_cell_probability(self):
+        """Test single-cell probabilities against the full projection."""
+        self.grid.update_occupancy(20, 0, RobotPose(x=50, y=50, theta=0))
+        probabilities = self.grid.get_probability_grid()
+        for x, y in [(55, 50), (70, 50), (10, 10)]:
+            self.assertAlmostEqual(self.grid.get_cell_probability(x, y), probabilities[y, x], places=5)
+        self.assertLess(self.grid.get_cell_probability(55, 50), 0.5)
+        self.assertGreater(self.grid.get_cell_probability(70, 50), 0.5)
+        self.assertEqual(self.grid.get_cell_probability(10, 10), 0.5)
+    
+    def assert_line(self, cells, start, end, n):
+        """Check an (N, 2) array of line cells by its length and endpoints."""
+        self.assertEqual(cells.shape, (n, 2))
+        np.testing.assert_array_equal(cells[0], start)
+        np.testing.assert_array_equal(cells[-1], end)
 
     def test_bresenham_line(self):
         """Test the Bresenham line algorithm implementation."""
         # Test horizontal line
-        cells = self.grid._get_line_cells(0, 0, 5, 0)
-        self.assertEqual(len(cells), 6)
-        self.assertEqual(cells[0], (0, 0))
-        self.assertEqual(cells[-1], (5, 0))
+        self.assert_line(self.grid._bresenham_line(0, 0, 5, 0), (0, 0), (5, 0), 6)
         
         # Test vertical line
-        cells = self.grid._get_line_cells(0, 0, 0, 5)
-        self.assertEqual(len(cells), 6)
-        self.assertEqual(cells[0], (0, 0))
-        self.assertEqual(cells[-1], (0, 5))
+        self.assert_line(self.grid._bresenham_line(0, 0, 0, 5), (0, 0), (0, 5), 6)
         
         # Test diagonal line
-        cells = self.grid._get_line_cells(0, 0, 5, 5)
-        self.assertEqual(len(cells), 6)
-        self.assertEqual(cells[0], (0, 0))
-        self.assertEqual(cells[-1], (5, 5))
+        self.assert_line(self.grid._bresenham_line(0, 0, 5, 5), (0, 0), (5, 5), 6)
+
+    def test_reset(self):
+        """Test that reset marks every cell unknown in place."""
+        data = self.grid.grid
+        self.grid.update_occupancy(20, 0, RobotPose(x=50, y=50, theta=0))
+        self.assertGreater(self.grid.get_explored_area_percentage(), 0)
+        
+        self.grid.reset()
+        self.assertIs(self.grid.grid, data)
+        self.assertEqual(self.grid.get_explored_area_percentage(), 0)
+
+    def test_revision(self):
+        """Test that the revision advances only when the grid changes."""
+        revision = self.grid.revision
+        self.grid.get_frontiers()
+        self.assertEqual(self.grid.revision, revision)
+        
+        self.grid.update_occupancy(20, 0, RobotPose(x=50, y=50, theta=0))
+        self.assertGreater(self.grid.revision, revision)
+        revision = self.grid.revision
+        self.grid.reset()
+        self.assertGreater(self.grid.revision, revision)
+
+    def test_current_path(self):
+        """Test that a planned path is stored as int16 cells."""
+        self.assertEqual(self.grid.get_current_path().shape, (0, 2))
+        self.grid.set_current_path(np.array([[1, 2], [2, 3], [3, 3]], dtype=np.int32))
+        path = self.grid.get_current_path()
+        self.assertEqual(path.dtype, np.int16)
+        np.testing.assert_array_equal(path, [[1, 2], [2, 3], [3, 3]])
+
+    def test_grid_data(self):
+        """Test that the web snapshot is an int16 log-odds copy."""
+        self.grid.update_occupancy(20, 0.3, RobotPose(x=50, y=50, theta=0))
+        data = self.grid.get_grid_data()
+        self.assertEqual(data.dtype, np.int16)
+        np.testing.assert_array_equal(data, self.grid.grid)
+        data[0, 0] = 100
+        self.assertEqual(self.grid.grid[0, 0], 0)
+
+    def test_pop_dirty_cells(self):
+        """Test that dirty cells replay the changes onto an older copy."""
+        self.assertIsNone(self.grid.pop_dirty_cells())
+        before = self.grid.grid.copy()
+        self.grid.update_occupancy(20, 0.3, RobotPose(x=50, y=50, theta=0))
+        
+        cells = self.grid.pop_dirty_cells()
+        self.assertEqual(cells.dtype, np.int16)
+        before[cells[:, 1], cells[:, 0]] = cells[:, 2]
+        np.testing.assert_array_equal(before, self.grid.grid)
+        self.assertEqual(len(self.grid.pop_dirty_cells()), 0)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
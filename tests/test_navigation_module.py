@@ -5,8 +5,9 @@ Test cases for the Navigation Module
 import unittest
 import math
 import time
+from unittest.mock import Mock, patch
 from modules.mapping_module import OccupancyGrid, RobotPose
-from modules.navigation_module import NavigationController, MovementCommand
+from modules.navigation_module import NavigationController, MovementCommand, wrap_angle
 
 class TestNavigationController(unittest.TestCase):
     def setUp(self):
@@ -73,11 +74,16 @@ class TestNavigationController(unittest.TestCase):
         
         # Robot should have turned towards target
         target_angle = math.atan2(target_y, target_x)
-        angle_diff = abs(target_angle - final_pose.theta)
-        while angle_diff > math.pi:
-            angle_diff -= 2*math.pi
+        angle_diff = wrap_angle(target_angle - final_pose.theta)
         self.assertLess(abs(angle_diff), 0.2)  # Allow small angle error
 
+    def test_wrap_angle(self):
+        """Test wrapping angles into [-pi, pi)."""
+        self.assertAlmostEqual(wrap_angle(0.5), 0.5)
+        self.assertAlmostEqual(wrap_angle(3 * math.pi / 2), -math.pi / 2)
+        self.assertAlmostEqual(wrap_angle(-5 * math.pi / 2), -math.pi / 2)
+        self.assertAlmostEqual(wrap_angle(math.pi), -math.pi)
+
     def test_frontier_finding(self):
         """Test frontier detection and navigation."""
         # Create some explored area
@@ -109,5 +115,50 @@ class TestNavigationController(unittest.TestCase):
         self.assertTrue(success)
         self.assertGreaterEqual(end_time - start_time, command.duration)
 
+class TestHardwareCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        """Set up a controller with a mocked board."""
+        self.nav = NavigationController(OccupancyGrid(width_cm=100, height_cm=100, resolution_cm=1))
+        self.picar = Mock()
+        self.nav._hw_ok = True
+        self.nav._picar_calls = {name: getattr(self.picar, name)
+                                 for name in ('forward', 'backward', 'stop', 'set_dir_servo_angle')}
+
+    def trip(self):
+        """Fail forward() until the breaker opens."""
+        self.picar.forward.side_effect = OSError("bus error")
+        for _ in range(NavigationController.MAX_HARDWARE_FAILURES):
+            self.assertFalse(self.nav.move_forward())
+        self.assertEqual(self.picar.forward.call_count, NavigationController.MAX_HARDWARE_FAILURES)
+
+    def test_breaker_pauses_calls(self):
+        """Test that calls are skipped once the breaker opens."""
+        self.trip()
+        self.picar.forward.side_effect = None
+        self.assertFalse(self.nav.move_forward())
+        self.assertEqual(self.picar.forward.call_count, NavigationController.MAX_HARDWARE_FAILURES)
+
+    def test_stop_bypasses_breaker(self):
+        """Test that stop() still reaches the hardware while calls are paused."""
+        self.trip()
+        self.assertTrue(self.nav.stop())
+        self.picar.stop.assert_called_once_with()
+        self.picar.set_dir_servo_angle.assert_called_once_with(0)
+
+    def test_breaker_half_open_retry(self):
+        """Test that one trial call is made after the retry interval."""
+        self.trip()
+        with patch('modules.navigation_module.time.monotonic', return_value=self.nav._hw_retry_at):
+            # A failed trial pauses calls again
+            self.assertFalse(self.nav.move_forward())
+            self.assertFalse(self.nav.move_forward())
+            self.assertEqual(self.picar.forward.call_count, NavigationController.MAX_HARDWARE_FAILURES + 1)
+        
+        self.picar.forward.side_effect = None
+        with patch('modules.navigation_module.time.monotonic', return_value=self.nav._hw_retry_at):
+            # A successful trial closes the breaker
+            self.assertTrue(self.nav.move_forward())
+            self.assertTrue(self.nav.move_forward())
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
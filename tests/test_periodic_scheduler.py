@@ -0,0 +1,108 @@
+"""
+Test cases for the Periodic Scheduler
+"""
+
+import unittest
+import threading
+import time
+from modules.periodic_scheduler import PeriodicScheduler
+
+class TestPeriodicScheduler(unittest.TestCase):
+    def setUp(self):
+        """Set up a private scheduler."""
+        self.scheduler = PeriodicScheduler(name="TestScheduler")
+
+    def _wait_for(self, predicate, timeout=2.0):
+        """Poll until predicate() is true or the timeout passes."""
+        end = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < end:
+            time.sleep(0.005)
+        return predicate()
+
+    def test_earliest_deadline_first(self):
+        """Test that due jobs run in deadline order and at their own rates."""
+        calls = []
+        slow = self.scheduler.add(10.0, lambda: calls.append('slow'))
+        fast = self.scheduler.add(0.01, lambda: calls.append('fast'))
+        self.assertTrue(self._wait_for(lambda: calls.count('fast') >= 5))
+        self.scheduler.remove(fast)
+        self.scheduler.remove(slow)
+        self.assertEqual(calls[:2], ['slow', 'fast'])
+        self.assertEqual(calls.count('slow'), 1)
+
+    def test_no_catch_up_after_overrun(self):
+        """Test that a job is rescheduled from now after a slow callback."""
+        period = 0.02
+        times = []
+
+        def callback():
+            times.append(time.monotonic())
+            if len(times) == 1:
+                time.sleep(period * 5)
+
+        job = self.scheduler.add(period, callback)
+        self.assertTrue(self._wait_for(lambda: len(times) >= 3))
+        self.scheduler.remove(job)
+        # Missed deadlines are skipped, not run back to back
+        self.assertGreaterEqual(times[2] - times[1], period * 0.9)
+
+    def test_remove_waits_for_running_callback(self):
+        """Test that remove() returns only once the callback has finished."""
+        started = threading.Event()
+        release = threading.Event()
+        finished = threading.Event()
+        calls = []
+
+        def callback():
+            calls.append(time.monotonic())
+            started.set()
+            release.wait(2.0)
+            finished.set()
+
+        job = self.scheduler.add(0.01, callback)
+        self.assertTrue(started.wait(2.0))
+        remover = threading.Thread(target=self.scheduler.remove, args=(job,))
+        remover.start()
+        remover.join(0.05)
+        self.assertTrue(remover.is_alive())
+
+        release.set()
+        remover.join(2.0)
+        self.assertFalse(remover.is_alive())
+        self.assertTrue(finished.is_set())
+
+        # The job is not rescheduled
+        time.sleep(0.05)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.scheduler._cancelled, set())
+
+    def test_remove_from_own_callback(self):
+        """Test that a callback can remove its own job without deadlocking."""
+        calls = []
+        job_ids = []
+
+        def callback():
+            calls.append(time.monotonic())
+            self.scheduler.remove(job_ids[0])
+
+        # Hold the lock so the job cannot run before its id is known
+        with self.scheduler._cond:
+            job_ids.append(self.scheduler.add(0.01, callback))
+        self.assertTrue(self._wait_for(lambda: calls))
+        time.sleep(0.05)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.scheduler._cancelled, set())
+
+    def test_remove_unknown_job(self):
+        """Test that removing a job that is not queued leaves no state behind."""
+        self.scheduler.remove(42)
+        self.assertEqual(self.scheduler._cancelled, set())
+
+        job = self.scheduler.add(10.0, lambda: None)
+        self.scheduler.remove(job)
+        self.assertTrue(self._wait_for(lambda: not self.scheduler._heap))
+        self.scheduler.remove(job)
+        self.assertEqual(self.scheduler._cancelled, set())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Test cases for the Process Manager shared-memory transports
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from queue import Empty
+from unittest.mock import patch
+import numpy as np
+from config.config_manager import ProcessingConfig
+from modules.mapping_module import RobotPose
+from modules.process_manager import ProcessManager, MappingTask, SharedArrayRing, OutOfBandChannel, \
+    _MP_CONTEXT
+
+# Run the map's sweep kernel, then fork a worker; the parent must still exit
+_FORK_AFTER_SWEEP = """
+import numpy as np
+from modules._kernels import sweep_raycast
+from modules.process_manager import _MP_CONTEXT
+grid = np.zeros((10, 10), dtype=np.int16)
+sweep_raycast(grid, 5.5, 5.5, 0.0, np.array([4.0, 3.0]), np.array([0.0, 1.0]), 1.0, -10, 20, -100, 100)
+worker = _MP_CONTEXT.Process(target=int)
+worker.start()
+worker.join()
+"""
+
+def _send_arrays(channel, arrays):
+    """Child process body: send arrays through an OutOfBandChannel."""
+    channel.put({'name': 'child', 'arrays': arrays})
+
+class TestSharedArrayRing(unittest.TestCase):
+    def setUp(self):
+        """Set up a ring of two small slots."""
+        self.ring = SharedArrayRing(num_slots=2, slot_bytes=64)
+
+    def tearDown(self):
+        """Free the shared memory."""
+        self.ring.close()
+
+    def test_round_trip(self):
+        """Test that a slot maps back to the array that was put."""
+        array = np.arange(12, dtype=np.int16).reshape(3, 4)
+        ref = self.ring.put(array)
+        view = self.ring.view(ref)
+        self.assertEqual(view.shape, (3, 4))
+        self.assertEqual(view.dtype, np.int16)
+        np.testing.assert_array_equal(view, array)
+
+    def test_oversize_array(self):
+        """Test that an array larger than a slot is rejected."""
+        with self.assertRaises(ValueError):
+            self.ring.put(np.zeros(65, dtype=np.uint8))
+
+    def test_slot_exhaustion(self):
+        """Test that put fails immediately once every slot is in flight."""
+        self.ring.put(np.zeros(4))
+        self.ring.put(np.zeros(4))
+        with self.assertRaises(Empty):
+            self.ring.put(np.zeros(4), timeout=0)
+
+    def test_release_and_reuse(self):
+        """Test that a released slot is handed out again."""
+        first = self.ring.put(np.zeros(4))
+        second = self.ring.put(np.ones(4))
+        self.ring.release(first)
+        reused = self.ring.put(np.full(4, 7.0), timeout=1.0)
+        self.assertEqual(reused.slot, first.slot)
+        np.testing.assert_array_equal(self.ring.view(reused), np.full(4, 7.0))
+        np.testing.assert_array_equal(self.ring.view(second), np.ones(4))
+
+class TestOutOfBandChannel(unittest.TestCase):
+    def setUp(self):
+        """Set up a channel and the arrays sent through it."""
+        self.channel = OutOfBandChannel()
+        self.arrays = [
+            np.arange(100, dtype=np.int16).reshape(10, 10),
+            np.linspace(0.0, 1.0, 50, dtype=np.float32),
+            np.zeros((4, 4, 3), dtype=np.uint8)
+        ]
+
+    def _check(self, received):
+        """Compare received arrays with the ones sent."""
+        self.assertEqual(len(received), len(self.arrays))
+        for got, sent in zip(received, self.arrays):
+            self.assertEqual(got.dtype, sent.dtype)
+            np.testing.assert_array_equal(got, sent)
+            self.assertTrue(got.flags.writeable)
+
+    def test_multi_buffer_round_trip(self):
+        """Test an object carrying several arrays out of band."""
+        self.channel.put({'name': 'local', 'arrays': self.arrays})
+        obj = self.channel.get(timeout=1.0)
+        self.assertEqual(obj['name'], 'local')
+        self._check(obj['arrays'])
+
+    def test_round_trip_from_child_process(self):
+        """Test that a worker process can send arrays to the parent."""
+        child = _MP_CONTEXT.Process(target=_send_arrays, args=(self.channel, self.arrays))
+        child.start()
+        try:
+            obj = self.channel.get(timeout=5.0)
+        finally:
+            child.join(5.0)
+        self.assertEqual(obj['name'], 'child')
+        self._check(obj['arrays'])
+
+    def test_get_timeout(self):
+        """Test that get raises Empty when nothing was sent."""
+        with self.assertRaises(Empty):
+            self.channel.get(timeout=0)
+
+class TestMappingTask(unittest.TestCase):
+    def setUp(self):
+        """Set up a manager without workers."""
+        self.manager = ProcessManager(ProcessingConfig(mapping={'enabled': False},
+                                                       planning={'enabled': False},
+                                                       vision={'enabled': False}))
+
+    def tearDown(self):
+        """Release the manager's resources."""
+        self.manager.stop()
+
+    def _task(self, distances, angles):
+        """Build a mapping task on an empty 20 x 20 section."""
+        return MappingTask(task_id='scan', timestamp=0.0, data=None,
+                           distances=np.array(distances, dtype=np.float32),
+                           angles=np.array(angles, dtype=np.float32),
+                           robot_pose=RobotPose(x=10.0, y=10.0, theta=0.0),
+                           grid_section=np.zeros((20, 20), dtype=np.int16))
+
+    def test_non_finite_beams_skipped(self):
+        """Test that beams with a NaN or infinite distance or angle are ignored."""
+        expected = self.manager._process_mapping_task(self._task([5.0], [0.5]))
+        section = self.manager._process_mapping_task(
+            self._task([5.0, np.nan, 4.0, 6.0], [0.5, 0.0, np.nan, np.inf]))
+        np.testing.assert_array_equal(section, expected)
+
+class TestForkSafety(unittest.TestCase):
+    def test_fork_after_sweep_raycast(self):
+        """Test that forking after a map update does not hang the parent."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', _FORK_AFTER_SWEEP], cwd=root, timeout=120)
+        self.assertEqual(result.returncode, 0)
+
+    @patch('modules.process_manager._numba_threads_started', return_value=True)
+    def test_start_refuses_fork_after_parallel_kernel(self, _):
+        """Test that workers are not forked once Numba's thread pool exists."""
+        manager = ProcessManager(ProcessingConfig(mapping={'enabled': False},
+                                                  planning={'enabled': False},
+                                                  vision={'enabled': False}))
+        try:
+            if _MP_CONTEXT.get_start_method() == 'fork':
+                with self.assertRaises(RuntimeError):
+                    manager.start()
+                self.assertFalse(manager._running.value)
+        finally:
+            manager.stop()
+
+if __name__ == '__main__':
+    unittest.main()
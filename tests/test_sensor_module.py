@@ -6,6 +6,7 @@ import unittest
 import time
 import numpy as np
 import speech_recognition as sr
+from unittest.mock import Mock, patch
 from modules.sensor_module import SensorModule
 
 class TestSensorModule(unittest.TestCase):
@@ -21,8 +22,10 @@ class TestSensorModule(unittest.TestCase):
         """Test that proximity polling works and returns reasonable values."""
         self.sensor.start_proximity_polling()
         
-        # Wait for some readings to accumulate
-        time.sleep(0.5)
+        # Wait for the first reading rather than a fixed time
+        deadline = time.monotonic() + 2.0
+        while self.sensor._prox_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
         
         # Get a reading
         reading = self.sensor.read_proximity()
@@ -80,5 +83,65 @@ class TestSensorModule(unittest.TestCase):
         # Note: Testing with real AudioData would require actual audio input
         # or mock audio data, which is beyond the scope of this basic test
 
+class TestProximityAverage(unittest.TestCase):
+    def setUp(self):
+        """Set up a sensor module with a mocked board."""
+        self.sensor = SensorModule(pin_polling_cpu=False)
+        self.sensor.picar = Mock()
+
+    def poll(self, centers):
+        """Run the polling loop in this thread for one reading per center value."""
+        remaining = list(centers)
+        
+        def get_grayscale_data():
+            center = remaining.pop(0)
+            if not remaining:
+                self.sensor._running = False
+            return [100.0, center, 100.0]
+        
+        self.sensor.picar.get_grayscale_data = get_grayscale_data
+        self.sensor._running = True
+        self.sensor._stop_polling.set()  # Waits between readings return at once
+        self.sensor._proximity_polling_loop()
+
+    def test_read_proximity_average(self):
+        """Test the moving average over the latest center readings."""
+        self.assertIsNone(self.sensor.read_proximity())
+        
+        self.poll([10.0, 20.0, 30.0])
+        self.assertAlmostEqual(self.sensor.read_proximity(), 20.0)
+        
+        # Only the last PROXIMITY_WINDOW readings count
+        window = SensorModule.PROXIMITY_WINDOW
+        self.poll([1000.0] * 5 + [50.0] * window)
+        self.assertAlmostEqual(self.sensor.read_proximity(), 50.0)
+
+class TestFrameCapture(unittest.TestCase):
+    def setUp(self):
+        """Set up a sensor module with a mocked camera."""
+        self.sensor = SensorModule(pin_polling_cpu=False)
+        self.sensor._camera = Mock()
+        self.sensor._camera.retrieve.side_effect = lambda image: (True, image)
+
+    def test_retrieve_rate_limited(self):
+        """Test that grabbed frames are only decoded at CAPTURE_FPS."""
+        times = [0.0, 0.01, 0.02, 0.2, 0.21]
+        remaining = list(times)
+        
+        def grab():
+            remaining.pop(0)
+            if not remaining:
+                self.sensor._capture_running = False
+            return True
+        
+        self.sensor._camera.grab = grab
+        self.sensor._capture_running = True
+        with patch.object(SensorModule, 'CAPTURE_FPS', 10), \
+             patch('modules.sensor_module.time.monotonic', side_effect=times):
+            self.sensor._capture_loop()
+        
+        self.assertEqual(self.sensor._camera.retrieve.call_count, 2)
+        self.assertEqual(self.sensor._frame_count, 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
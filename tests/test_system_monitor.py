@@ -3,32 +3,32 @@ Test cases for the System Monitor Module
 """
 
 import unittest
+import copy
+import pickle
 import time
-from modules.system_monitor import SystemMonitor
+from unittest.mock import Mock, patch
+from modules.system_monitor import SystemMonitor, SystemStatus
 
 class TestSystemMonitor(unittest.TestCase):
     def setUp(self):
         """Set up test cases."""
-        self.monitor = SystemMonitor()
+        self.monitor = SystemMonitor(Mock())
 
     def tearDown(self):
         """Clean up after tests."""
-        self.monitor.release()
+        self.monitor.stop()
 
     def test_monitoring_start_stop(self):
         """Test that system monitoring can be started and stopped."""
         # Start monitoring
-        started = self.monitor.start_monitoring()
-        self.assertTrue(started)
-        self.assertTrue(self.monitor._is_monitoring)
-        self.assertIsNotNone(self.monitor._monitoring_thread)
-        self.assertTrue(self.monitor._monitoring_thread.is_alive())
+        self.monitor.start()
+        self.assertTrue(self.monitor.is_running)
+        self.assertIsNotNone(self.monitor._monitor_job)
         
-        # Stop monitoring
-        self.monitor.stop_monitoring()
-        time.sleep(0.1)  # Give thread time to stop
-        self.assertFalse(self.monitor._is_monitoring)
-        self.assertFalse(self.monitor._monitoring_thread.is_alive())
+        # Stop monitoring; stop() waits for a tick in progress
+        self.monitor.stop()
+        self.assertFalse(self.monitor.is_running)
+        self.assertIsNone(self.monitor._monitor_job)
 
     def test_get_system_stats(self):
         """Test that system statistics are returned in correct format."""
@@ -62,27 +62,44 @@ class TestSystemMonitor(unittest.TestCase):
             self.assertLessEqual(battery_level, 100)
 
     def test_monitoring_updates(self):
-        """Test that monitoring actually updates the metrics."""
-        # Start monitoring
-        self.monitor.start_monitoring()
-        
-        # Get initial values
-        initial_stats = self.monitor.get_system_stats()
-        
-        # Wait for a few monitoring cycles
-        time.sleep(self.monitor._monitoring_interval * 2)
-        
-        # Get updated values
-        updated_stats = self.monitor.get_system_stats()
-        
-        # At least CPU usage should have changed
-        self.assertNotEqual(
-            initial_stats['cpu_percent'],
-            updated_stats['cpu_percent'],
-            "CPU usage should change over time"
-        )
+        """Test that monitoring actually records readings."""
+        # Monitor every millisecond so a few cycles take no real time
+        with patch.object(SystemMonitor, 'MONITOR_INTERVAL', 0.001):
+            self.monitor.start()
+            
+            # Wait for a few monitoring cycles by their count, not wall time
+            deadline = time.monotonic() + 2.0
+            while self.monitor._history_count < 3 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            self.monitor.stop()
         
-        self.monitor.stop_monitoring()
+        self.assertGreaterEqual(self.monitor._history_count, 3)
+        self.assertEqual(len(self.monitor.get_metric_history('cpu_usage')), self.monitor._history_count)
+
+class TestSystemMonitorStatusCache(unittest.TestCase):
+    def setUp(self):
+        """Set up test cases."""
+        self.monitor = SystemMonitor(Mock())
+        self.status = SystemStatus(battery_voltage=7.4, cpu_temperature=50.0,
+                                   cpu_usage=10.0, memory_usage=20.0, timestamp=0.0)
+
+    def test_current_status_reuses_fresh_reading(self):
+        """Test that a recent reading is returned without sampling again."""
+        with patch.object(self.monitor, '_collect_system_metrics', return_value=self.status) as collect, \
+                patch('modules.system_monitor.time.monotonic', return_value=100.0) as clock:
+            self.monitor._monitoring_tick()
+            self.assertIs(self.monitor.get_current_status(), self.status)
+            self.assertEqual(collect.call_count, 1)
+            
+            # Once the reading is a full interval old it is sampled again
+            clock.return_value = 100.0 + SystemMonitor.MONITOR_INTERVAL
+            self.monitor.get_current_status()
+            self.assertEqual(collect.call_count, 2)
+
+    def test_status_pickle_round_trip(self):
+        """Test that the frozen, slotted status survives pickling and copying."""
+        self.assertEqual(pickle.loads(pickle.dumps(self.status)), self.status)
+        self.assertEqual(copy.deepcopy(self.status), self.status)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -4,6 +4,8 @@ Test cases for the Voice Command Handler Module
 
 import unittest
 import math
+import threading
+import time
 from unittest.mock import Mock, patch
 import speech_recognition as sr
 from modules.mapping_module import OccupancyGrid, RobotPose
@@ -21,7 +23,7 @@ class TestVoiceCommandHandler(unittest.TestCase):
         """Test handler initialization."""
         self.assertEqual(self.voice_handler._wake_word, "robot")
         self.assertFalse(self.voice_handler._is_listening)
-        self.assertIsNone(self.voice_handler._command_thread)
+        self.assertIsNone(self.voice_handler._stop_background)
         
         # Check that all command types are initialized
         commands = self.voice_handler.get_available_commands()
@@ -81,6 +83,14 @@ class TestVoiceCommandHandler(unittest.TestCase):
         self.assertTrue(self.voice_handler._process_command("test command 123"))
         mock_handler.assert_called_once()
 
+    def test_custom_command_ignores_case(self):
+        """Test that command patterns match regardless of case."""
+        mock_handler = Mock(return_value=True)
+        self.voice_handler.add_custom_command("wave", [r"Wave (\w+)"], mock_handler)
+        
+        self.assertTrue(self.voice_handler._process_command("please WAVE hello"))
+        self.assertEqual(mock_handler.call_args[0][0].group(1), "hello")
+
     @patch('speech_recognition.Recognizer.recognize_google')
     def test_command_handlers(self, mock_recognize):
         """Test individual command handlers."""
@@ -108,12 +118,19 @@ class TestVoiceCommandHandler(unittest.TestCase):
         match = Mock()
         self.assertTrue(self.voice_handler._handle_status(match))
 
-    def test_start_stop_listening(self):
+    @patch('speech_recognition.Recognizer.adjust_for_ambient_noise')
+    @patch('speech_recognition.Recognizer.listen_in_background')
+    @patch('speech_recognition.Microphone')
+    def test_start_stop_listening(self, mock_microphone, mock_listen, mock_adjust):
         """Test starting and stopping voice command listening."""
+        stopper = Mock()
+        mock_listen.return_value = stopper
+        
         # Start listening
         self.assertTrue(self.voice_handler.start_listening())
         self.assertTrue(self.voice_handler._is_listening)
-        self.assertIsNotNone(self.voice_handler._command_thread)
+        self.assertIsNotNone(self.voice_handler._stop_background)
+        mock_listen.assert_called_once()
         
         # Try starting again (should return False)
         self.assertFalse(self.voice_handler.start_listening())
@@ -121,6 +138,67 @@ class TestVoiceCommandHandler(unittest.TestCase):
         # Stop listening
         self.voice_handler.stop_listening()
         self.assertFalse(self.voice_handler._is_listening)
+        stopper.assert_called_once_with(wait_for_stop=True)
+
+    def test_speak_coalescing(self):
+        """Test that queued speech is bounded and superseded by newer text."""
+        playing = threading.Event()
+        release = threading.Event()
+        spoken = []
+        
+        def say(text):
+            spoken.append(text)
+            playing.set()
+            release.wait(2.0)
+        
+        self.voice_handler._tts.say = Mock(side_effect=say)
+        
+        # Block the worker on the first message, then flood the queue
+        self.voice_handler._speak("first")
+        self.assertTrue(playing.wait(2.0))
+        for i in range(10):
+            self.voice_handler._speak(f"message {i}")
+        self.assertEqual(len(self.voice_handler._tts_queue), VoiceCommandHandler.TTS_QUEUE_SIZE)
+        
+        # Only the newest pending message is spoken; a quick repeat is skipped
+        playing.clear()
+        release.set()
+        self.assertTrue(playing.wait(2.0))
+        self.voice_handler._speak("message 9")
+        self.voice_handler._speak("last")
+        for _ in range(100):
+            if spoken[-1] == "last":
+                break
+            time.sleep(0.01)
+        self.assertEqual(spoken, ["first", "message 9", "last"])
+
+    def test_wake_word_gating(self):
+        """Test that commands need the wake word, except stop."""
+        recognizer = Mock()
+        self.voice_handler._speak = Mock()
+        self.voice_handler._process_command = Mock(return_value=True)
+        
+        def hear(text):
+            recognizer.recognize_google.return_value = text
+            self.voice_handler._on_audio(recognizer, Mock())
+        
+        # A command in the same phrase as the wake word runs at once
+        hear("Robot turn left")
+        self.voice_handler._process_command.assert_called_once_with("turn left")
+        
+        # Without the wake word only stop gets through
+        self.voice_handler._process_command.reset_mock()
+        hear("turn left")
+        self.voice_handler._process_command.assert_not_called()
+        hear("stop")
+        self.voice_handler._process_command.assert_called_once_with("stop")
+        
+        # The wake word alone arms the handler for the next phrase
+        self.voice_handler._process_command.reset_mock()
+        hear("robot")
+        self.voice_handler._process_command.assert_not_called()
+        hear("turn left")
+        self.voice_handler._process_command.assert_called_once_with("turn left")
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
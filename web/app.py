@@ -9,27 +9,134 @@ This module provides:
 """
 
 import os
-from flask import Flask, render_template, jsonify, request, Response, send_file
+from flask import Flask, render_template, jsonify, request, Response
+from flask.json.provider import JSONProvider
 from flask_socketio import SocketIO, emit
 import logging
-import json
+import orjson
 import cv2
 import numpy as np
-from typing import Dict, Any, Optional
-from dataclasses import asdict
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple, get_origin
+from dataclasses import asdict, fields, replace
 import time
+import threading
 from threading import Lock
-import io
+import zlib
+import base64
 
 from config.config_manager import ConfigManager, WebConfig
 from modules.system_monitor import SystemMonitor, SystemStatus
 from modules.mapping_module import OccupancyGrid
 
+try:
+    from flask_compress import Compress
+except ImportError:  # Optional: serve responses uncompressed
+    Compress = None
+
+try:
+    # SIMD (SSSE3/AVX2/NEON) base64 encoder
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:  # Optional: fall back to the standard library
+    def _b64encode_str(data: Any) -> str:
+        return base64.b64encode(data).decode('ascii')
+
+try:
+    from turbojpeg import TurboJPEG, TJFLAG_FASTDCT
+except ImportError:  # Optional: fall back to OpenCV's encoder
+    TurboJPEG = None
+
+# JPEG quality and frame rate of the video feed
+STREAM_JPEG_QUALITY = 80
+STREAM_FPS = 15
+
+# zlib level for full map snapshots; 1 is the fastest and still shrinks
+# the long runs of unknown cells many times over
+MAP_COMPRESSION_LEVEL = 1
+
 logger = logging.getLogger(__name__)
 
+# orjson options for every JSON body the web interface writes
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+class _OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify uses it too."""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize an object to JSON text; Flask's keyword options are ignored."""
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode('utf-8')
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """Parse JSON text or bytes."""
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = _OrjsonProvider(app)
 socketio = SocketIO(app)
-config_lock = Lock()
+
+if Compress is not None:
+    # Fastest deflate level: map JSON is mostly repeated small integers
+    app.config['COMPRESS_MIMETYPES'] = ['application/json', 'application/octet-stream']
+    app.config['COMPRESS_LEVEL'] = 1
+    Compress(app)
+
+# Top-level sections a configuration update may contain
+_CONFIG_SECTIONS = frozenset(section for section, _ in ConfigManager._TYPED_SECTIONS)
+
+# Runtime type of each WebConfig field, for validating configuration updates
+_WEB_FIELD_TYPES = {f.name: get_origin(f.type) or f.type for f in fields(WebConfig)}
+
+def _json_response(obj: Any) -> Response:
+    """
+    Serialize an object to a JSON response with orjson.
+    
+    NumPy arrays are written straight from their buffers instead of being
+    converted to nested Python lists first.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        Response: JSON response
+    """
+    return Response(orjson.dumps(obj, option=_ORJSON_OPTIONS), mimetype='application/json')
+
+def _ndarray_spec(array: np.ndarray) -> Dict[str, Any]:
+    """
+    Describe an array as a typed-array spec for JSON clients.
+    
+    The raw buffer is base64-encoded in one pass; clients decode it with
+    atob into the matching typed array.
+    
+    Args:
+        array: Array to describe
+        
+    Returns:
+        Dict[str, Any]: dtype, shape and base64 data of the array
+    """
+    return {
+        'dtype': str(array.dtype),
+        'shape': array.shape,
+        'bdata': _b64encode_str(np.ascontiguousarray(array))
+    }
+
+def _stream_array_json(array: np.ndarray, rows_per_chunk: int = 64) -> Iterator[bytes]:
+    """
+    Encode an array as a JSON list of rows, a block of rows at a time.
+    
+    Args:
+        array: Array with at least one dimension
+        rows_per_chunk: Rows encoded per yielded chunk
+        
+    Yields:
+        bytes: Consecutive pieces of the JSON text
+    """
+    yield b'['
+    for start in range(0, len(array), rows_per_chunk):
+        if start:
+            yield b','
+        # Drop the brackets orjson puts around each block of rows
+        yield orjson.dumps(array[start:start + rows_per_chunk], option=orjson.OPT_SERIALIZE_NUMPY)[1:-1]
+    yield b']'
 
 class WebInterface:
     """
@@ -51,7 +158,9 @@ class WebInterface:
             system_monitor: System monitor instance
             occupancy_grid: Occupancy grid instance
         """
+        # Frozen, so readers never need a lock; updates swap in a new object
         self.config = config
+        self._config_write_lock = Lock()
         self.system_monitor = system_monitor
         self.occupancy_grid = occupancy_grid
         
@@ -61,8 +170,37 @@ class WebInterface:
         # Initialize WebSocket events
         self._setup_websocket_events()
         
-        # Status update thread
-        self._last_update = 0
+        # libjpeg-turbo encoder for the video feed with a reusable output
+        # buffer, if available
+        self._jpeg = None
+        self._enc_buf: Optional[bytearray] = None
+        self._enc_shape: Optional[Tuple[int, ...]] = None
+        if TurboJPEG is not None:
+            try:
+                self._jpeg = TurboJPEG()
+            except Exception as e:
+                logger.warning("TurboJPEG unavailable, using OpenCV encoder: %s", e)
+        
+        # Latest multipart video part, published by the encoder task and
+        # shared by every /video_feed client; the task starts with the first
+        self._part: Optional[bytes] = None
+        self._part_count = 0
+        self._part_cond = threading.Condition()
+        self._encoder_started = False
+        
+        # Rendered pages by template name, with the config they were rendered from
+        self._page_cache: Dict[str, Tuple[WebConfig, bytes]] = {}
+        
+        # Session ids of connected clients, and the grid revision last sent
+        # to each of them
+        self._clients: Set[str] = set()
+        self._map_revs: Dict[str, int] = {}
+        # Revision the last batch of dirty cells was taken at; clients at or
+        # past it can be brought up to date with a patch
+        self._patch_rev: Optional[int] = None
+        
+        # Last status served, with its dict and JSON forms
+        self._status_cache: Tuple[Optional[SystemStatus], Dict[str, Any], bytes] = (None, {}, b'')
         
         logger.info("Web interface initialized")
     
@@ -72,44 +210,42 @@ class WebInterface:
         @app.route('/')
         def index():
             """Render the main dashboard."""
-            return render_template('index.html', config=self.config)
+            return self._render_page('index.html')
         
         @app.route('/control')
         def control():
             """Render the manual control interface."""
-            return render_template('control.html', config=self.config)
+            return self._render_page('control.html')
         
         @app.route('/config')
         def config():
             """Render the configuration interface."""
-            return render_template('config.html', config=self.config)
+            return self._render_page('config.html')
         
         @app.route('/api/status')
         def get_status():
             """Get current system status."""
-            status = self.system_monitor.get_current_status()
-            return jsonify(asdict(status))
+            return Response(self._get_status_data()[1], mimetype='application/json')
         
         @app.route('/api/config', methods=['GET', 'POST'])
         def handle_config():
             """Get or update configuration."""
             if request.method == 'GET':
-                return jsonify(self.config.get_raw_config())
+                return jsonify({"web": asdict(self.config)})
             else:
-                with config_lock:
-                    new_config = request.json
-                    # Validate and update configuration
-                    if self._validate_config(new_config):
-                        self.config.update(new_config)
-                        return jsonify({"status": "success"})
-                    return jsonify({"status": "error", "message": "Invalid configuration"})
+                new_config = request.json
+                # Validate and update configuration
+                if self._validate_config(new_config):
+                    self._update_config(new_config.get('web', {}))
+                    return jsonify({"status": "success"})
+                return jsonify({"status": "error", "message": "Invalid configuration"})
         
         @app.route('/api/map')
         def get_map():
             """Get the current occupancy grid map."""
             grid_data = self.occupancy_grid.get_grid_data()
-            return jsonify({
-                "grid": grid_data.tolist(),
+            return _json_response({
+                "grid": _ndarray_spec(grid_data),
                 "width": self.occupancy_grid.width_cm,
                 "height": self.occupancy_grid.height_cm,
                 "resolution": self.occupancy_grid.resolution_cm
@@ -119,26 +255,26 @@ class WebInterface:
         def download_map():
             """Download the current map as a file."""
             grid_data = self.occupancy_grid.get_grid_data()
-            
-            # Create JSON with map data
-            map_data = {
-                "grid": grid_data.tolist(),
-                "metadata": {
-                    "width_cm": self.occupancy_grid.width_cm,
-                    "height_cm": self.occupancy_grid.height_cm,
-                    "resolution_cm": self.occupancy_grid.resolution_cm,
-                    "timestamp": time.time()
-                }
+            metadata = {
+                "width_cm": self.occupancy_grid.width_cm,
+                "height_cm": self.occupancy_grid.height_cm,
+                "resolution_cm": self.occupancy_grid.resolution_cm,
+                "timestamp": time.time()
             }
             
-            # Convert to bytes
-            map_bytes = json.dumps(map_data).encode('utf-8')
+            # Stream the JSON so the whole document is never held in memory;
+            # the server sends it with chunked transfer encoding
+            def generate():
+                yield b'{"grid":'
+                yield from _stream_array_json(grid_data)
+                yield b',"metadata":' + orjson.dumps(metadata) + b'}'
             
-            return send_file(
-                io.BytesIO(map_bytes),
+            # A plain response rather than send_file, whose passthrough
+            # body is left uncompressed
+            return Response(
+                generate(),
                 mimetype='application/json',
-                as_attachment=True,
-                download_name='map.json'
+                headers={'Content-Disposition': 'attachment; filename=map.json'}
             )
         
         @app.route('/video_feed')
@@ -149,6 +285,26 @@ class WebInterface:
                 mimetype='multipart/x-mixed-replace; boundary=frame'
             )
     
+    def _render_page(self, name: str) -> Response:
+        """
+        Render a page template, reusing the HTML until the config changes.
+        
+        The config is frozen and replaced on update, so its identity tells
+        whether a cached page is current.
+        
+        Args:
+            name: Template file name
+            
+        Returns:
+            Response: Rendered HTML
+        """
+        config = self.config
+        cached = self._page_cache.get(name)
+        if cached is None or cached[0] is not config:
+            cached = (config, render_template(name, config=config).encode('utf-8'))
+            self._page_cache[name] = cached
+        return Response(cached[1], mimetype='text/html')
+    
     def _setup_websocket_events(self) -> None:
         """Set up WebSocket event handlers."""
         
@@ -156,13 +312,16 @@ class WebInterface:
         def handle_connect():
             """Handle client connection."""
             logger.info("Client connected")
+            self._clients.add(request.sid)
             # Send initial map data
-            self._send_map_update()
+            self._send_map_update([request.sid])
         
         @socketio.on('disconnect')
         def handle_disconnect():
             """Handle client disconnection."""
             logger.info("Client disconnected")
+            self._clients.discard(request.sid)
+            self._map_revs.pop(request.sid, None)
         
         @socketio.on('control_command')
         def handle_control(data):
@@ -197,39 +356,154 @@ class WebInterface:
                         'status': 'error',
                         'message': 'Failed to save map'
                     })
-        
-        @socketio.on('request_update')
-        def handle_update_request():
-            """Handle status update request."""
-            self._send_status_update()
     
     def _generate_frame(self):
         """Generate video streaming frames."""
+        with self._part_cond:
+            if not self._encoder_started:
+                socketio.start_background_task(self._encode_loop)
+                self._encoder_started = True
+        
+        # Clients only wait for parts; capture and encoding never run in
+        # a request handler, so a slow client cannot hold them up
+        seen = 0
+        while True:
+            with self._part_cond:
+                self._part_cond.wait_for(lambda: self._part_count != seen)
+                part = self._part
+                seen = self._part_count
+            yield part
+    
+    def _encode_loop(self) -> None:
+        """Background task encoding frames at STREAM_FPS for the video feed."""
+        # Frame and part header are allocated once; captured frames should be
+        # written into the frame in place
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        header = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: '
         while True:
             # Implementation would go here
             # This is a placeholder that should be replaced with actual implementation
-            frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            _, jpeg = cv2.imencode('.jpg', frame)
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + jpeg.tobytes() + b'\r\n')
+            jpeg = self._encode_jpeg(frame)
+            part = b''.join((header, b'%d\r\n\r\n' % len(jpeg), jpeg, b'\r\n'))
+            with self._part_cond:
+                self._part = part
+                self._part_count += 1
+                self._part_cond.notify_all()
+            socketio.sleep(1.0 / STREAM_FPS)
+    
+    def _encode_jpeg(self, frame: np.ndarray) -> memoryview:
+        """
+        JPEG-encode a BGR video frame.
+        
+        Uses libjpeg-turbo's fast DCT when available, writing into a buffer
+        reused across frames of the same shape; otherwise OpenCV.
+        
+        Args:
+            frame: BGR image
+            
+        Returns:
+            memoryview: Encoded JPEG, valid until the next call
+        """
+        if self._jpeg is not None:
+            if self._enc_shape != frame.shape:
+                self._enc_buf = bytearray(self._jpeg.buffer_size(frame))
+                self._enc_shape = frame.shape
+            _, size = self._jpeg.encode(frame, quality=STREAM_JPEG_QUALITY, flags=TJFLAG_FASTDCT,
+                                        dst=self._enc_buf)
+            return memoryview(self._enc_buf)[:size]
+        _, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, STREAM_JPEG_QUALITY])
+        return memoryview(jpeg).cast('B')
+    
+    def _get_status_data(self) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Get the current status as a dict and as JSON.
+        
+        Both forms are built once per status reading and reused until the
+        system monitor takes a new one.
+        
+        Returns:
+            Tuple[Dict[str, Any], bytes]: Status fields and their JSON encoding
+        """
+        status = self.system_monitor.get_current_status()
+        cached_status, data, body = self._status_cache
+        if status is not cached_status:
+            data = asdict(status)
+            body = orjson.dumps(data)
+            self._status_cache = (status, data, body)
+        return data, body
+    
+    def _broadcast_loop(self) -> None:
+        """Background task pushing status and map changes to clients."""
+        while True:
+            socketio.sleep(self.config.update_interval_ms / 1000)
+            if not self._clients:
+                continue
+            try:
+                self._send_status_update()
+                self._send_map_update()
+            except Exception as e:
+                logger.error(f"Error broadcasting updates: {str(e)}", exc_info=True)
     
     def _send_status_update(self) -> None:
         """Send status update to connected clients."""
-        current_time = time.time()
-        if current_time - self._last_update >= self.config.update_interval_ms / 1000:
-            status = self.system_monitor.get_current_status()
-            socketio.emit('status_update', asdict(status))
-            self._last_update = current_time
+        socketio.emit('status_update', self._get_status_data()[0])
     
-    def _send_map_update(self) -> None:
-        """Send map update to connected clients."""
-        grid_data = self.occupancy_grid.get_grid_data()
+    def _send_map_update(self, sids: Optional[List[str]] = None) -> None:
+        """
+        Send the map to clients that have not seen its current revision.
+        
+        Clients already holding a map at least as new as the previous
+        update get only the changed cells; others get the whole grid.
+        
+        Args:
+            sids: Session ids to update; all connected clients if None
+        """
+        revision = self.occupancy_grid.revision
+        if sids is None:
+            sids = list(self._clients)
+        sids = [sid for sid in sids if self._map_revs.get(sid) != revision]
+        if not sids:
+            return
+        
+        # Cells are absolute values, so they bring any map taken since the
+        # previous pop up to date
+        patch_rev = self._patch_rev
+        cells = self.occupancy_grid.pop_dirty_cells()
+        self._patch_rev = revision
         path_data = self.occupancy_grid.get_current_path()
+        # int16 cells, sent as a binary attachment like the grid
+        path_spec = {
+            'shape': path_data.shape,
+            'dtype': str(path_data.dtype),
+            'buf': path_data.tobytes()
+        }
         
-        socketio.emit('map_update', {
-            'grid': grid_data.tolist(),
-            'path': path_data
-        })
+        # Raw buffers go out as Socket.IO binary attachments
+        full_payload = None
+        for sid in sids:
+            if cells is not None and patch_rev is not None and self._map_revs.get(sid, -1) >= patch_rev:
+                socketio.emit('map_patch', {
+                    'rev': revision,
+                    'cells': cells.tobytes(),
+                    'shape': cells.shape,
+                    'path': path_spec
+                }, to=sid)
+            else:
+                if full_payload is None:
+                    grid_data = self.occupancy_grid.get_grid_data()
+                    full_payload = {
+                        'grid': {
+                            'shape': grid_data.shape,
+                            'dtype': str(grid_data.dtype),
+                            'codec': 'deflate',
+                            'buf': zlib.compress(grid_data.tobytes(), MAP_COMPRESSION_LEVEL)
+                        },
+                        'path': path_spec
+                    }
+                socketio.emit('map_update', full_payload, to=sid)
+            # A client that disconnected meanwhile is not recorded again
+            if sid in self._clients:
+                self._map_revs[sid] = revision
     
     def _execute_control_command(self, command: Dict[str, Any]) -> None:
         """
@@ -241,6 +515,20 @@ class WebInterface:
         # Implementation would go here
         logger.info(f"Executing control command: {command}")
     
+    def _update_config(self, changes: Dict[str, Any]) -> None:
+        """
+        Replace the web configuration with one that has changes applied.
+        
+        Only concurrent updates are serialized; readers keep whichever
+        configuration object they already hold.
+        
+        Args:
+            changes: New values for WebConfig fields; other keys are ignored
+        """
+        names = {f.name for f in fields(WebConfig)}
+        with self._config_write_lock:
+            self.config = replace(self.config, **{k: v for k, v in changes.items() if k in names})
+    
     def _validate_config(self, config: Dict[str, Any]) -> bool:
         """
         Validate configuration changes.
@@ -255,17 +543,31 @@ class WebInterface:
             # Basic validation
             if not isinstance(config, dict):
                 return False
+            if not _CONFIG_SECTIONS.issuperset(config):
+                return False
             
             # Validate web-specific configuration
             web_config = config.get('web', {})
             if not isinstance(web_config, dict):
                 return False
             
+            # Field types; keys that are not WebConfig fields are ignored
+            for key, value in web_config.items():
+                expected = _WEB_FIELD_TYPES.get(key)
+                if expected is not None and (not isinstance(value, expected) or
+                                             (isinstance(value, bool) and expected is not bool)):
+                    return False
+            
             # Validate port
             port = web_config.get('port')
             if port is not None and not (0 <= port <= 65535):
                 return False
             
+            # The broadcast loop sleeps for this long between updates
+            interval = web_config.get('update_interval_ms')
+            if interval is not None and interval <= 0:
+                return False
+            
             # Add more validation as needed
             return True
             
@@ -284,4 +586,6 @@ class WebInterface:
         port = self.config.port
         
         logger.info(f"Starting web interface on {host}:{port}")
+        # Updates are pushed from one task instead of answering client polls
+        socketio.start_background_task(self._broadcast_loop)
         socketio.run(app, host=host, port=port, debug=debug) 
\ No newline at end of file
@@ -164,11 +164,39 @@ class MapVisualization {
         this.ctx.stroke();
     }
     
+    static async decodeGrid(grid) {
+        // Inflate the grid buffer with the browser's built-in zlib decoder
+        let buf = grid.buf;
+        if (grid.codec === 'deflate') {
+            const stream = new Blob([buf]).stream().pipeThrough(new DecompressionStream('deflate'));
+            buf = await new Response(stream).arrayBuffer();
+        }
+        
+        // View the raw grid buffer as a flat, row-major typed array
+        const arrayTypes = {
+            int8: Int8Array,
+            uint8: Uint8Array,
+            int16: Int16Array,
+            float32: Float32Array
+        };
+        return new arrayTypes[grid.dtype](buf);
+    }
+    
     updateOccupancyGrid(grid) {
         this.occupancyGrid = grid;
         this.render();
     }
     
+    applyPatch(cells) {
+        // Cells arrive as flat int16 (x, y, value) triples
+        if (!this.occupancyGrid) return;
+        const triples = new Int16Array(cells);
+        for (let i = 0; i < triples.length; i += 3) {
+            this.occupancyGrid[triples[i + 1] * this.gridWidth + triples[i]] = triples[i + 2];
+        }
+        this.render();
+    }
+    
     updateRobotPosition(x, y, orientation) {
         this.robotPosition = { x, y, orientation };
         this.render();
@@ -179,6 +207,16 @@ class MapVisualization {
         this.render();
     }
     
+    updatePathCells(path) {
+        // Path arrives as flat int16 (x, y) grid cells; draw through cell centres
+        const cells = new Int16Array(path.buf);
+        const points = [];
+        for (let i = 0; i < cells.length; i += 2) {
+            points.push([(cells[i] + 0.5) * this.resolution, (cells[i + 1] + 0.5) * this.resolution]);
+        }
+        this.updatePath(points);
+    }
+    
     render() {
         if (!this.occupancyGrid) return;
         